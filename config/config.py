@@ -40,6 +40,28 @@ TIPOS_CLASIFICACION = {
     }
 }
 
+# ============================================================================
+# UMBRALES DE LOS TARGETS
+# ============================================================================
+
+BINS_NIVEL_RIESGO = [0, 2, 5, 10, float('inf')]  # Bajo 0-2, Medio 3-5, Alto 6-10, Muy Alto >10
+UMBRAL_HOTSPOT = 5                 # Hotspot crítico: más de 5 crímenes en la semana
+UMBRALES_TENDENCIA = (0.7, 1.3)    # Ratio vs promedio histórico: descenso < 0.7 <= estable <= 1.3 < escalada
+VENTANA_TENDENCIA = 4              # Semanas previas del promedio histórico
+# Clase de tendencia de las semanas con 0 denuncias y promedio histórico 0:
+# None = la que da el ratio (descenso); 1 = estable
+CLASE_SIN_ACTIVIDAD_TENDENCIA = None
+TARGETS_FILAS_BLOQUE = 262144      # Filas por bloque en la pasada de construir_targets
+
+# Origen de los bordes de nivel_riesgo y hotspot_critico (utils.umbrales_targets):
+# - 'fijo': BINS_NIVEL_RIESGO y UMBRAL_HOTSPOT para todo delito y resolución
+# - 'cuantiles': por delito y tamaño de grid, cuantiles de los conteos semanales
+#   (celdas×semana con denuncias) de las semanas de train
+MODO_UMBRALES_TARGETS = 'fijo'
+CUANTILES_NIVEL_RIESGO = (0.50, 0.80, 0.95)  # Bordes Bajo | Medio | Alto | Muy Alto
+CUANTIL_HOTSPOT = 0.95                       # Hotspot crítico: por encima de este cuantil
+UMBRALES_DIR = 'data/umbrales'               # Sketches de conteos por delito y grid
+
 # ============================================================================
 # MODELOS DE CLASIFICACIÓN (7 ALGORITMOS)
 # ============================================================================
@@ -99,22 +121,146 @@ HIPERPARAMETROS_CLASIFICACION = {
     }
 }
 
+# ============================================================================
+# EXTRACCIÓN DE DATOS
+# ============================================================================
+
+DEPARTAMENTO = 'LIMA'              # Departamento del hecho a extraer
+FECHA_INICIO_DATOS = '2020-01-01'  # Inicio de la ventana de consulta
+AGREGACION_EN_SQL = False          # True: MySQL devuelve conteos celda×semana ya agregados
+STREAMING_CHUNK_SIZE = 50000       # Filas por página en la lectura paginada por id
+EXTRACCION_PARALELA = False        # True: extraer por particiones de fecha en paralelo
+PARTICION_EXTRACCION = 'MS'        # Frecuencia pandas ('MS' = mensual, 'QS', 'YS') o N particiones (int)
+EXTRACCION_WORKERS = 4             # Hilos concurrentes (≤ DB_POOL_SIZE + DB_MAX_OVERFLOW)
+
+# ============================================================================
+# ESQUEMA COMPACTO DE INGESTA
+# ============================================================================
+
+COMPACTAR_TIPOS = True             # Aplicar el esquema compacto al cargar los datos
+TIPO_COORDENADAS = 'float64'       # lat/long; 'float32' ahorra memoria pero cambia de celda los puntos junto a los bordes
+TIPO_FECHA = 'datetime64[s]'       # fecha_hora_hecho (resolución de segundos)
+COLUMNAS_CATEGORICAS = [           # Texto de baja cardinalidad → pandas Categorical
+    'modalidad_hecho', 'departamento_hecho', 'provincia_hecho', 'distrito_hecho',
+    'turno_hecho', 'periodo_dia', 'tipo_via_hecho'
+]
+
+# ============================================================================
+# BACKEND DE ALMACENAMIENTO Y POOL DE CONEXIONES
+# ============================================================================
+
+# 'mysql' (servidor con credenciales en .env) o 'sqlite' (archivo local embebido,
+# construido con scripts/importar_denuncias_local.py). La variable de entorno
+# DENUNCIAS_BACKEND tiene prioridad sobre este valor.
+DB_BACKEND = 'mysql'
+SQLITE_PATH = 'data/denuncias.sqlite'  # Override: DENUNCIAS_SQLITE_PATH
+
+
+DB_POOL_SIZE = 5             # Conexiones persistentes del pool del proceso
+DB_MAX_OVERFLOW = 10         # Conexiones extra permitidas en picos
+DB_POOL_TIMEOUT_SEG = 30     # Espera máxima por una conexión libre
+DB_POOL_RECYCLE_SEG = 1800   # Reciclar conexiones antes del wait_timeout de MySQL
+
+# ============================================================================
+# CACHÉ LOCAL DE SNAPSHOTS (PARQUET)
+# ============================================================================
+
+CACHE_DIR = 'data/cache'   # Directorio de snapshots columnares
+CACHE_TTL_HORAS = 24       # Antigüedad máxima de un snapshot antes de re-consultar MySQL
+CACHE_MAX_MB = 512         # Tamaño máximo del caché (se desalojan los menos usados)
+
+# ============================================================================
+# FEATURE STORE (MATRICES DE ENTRENAMIENTO PREPARADAS)
+# ============================================================================
+
+USAR_FEATURE_STORE = True               # preparar_datos_completo reutiliza matrices ya preparadas
+FEATURE_STORE_DIR = 'data/feature_store'
+FEATURE_STORE_TTL_HORAS = 24            # Igual que el caché: luego se vuelve a extraer y preparar
+
+# ============================================================================
+# EXTRACCIÓN INCREMENTAL (WATERMARK)
+# ============================================================================
+
+INCREMENTAL_DIR = 'data/incremental'  # Dataset local acumulado + watermark por delito
+INCREMENTAL_LOOKBACK_DIAS = 14        # Ventana de re-lectura para correcciones tardías
+
+# ============================================================================
+# DATOS SINTÉTICOS (BENCHMARKS DE ESCALA)
+# ============================================================================
+
+# Caja de Lima Metropolitana (lat_min, lat_max, long_min, long_max)
+LIMA_BBOX = (-12.30, -11.75, -77.15, -76.75)
+SINTETICOS_FECHA_INICIO = '2020-01-01'
+SINTETICOS_FECHA_FIN = '2025-01-20'
+
+# Proporción de modalidades en Lima (aprox.); se reemplaza por la mezcla real
+# de la base de datos con --mezcla-desde-bd
+MEZCLA_MODALIDADES_SINTETICAS = {
+    'HURTO': 0.40,
+    'ROBO AGRAVADO': 0.22,
+    'HURTO AGRAVADO': 0.12,
+    'EXTORSION': 0.06,
+    'ROBO': 0.06,
+    'ESTAFA': 0.05,
+    'LESIONES': 0.05,
+    'MICROCOMERCIALIZACION DE DROGAS': 0.04
+}
+
 # ============================================================================
 # CONFIGURACIÓN DE FEATURES
 # ============================================================================
 
 GRID_SIZE = 0.005  # Tamaño de grid espacial (~555m × 555m)
+GRID_NIVELES = [0.0025, 0.005, 0.01, 0.02]  # Pirámide multi-resolución (múltiplos enteros del menor)
 NUM_LAGS = 4       # Número de lags temporales
 TRAIN_TEST_SPLIT = 0.8  # Proporción de datos para entrenamiento
 
-FEATURE_COLS = [
-    'crime_count_lag_1',
-    'crime_count_lag_2',
-    'crime_count_lag_3',
-    'crime_count_lag_4',
+# Tensor celda×semana: 'denso' (ndarray), 'disperso' (scipy.sparse CSR) o 'auto'
+BACKEND_TENSOR = 'auto'
+DENSIDAD_MINIMA_DENSO = 0.05  # Con 'auto', por debajo de esta densidad se usa el disperso
+
+# Features temporales de cada celda (utils.feature_engineering.construir_features).
+# Todas usan solo semanas anteriores a la semana a predecir.
+ESPEC_FEATURES = {
+    'lag': list(range(1, NUM_LAGS + 1)),  # crime_count_lag_k: conteo de la semana t-k
+    'media_movil': [],       # crime_count_media_k: promedio de las k semanas previas
+    'std_movil': [],         # crime_count_std_k: desviación estándar (ddof=1) de las k semanas previas
+    'max_movil': [],         # crime_count_max_k: máximo de las k semanas previas
+    'ewma': [],              # crime_count_ewma_s: media exponencial de la historia (span s)
+    'año_anterior': False,   # crime_count_año_anterior: la misma semana 52 semanas antes
+    'acumulado': False       # crime_count_acumulado: total de denuncias previas de la celda
+}
+
+FEATURE_COLS_TEMPORALES = (
+    [f'crime_count_lag_{k}' for k in ESPEC_FEATURES['lag']]
+    + [f'crime_count_media_{k}' for k in ESPEC_FEATURES['media_movil']]
+    + [f'crime_count_std_{k}' for k in ESPEC_FEATURES['std_movil']]
+    + [f'crime_count_max_{k}' for k in ESPEC_FEATURES['max_movil']]
+    + [f'crime_count_ewma_{s}' for s in ESPEC_FEATURES['ewma']]
+    + (['crime_count_año_anterior'] if ESPEC_FEATURES['año_anterior'] else [])
+    + (['crime_count_acumulado'] if ESPEC_FEATURES['acumulado'] else [])
+)
+FEATURES_FILAS_BLOQUE = 4096  # Celdas por bloque en la pasada de construir_features
+
+# Las columnas de calendario ('mes', 'semana_año', 'perfil_dia_0'..'perfil_dia_6')
+# salen de utils.semanas.calendario_semanas, una fila por semana. El perfil por
+# día se mide dentro de la propia semana a predecir, por eso no va por defecto.
+FEATURE_COLS = FEATURE_COLS_TEMPORALES + [
     'mes',
-    'dia_semana'
+    'semana_año'
+]
+
+# Features de vecinos: promedio ponderado por distancia de las celdas vecinas
+# (ventanas lado×lado sin la celda central) para cada lag
+USAR_FEATURES_VECINOS = False
+VECINOS_LADOS = [3, 5]
+FEATURE_COLS_VECINOS = [
+    f'vecinos_{lado}x{lado}_lag_{lag}'
+    for lado in VECINOS_LADOS
+    for lag in range(1, NUM_LAGS + 1)
 ]
+if USAR_FEATURES_VECINOS:
+    FEATURE_COLS = FEATURE_COLS + FEATURE_COLS_VECINOS
 
 # ============================================================================
 # CONFIGURACIÓN DE OPTIMIZACIÓN
@@ -124,6 +270,19 @@ RANDOMIZED_SEARCH_ITERATIONS = 20
 CROSS_VALIDATION_FOLDS = 3
 RANDOM_STATE = 42
 
+# ============================================================================
+# ENTRENAMIENTO PARALELO
+# ============================================================================
+
+ENTRENAMIENTO_PARALELO = True      # True: un pool de procesos entrena los trabajos (delito, tipo, modelo)
+ENTRENAMIENTO_WORKERS = None       # Tope de procesos del pool (None = según PRESUPUESTO_CPU)
+ENTRENAMIENTO_MMAP_DIR = 'data/mmap_entrenamiento'  # .npy temporales para matrices que no vienen del feature store
+
+# Núcleos totales del entrenamiento (None = os.cpu_count()), repartidos entre
+# procesos del pool, n_jobs de la búsqueda, n_jobs del estimador e hilos BLAS
+# (utils.presupuesto_cpu); ninguno de los niveles usa n_jobs=-1
+PRESUPUESTO_CPU = None
+
 # ============================================================================
 # RUTAS DE SALIDA
 # ============================================================================
@@ -6,7 +6,11 @@ Implementación de 7 algoritmos de clasificación aplicados a 3 problemas.
 Total: 7 algoritmos × 3 clasificaciones × 2 delitos = 42 modelos
 """
 
+from contextlib import nullcontext
+
 import numpy as np
+from joblib import parallel_config
+from threadpoolctl import threadpool_limits
 from sklearn.linear_model import SGDClassifier, LogisticRegression
 from sklearn.ensemble import (
     RandomForestClassifier, GradientBoostingClassifier, AdaBoostClassifier
@@ -24,6 +28,7 @@ from config.config import (
     CROSS_VALIDATION_FOLDS, RANDOM_STATE
 )
 from utils.target_engineering import obtener_descripcion_target
+from utils.presupuesto_cpu import asignar_nucleos, nucleos_presupuesto
 
 
 def obtener_modelo_clasificacion(nombre_modelo):
@@ -47,8 +52,7 @@ def obtener_modelo_clasificacion(nombre_modelo):
         ),
         'random_forest': RandomForestClassifier(
             n_estimators=100, 
-            random_state=RANDOM_STATE, 
-            n_jobs=-1
+            random_state=RANDOM_STATE
         ),
         'gradient_boosting': GradientBoostingClassifier(
             n_estimators=100, 
@@ -68,7 +72,8 @@ def obtener_modelo_clasificacion(nombre_modelo):
     return modelos.get(nombre_modelo)
 
 
-def entrenar_modelo_clasificacion(nombre_modelo, tipo_clasificacion, X_train, y_train, X_test, y_test, optimizar=False):
+def entrenar_modelo_clasificacion(nombre_modelo, tipo_clasificacion, X_train, y_train, X_test, y_test,
+                                  optimizar=False, nucleos=None):
     """
     Entrena y evalúa un modelo de clasificación.
     
@@ -78,9 +83,11 @@ def entrenar_modelo_clasificacion(nombre_modelo, tipo_clasificacion, X_train, y_
         X_train, y_train: Datos de entrenamiento
         X_test, y_test: Datos de prueba
         optimizar: Si True, usa RandomizedSearchCV
+        nucleos: Núcleos del trabajo, repartidos entre búsqueda, estimador y
+            BLAS (default: todo PRESUPUESTO_CPU, ver utils.presupuesto_cpu)
         
     Returns:
-        Dict con resultados del modelo
+        Dict con resultados del modelo (incluye la asignación de núcleos)
     """
     desc = obtener_descripcion_target(tipo_clasificacion)
     
@@ -91,34 +98,53 @@ def entrenar_modelo_clasificacion(nombre_modelo, tipo_clasificacion, X_train, y_
         raise ValueError(f"Modelo {nombre_modelo} no reconocido")
     
     mejores_params = None
+    buscar = optimizar and nombre_modelo in HIPERPARAMETROS_CLASIFICACION
     
-    # Optimización de hiperparámetros
-    if optimizar and nombre_modelo in HIPERPARAMETROS_CLASIFICACION:
+    if buscar:
         param_grid = HIPERPARAMETROS_CLASIFICACION[nombre_modelo]
-        
         n_iter = min(RANDOMIZED_SEARCH_ITERATIONS, len(list(param_grid.values())[0]) * 3)
+    
+    # Repartir los núcleos del trabajo entre búsqueda, estimador y BLAS
+    asignacion = asignar_nucleos(
+        nombre_modelo, nucleos or nucleos_presupuesto(),
+        n_iter * CROSS_VALIDATION_FOLDS if buscar else 0
+    )
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=asignacion['n_jobs_estimador'])
+    
+    with threadpool_limits(limits=asignacion['hilos_blas']):
+        # Optimización de hiperparámetros
+        if buscar:
+            search = RandomizedSearchCV(
+                model,
+                param_grid,
+                n_iter=n_iter,
+                cv=CROSS_VALIDATION_FOLDS,
+                scoring='f1_weighted',
+                n_jobs=asignacion['n_jobs_busqueda'],
+                random_state=RANDOM_STATE,
+                refit=False,
+                verbose=0
+            )
+            
+            # Los workers loky de la búsqueda no heredan threadpool_limits: se
+            # acota su BLAS aquí. Fuera de la búsqueda no se fija backend, así
+            # n_jobs del estimador sigue con hilos sobre las matrices mmap.
+            limites_busqueda = (
+                parallel_config(backend='loky', inner_max_num_threads=asignacion['hilos_blas'])
+                if asignacion['n_jobs_busqueda'] > 1 else nullcontext()
+            )
+            with limites_busqueda:
+                search.fit(X_train, y_train)
+            mejores_params = search.best_params_
+            model.set_params(**mejores_params)
+            
+            print(f"         [OPTIMIZADO] Mejores params: {mejores_params}")
         
-        search = RandomizedSearchCV(
-            model,
-            param_grid,
-            n_iter=n_iter,
-            cv=CROSS_VALIDATION_FOLDS,
-            scoring='f1_weighted',
-            n_jobs=-1,
-            random_state=RANDOM_STATE,
-            verbose=0
-        )
-        
-        search.fit(X_train, y_train)
-        model = search.best_estimator_
-        mejores_params = search.best_params_
-        
-        print(f"         [OPTIMIZADO] Mejores params: {mejores_params}")
-    else:
         model.fit(X_train, y_train)
-    
-    # Predecir
-    y_pred = model.predict(X_test)
+        
+        # Predecir
+        y_pred = model.predict(X_test)
     
     # Métricas
     acc = accuracy_score(y_test, y_pred)
@@ -144,7 +170,8 @@ def entrenar_modelo_clasificacion(nombre_modelo, tipo_clasificacion, X_train, y_
         'mejores_params': mejores_params,
         'interpretacion': interpretacion,
         'confusion_matrix': confusion_matrix(y_test, y_pred),
-        'model_obj': model
+        'model_obj': model,
+        **asignacion
     }
 
 
@@ -1,37 +1,19 @@
-import os
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, OneHotEncoder, StandardScaler
 from sklearn.compose import ColumnTransformer
-from sqlalchemy import create_engine
-from dotenv import load_dotenv
+
+from utils.acceso_datos import obtener_engine
 
 def get_db_connection():
     """
-    Crea y retorna una conexión de SQLAlchemy a la base de datos.
+    Retorna el Engine de SQLAlchemy compartido del proceso.
     Lee las credenciales desde el archivo .env.
-    """
-    load_dotenv()
-    db_user = os.getenv("MYSQL_USER")
-    db_password = os.getenv("MYSQL_PASSWORD")
-    db_host = os.getenv("MYSQL_HOST")
-    db_name = os.getenv("MYSQL_DB")
-
-    if not all([db_user, db_password, db_host, db_name]):
-        print("Error: Faltan variables de entorno para la base de datos en el archivo .env")
-        return None
 
-    try:
-        connection_string = f"mysql+mysqlconnector://{db_user}:{db_password}@{db_host}/{db_name}"
-        engine = create_engine(connection_string)
-        # Probar la conexión
-        connection = engine.connect()
-        connection.close()
-        print("Conexión a la base de datos exitosa.")
-        return engine
-    except Exception as e:
-        print(f"Error al conectar a la base de datos: {e}")
-        return None
+    Se mantiene por compatibilidad: delega en utils.acceso_datos.obtener_engine,
+    que crea el pool una sola vez y lo reutiliza en cada llamada.
+    """
+    return obtener_engine()
 
 def get_preprocessed_data(test_size=0.2, random_state=42):
     """
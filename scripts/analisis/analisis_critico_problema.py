@@ -12,7 +12,6 @@ PREGUNTAS CRÍTICAS:
 5. ¿Qué problema tiene el MAYOR impacto operacional real?
 """
 
-import os
 import sys
 from pathlib import Path
 # Agregar raíz del proyecto al path para imports
@@ -22,12 +21,19 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from scipy import stats
-from dotenv import load_dotenv
 import warnings
 warnings.filterwarnings('ignore')
 
+from config.config import STREAMING_CHUNK_SIZE
+from utils.acceso_datos import obtener_engine, consultar_df, consultar_chunks
+from utils.lectura_streaming import AgregadorConteos
+from utils.data_preparation import extraer_datos_modalidades
+from utils.grid import codificar_celda
+from utils.semanas import semana_ordinal
+from utils.esquema_ingesta import compactar_tipos
+
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
 
@@ -36,15 +42,10 @@ print("ANÁLISIS CRÍTICO Y DESTRUCTIVO DEL PROBLEMA")
 print("="*80)
 print("\n⚠️  OBJETIVO: Determinar si estás trabajando en el problema CORRECTO\n")
 
-# Conexión
-load_dotenv()
-db_user = os.getenv("MYSQL_USER")
-db_password = os.getenv("MYSQL_PASSWORD")
-db_host = os.getenv("MYSQL_HOST")
-db_name = os.getenv("MYSQL_DB")
-
-connection_string = f"mysql+mysqlconnector://{db_user}:{db_password}@{db_host}/{db_name}"
-engine = create_engine(connection_string)
+# Conexión (pool compartido del proceso)
+engine = obtener_engine()
+if engine is None:
+    sys.exit(1)
 
 # ============================================================================
 # 1. ANÁLISIS DE TODOS LOS DELITOS - ¿ES ROBO AGRAVADO EL MEJOR?
@@ -73,7 +74,7 @@ query_delitos_lima = text("""
 """)
 
 print("\nCargando estadísticas de TODOS los delitos en Lima...")
-df_delitos = pd.read_sql(query_delitos_lima, engine)
+df_delitos = consultar_df(query_delitos_lima)
 
 print(f"\n🔍 Top 20 Delitos en Lima (con coordenadas válidas):")
 print(f"{'#':<4} {'Delito':<50} {'Total':>10} {'Días':>8} {'Locs':>8} {'Promedio/día':>12}")
@@ -99,22 +100,13 @@ top_delitos = df_delitos.head(10)['modalidad_hecho'].tolist()
 
 resultados_delitos = []
 
+# Un solo escaneo de `denuncias` para los 5 delitos, particionado en memoria
+datos_top = extraer_datos_modalidades(top_delitos[:5], fecha_inicio=None)
+
 for delito in top_delitos[:5]:  # Analizar top 5 para no saturar
     print(f"\n📊 Analizando: {delito}")
 
-    query_delito = text(f"""
-        SELECT
-            lat_hecho,
-            long_hecho,
-            fecha_hora_hecho
-        FROM denuncias
-        WHERE departamento_hecho = 'LIMA'
-            AND modalidad_hecho = :delito
-            AND lat_hecho IS NOT NULL
-            AND long_hecho IS NOT NULL
-    """)
-
-    df_d = pd.read_sql(query_delito, engine, params={'delito': delito})
+    df_d = datos_top[delito].copy()
 
     # Coordenadas
     df_d['lat_hecho'] = pd.to_numeric(df_d['lat_hecho'], errors='coerce')
@@ -123,8 +115,7 @@ for delito in top_delitos[:5]:  # Analizar top 5 para no saturar
 
     # Grid
     grid_size = 0.005
-    df_d['grid_cell'] = ((df_d['lat_hecho'] // grid_size) * grid_size).astype(str) + '_' + \
-                        ((df_d['long_hecho'] // grid_size) * grid_size).astype(str)
+    df_d['grid_cell'] = codificar_celda(df_d['lat_hecho'], df_d['long_hecho'], grid_size)
 
     crimes_per_cell = df_d.groupby('grid_cell').size()
 
@@ -140,8 +131,8 @@ for delito in top_delitos[:5]:  # Analizar top 5 para no saturar
 
     # Temporal
     df_d['fecha'] = pd.to_datetime(df_d['fecha_hora_hecho'])
-    df_d['año_semana'] = df_d['fecha'].dt.strftime('%Y-%U')
-    crimes_per_week = df_d.groupby('año_semana').size()
+    df_d['semana_id'] = semana_ordinal(df_d['fecha'])
+    crimes_per_week = df_d.groupby('semana_id').size()
 
     autocorr_1 = crimes_per_week.autocorr(lag=1) if len(crimes_per_week) > 1 else 0
 
@@ -199,6 +190,7 @@ print("\n🎯 Targets alternativos a considerar:")
 # Cargar datos de Robo Agravado para análisis
 query_robo = text("""
     SELECT
+        id,
         fecha_hora_hecho,
         turno_hecho,
         periodo_dia,
@@ -211,13 +203,26 @@ query_robo = text("""
         AND modalidad_hecho = 'ROBO AGRAVADO'
         AND lat_hecho IS NOT NULL
         AND long_hecho IS NOT NULL
-    LIMIT 65000
 """)
 
-df_robo = pd.read_sql(query_robo, engine)
-df_robo['fecha'] = pd.to_datetime(df_robo['fecha_hora_hecho'])
-df_robo['hora'] = df_robo['fecha'].dt.hour
-df_robo['dia_semana'] = df_robo['fecha'].dt.dayofweek
+# Lectura en streaming: se acumulan conteos por chunk en lugar de cargar todas
+# las filas (antes se limitaba a LIMIT 65000 para no saturar la memoria)
+COLUMNAS_PERFIL = ['hora', 'turno_hecho', 'periodo_dia', 'distrito_hecho', 'tipo_via_hecho']
+conteos_robo = {col: pd.Series(dtype='int64') for col in COLUMNAS_PERFIL}
+agregador_robo = AgregadorConteos()
+total_robo = 0
+
+for chunk in consultar_chunks(query_robo, chunksize=STREAMING_CHUNK_SIZE):
+    compactar_tipos(chunk, reportar=agregador_robo.chunks == 0)
+    chunk['hora'] = chunk['fecha_hora_hecho'].dt.hour
+    for col in COLUMNAS_PERFIL:
+        conteos_robo[col] = conteos_robo[col].add(chunk[col].value_counts(), fill_value=0)
+    agregador_robo.actualizar(chunk[['lat_hecho', 'long_hecho', 'fecha_hora_hecho']].copy())
+    total_robo += len(chunk)
+
+conteos_robo = {col: serie.astype('int64').sort_values(ascending=False)
+                for col, serie in conteos_robo.items()}
+print(f"\n   {total_robo:,} casos de Robo Agravado leídos en {agregador_robo.chunks} chunks")
 
 print("\n1️⃣  TARGET ACTUAL: Cantidad de crímenes (regresión)")
 print("   Ventajas:")
@@ -238,25 +243,12 @@ print("     ✓ Métricas: AUC-ROC, Precision, Recall")
 print("   Desventajas:")
 print("     ❌ Pierde información cuantitativa")
 
-# Analizar balance de este target
-df_robo['grid_cell'] = ((df_robo['lat_hecho'] // 0.005) * 0.005).astype(str) + '_' + \
-                       ((df_robo['long_hecho'] // 0.005) * 0.005).astype(str)
-df_robo['año_semana'] = df_robo['fecha'].dt.strftime('%Y-%U')
-
-# Crear grid completo
-unique_cells = df_robo['grid_cell'].unique()
-unique_weeks = df_robo['año_semana'].unique()
-grid_semanas = pd.DataFrame([(c, w) for c in unique_cells for w in unique_weeks],
-                            columns=['grid_cell', 'año_semana'])
-
-crimes_binary = df_robo.groupby(['grid_cell', 'año_semana']).size().reset_index(name='count')
-crimes_binary['has_crime'] = 1
-
-grid_full = grid_semanas.merge(crimes_binary[['grid_cell', 'año_semana', 'has_crime']],
-                               on=['grid_cell', 'año_semana'], how='left')
-grid_full['has_crime'] = grid_full['has_crime'].fillna(0)
+# Analizar balance de este target: pares celda×semana con crimen sobre el grid completo
+crimes_binary, _ = agregador_robo.resultado()
+total_pares = crimes_binary['grid_cell'].nunique() * crimes_binary['semana_id'].nunique()
+pct_con_crimen = len(crimes_binary) / total_pares if total_pares else 0
 
-balance = grid_full['has_crime'].value_counts(normalize=True)
+balance = pd.Series({0: 1 - pct_con_crimen, 1: pct_con_crimen})
 print(f"\n   Balance de clases:")
 print(f"     Sin crimen (0): {balance.get(0, 0)*100:.1f}%")
 print(f"     Con crimen (1): {balance.get(1, 0)*100:.1f}%")
@@ -277,14 +269,14 @@ print("\n4️⃣  ALTERNATIVA 3: Hora del día de mayor riesgo (clasificación)"
 print("   Target: ¿En qué franja horaria es más probable el crimen?")
 
 # Distribución horaria
-dist_hora = df_robo['hora'].value_counts(normalize=True).sort_index()
+dist_hora = (conteos_robo['hora'] / conteos_robo['hora'].sum()).sort_index()
 hora_pico = dist_hora.idxmax()
 print(f"\n   Distribución horaria:")
 print(f"     Hora pico: {hora_pico}:00 ({dist_hora.max()*100:.1f}% de casos)")
 
-franjas = pd.cut(df_robo['hora'], bins=[0, 6, 12, 18, 24],
+franjas = pd.cut(dist_hora.index, bins=[0, 6, 12, 18, 24],
                  labels=['Madrugada', 'Mañana', 'Tarde', 'Noche'], include_lowest=True)
-dist_franjas = franjas.value_counts(normalize=True)
+dist_franjas = dist_hora.groupby(franjas, observed=False).sum().sort_values(ascending=False)
 print(f"\n   Por franja:")
 for franja, pct in dist_franjas.items():
     print(f"     {franja}: {pct*100:.1f}%")
@@ -314,37 +306,37 @@ print("="*80)
 print("\n📋 Variables disponibles pero NO usadas en el modelo actual:")
 
 # Turno
-if df_robo['turno_hecho'].notna().sum() > 0:
-    dist_turno = df_robo['turno_hecho'].value_counts()
-    print(f"\n1. TURNO_HECHO (disponibilidad: {df_robo['turno_hecho'].notna().sum()/len(df_robo)*100:.1f}%)")
+if conteos_robo['turno_hecho'].sum() > 0:
+    dist_turno = conteos_robo['turno_hecho']
+    print(f"\n1. TURNO_HECHO (disponibilidad: {conteos_robo['turno_hecho'].sum()/total_robo*100:.1f}%)")
     for turno, count in dist_turno.head(5).items():
-        print(f"     {turno}: {count:,} ({count/len(df_robo)*100:.1f}%)")
+        print(f"     {turno}: {count:,} ({count/total_robo*100:.1f}%)")
     print("   💡 Potencial: ALTO - Podría mejorar predicción de hora/franja")
 
 # Período del día
-if df_robo['periodo_dia'].notna().sum() > 0:
-    dist_periodo = df_robo['periodo_dia'].value_counts()
-    print(f"\n2. PERIODO_DIA (disponibilidad: {df_robo['periodo_dia'].notna().sum()/len(df_robo)*100:.1f}%)")
+if conteos_robo['periodo_dia'].sum() > 0:
+    dist_periodo = conteos_robo['periodo_dia']
+    print(f"\n2. PERIODO_DIA (disponibilidad: {conteos_robo['periodo_dia'].sum()/total_robo*100:.1f}%)")
     for periodo, count in dist_periodo.head(5).items():
-        print(f"     {periodo}: {count:,} ({count/len(df_robo)*100:.1f}%)")
+        print(f"     {periodo}: {count:,} ({count/total_robo*100:.1f}%)")
     print("   💡 Potencial: ALTO - Complementa turno")
 
 # Distrito
-if df_robo['distrito_hecho'].notna().sum() > 0:
-    dist_distrito = df_robo['distrito_hecho'].value_counts()
-    print(f"\n3. DISTRITO_HECHO (disponibilidad: {df_robo['distrito_hecho'].notna().sum()/len(df_robo)*100:.1f}%)")
+if conteos_robo['distrito_hecho'].sum() > 0:
+    dist_distrito = conteos_robo['distrito_hecho']
+    print(f"\n3. DISTRITO_HECHO (disponibilidad: {conteos_robo['distrito_hecho'].sum()/total_robo*100:.1f}%)")
     print(f"   Top 5 distritos:")
     for distrito, count in dist_distrito.head(5).items():
-        print(f"     {distrito}: {count:,} ({count/len(df_robo)*100:.1f}%)")
+        print(f"     {distrito}: {count:,} ({count/total_robo*100:.1f}%)")
     print("   💡 Potencial: MEDIO - Ya capturado implícitamente por grid, pero útil para features")
 
 # Tipo de vía
-if df_robo['tipo_via_hecho'].notna().sum() > 0:
-    dist_via = df_robo['tipo_via_hecho'].value_counts()
-    print(f"\n4. TIPO_VIA_HECHO (disponibilidad: {df_robo['tipo_via_hecho'].notna().sum()/len(df_robo)*100:.1f}%)")
+if conteos_robo['tipo_via_hecho'].sum() > 0:
+    dist_via = conteos_robo['tipo_via_hecho']
+    print(f"\n4. TIPO_VIA_HECHO (disponibilidad: {conteos_robo['tipo_via_hecho'].sum()/total_robo*100:.1f}%)")
     print(f"   Top 5 tipos de vía:")
     for via, count in dist_via.head(5).items():
-        print(f"     {via}: {count:,} ({count/len(df_robo)*100:.1f}%)")
+        print(f"     {via}: {count:,} ({count/total_robo*100:.1f}%)")
     print("   💡 Potencial: MEDIO - Avenidas vs calles vs parques")
 
 # ============================================================================
@@ -355,13 +347,13 @@ print("4. ¿ES 'LIMA COMPLETO' EL SCOPE ÓPTIMO?")
 print("="*80)
 
 # Top distritos por volumen
-top_distritos = df_robo['distrito_hecho'].value_counts().head(10)
+top_distritos = conteos_robo['distrito_hecho'].head(10)
 
 print(f"\n📍 Top 10 Distritos por volumen de Robo Agravado:")
 print(f"{'#':<4} {'Distrito':<30} {'Total':>10} {'% Lima':>10}")
 print("-" * 60)
 for idx, (distrito, count) in enumerate(top_distritos.items(), 1):
-    pct = count / len(df_robo) * 100
+    pct = count / total_robo * 100
     print(f"{idx:<4} {str(distrito)[:28]:<30} {count:>10,} {pct:>9.1f}%")
 
 print("\n💡 Alternativa: Enfocarse en UN distrito de alto impacto")
@@ -11,7 +11,6 @@ CONSIDERACIONES CRÍTICAS:
 4. Relevancia socio-política actual en Perú
 """
 
-import os
 import sys
 from pathlib import Path
 # Agregar raíz del proyecto al path para imports
@@ -21,12 +20,16 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from scipy import stats
-from dotenv import load_dotenv
 import warnings
 warnings.filterwarnings('ignore')
 
+from utils.acceso_datos import obtener_engine, consultar_df
+from utils.data_preparation import extraer_datos_modalidades
+from utils.grid import codificar_celda
+from utils.semanas import semana_ordinal
+
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
 
@@ -35,15 +38,10 @@ print("ANÁLISIS DE TENDENCIAS Y CONTEXTO - PERÚ 2020-2025")
 print("="*80)
 print("\n🎯 Identificar el delito MÁS RELEVANTE considerando tendencias actuales\n")
 
-# Conexión
-load_dotenv()
-db_user = os.getenv("MYSQL_USER")
-db_password = os.getenv("MYSQL_PASSWORD")
-db_host = os.getenv("MYSQL_HOST")
-db_name = os.getenv("MYSQL_DB")
-
-connection_string = f"mysql+mysqlconnector://{db_user}:{db_password}@{db_host}/{db_name}"
-engine = create_engine(connection_string)
+# Conexión (pool compartido del proceso)
+engine = obtener_engine()
+if engine is None:
+    sys.exit(1)
 
 # ============================================================================
 # 1. ANÁLISIS DE TENDENCIAS TEMPORALES
@@ -75,7 +73,7 @@ query_tendencias = text("""
 """)
 
 print("\nCargando tendencias anuales de delitos en Lima...")
-df_tendencias = pd.read_sql(query_tendencias, engine)
+df_tendencias = consultar_df(query_tendencias)
 
 # Calcular tendencia (pendiente de regresión lineal) para cada delito
 delitos_con_tendencia = []
@@ -195,7 +193,7 @@ query_extorsion = text("""
     ORDER BY año
 """)
 
-df_ext = pd.read_sql(query_extorsion, engine)
+df_ext = consultar_df(query_extorsion)
 print("\n   Evolución año por año:")
 for idx, row in df_ext.iterrows():
     if idx > 0:
@@ -241,26 +239,18 @@ print("="*80)
 
 resultados_final = []
 
-for delito in ['ROBO AGRAVADO', 'EXTORSION', 'HURTO', 'HURTO AGRAVADO']:
-    if delito not in delitos_a_analizar[:10]:
-        continue
+delitos_espaciales = [
+    delito for delito in ['ROBO AGRAVADO', 'EXTORSION', 'HURTO', 'HURTO AGRAVADO']
+    if delito in delitos_a_analizar[:10]
+]
+
+# Un solo escaneo de `denuncias` (2023+) para todos los candidatos
+datos_espaciales = extraer_datos_modalidades(delitos_espaciales, fecha_inicio='2023-01-01')
 
+for delito in delitos_espaciales:
     print(f"\n📊 Analizando: {delito}")
 
-    query_espacial = text("""
-        SELECT
-            lat_hecho,
-            long_hecho,
-            fecha_hora_hecho
-        FROM denuncias
-        WHERE departamento_hecho = 'LIMA'
-            AND modalidad_hecho = :delito
-            AND lat_hecho IS NOT NULL
-            AND long_hecho IS NOT NULL
-            AND YEAR(fecha_hora_hecho) >= 2023
-    """)
-
-    df_d = pd.read_sql(query_espacial, engine, params={'delito': delito})
+    df_d = datos_espaciales[delito].copy()
 
     if len(df_d) < 1000:
         print(f"   ⚠️  Datos insuficientes ({len(df_d)} casos)")
@@ -272,8 +262,7 @@ for delito in ['ROBO AGRAVADO', 'EXTORSION', 'HURTO', 'HURTO AGRAVADO']:
 
     # Grid
     grid_size = 0.005
-    df_d['grid_cell'] = ((df_d['lat_hecho'] // grid_size) * grid_size).astype(str) + '_' + \
-                        ((df_d['long_hecho'] // grid_size) * grid_size).astype(str)
+    df_d['grid_cell'] = codificar_celda(df_d['lat_hecho'], df_d['long_hecho'], grid_size)
 
     crimes_per_cell = df_d.groupby('grid_cell').size()
 
@@ -285,8 +274,8 @@ for delito in ['ROBO AGRAVADO', 'EXTORSION', 'HURTO', 'HURTO AGRAVADO']:
 
     # Autocorrelación
     df_d['fecha'] = pd.to_datetime(df_d['fecha_hora_hecho'])
-    df_d['año_semana'] = df_d['fecha'].dt.strftime('%Y-%U')
-    crimes_per_week = df_d.groupby('año_semana').size()
+    df_d['semana_id'] = semana_ordinal(df_d['fecha'])
+    crimes_per_week = df_d.groupby('semana_id').size()
     autocorr = crimes_per_week.autocorr(lag=1) if len(crimes_per_week) > 1 else 0
 
     # Stats de tendencia
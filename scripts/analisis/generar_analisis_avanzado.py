@@ -27,11 +27,8 @@ import seaborn as sns
 from sklearn.metrics import roc_curve, auc, precision_recall_curve, average_precision_score
 import joblib
 import os
-import mysql.connector
-from dotenv import load_dotenv
 
-# Cargar variables de entorno
-load_dotenv()
+from utils.acceso_datos import obtener_engine, consultar_df
 
 # Configuración estética
 plt.style.use('seaborn-v0_8-darkgrid')
@@ -44,23 +41,12 @@ os.makedirs(FIGURES_DIR, exist_ok=True)
 
 
 def conectar_db():
-    """Conecta a la base de datos MySQL."""
-    try:
-        # Forzar TCP/IP en lugar de named pipe (Windows fix)
-        conn = mysql.connector.connect(
-            host=os.getenv('MYSQL_HOST', '127.0.0.1'),
-            port=int(os.getenv('MYSQL_PORT', 3306)),
-            user=os.getenv('MYSQL_USER', 'root'),
-            password=os.getenv('MYSQL_PASSWORD', '1234'),
-            database=os.getenv('MYSQL_DB', 'denuncias_peru'),
-            use_pure=True  # Fuerza TCP/IP en Windows
-        )
-        return conn
-    except Exception as e:
-        print(f"[ERROR] Conexión DB: {e}")
+    """Verifica la conexión a la base de datos (pool compartido del proceso)."""
+    engine = obtener_engine()
+    if engine is None:
         print(f"[INFO] Asegúrate de que MySQL esté corriendo en puerto 3306")
         print(f"[INFO] Comando: net start MySQL80 (o similar)")
-        return None
+    return engine
 
 
 def grafico_9_serie_temporal():
@@ -68,8 +54,7 @@ def grafico_9_serie_temporal():
     Gráfico 9: Serie Temporal de Crímenes 2020-2025
     Evolución mensual de HURTO y EXTORSIÓN.
     """
-    conn = conectar_db()
-    if not conn:
+    if conectar_db() is None:
         print("[SKIP] Figura 9: No hay conexión a DB")
         return
 
@@ -87,8 +72,7 @@ def grafico_9_serie_temporal():
     ORDER BY mes, modalidad_hecho
     """
 
-    df = pd.read_sql(query, conn)
-    conn.close()
+    df = consultar_df(query)
 
     # Convertir a datetime
     df['mes'] = pd.to_datetime(df['mes'] + '-01')
@@ -139,8 +123,7 @@ def grafico_10_top_hotspots_mapa():
     Gráfico 10: Top 10 Hotspots Críticos
     Scatterplot geográfico de las zonas más peligrosas.
     """
-    conn = conectar_db()
-    if not conn:
+    if conectar_db() is None:
         print("[SKIP] Figura 10: No hay conexión a DB")
         return
 
@@ -161,8 +144,7 @@ def grafico_10_top_hotspots_mapa():
     LIMIT 50
     """
 
-    df = pd.read_sql(query, conn)
-    conn.close()
+    df = consultar_df(query)
 
     fig, ax = plt.subplots(figsize=(12, 10))
 
@@ -319,8 +301,7 @@ def grafico_13_evolucion_mensual():
     Gráfico 13: Evolución Mensual de Delitos por Tipo
     Comparación año a año.
     """
-    conn = conectar_db()
-    if not conn:
+    if conectar_db() is None:
         print("[SKIP] Figura 13: No hay conexión a DB")
         return
 
@@ -338,8 +319,7 @@ def grafico_13_evolucion_mensual():
     ORDER BY modalidad_hecho, año, mes
     """
 
-    df = pd.read_sql(query, conn)
-    conn.close()
+    df = consultar_df(query)
 
     fig, axes = plt.subplots(1, 2, figsize=(18, 6))
 
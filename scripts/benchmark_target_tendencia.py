@@ -0,0 +1,113 @@
+"""
+Benchmark del Target de Tendencia
+=================================
+Compara crear_target_tendencia (sumas acumuladas segmentadas + np.digitize)
+con la implementación anterior (groupby().transform(lambda ...) + Series.apply)
+sobre un panel sintético celda×semana, y verifica que las etiquetas sean
+idénticas.
+
+Uso:
+    python scripts/benchmark_target_tendencia.py
+    python scripts/benchmark_target_tendencia.py --celdas 20000 --semanas 260 --repeticiones 3
+"""
+
+import sys
+import time
+import argparse
+from functools import partial
+from pathlib import Path
+# Agregar raíz del proyecto al path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from config.config import RANDOM_STATE, UMBRALES_TENDENCIA, VENTANA_TENDENCIA
+from utils.target_engineering import crear_target_tendencia
+
+
+def tendencia_groupby(df_completo, group_col='grid_cell', umbrales=UMBRALES_TENDENCIA,
+                      ventana=VENTANA_TENDENCIA):
+    """Implementación anterior, conservada como referencia."""
+    df_sorted = df_completo.sort_values([group_col, 'semana_id']).copy()
+    df_sorted['crime_promedio_historico'] = (
+        df_sorted.groupby(group_col)['crime_count']
+        .transform(lambda x: x.shift(1).rolling(window=ventana, min_periods=1).mean())
+    )
+    df_sorted['ratio'] = df_sorted['crime_count'] / (df_sorted['crime_promedio_historico'] + 0.1)
+
+    umbral_descenso, umbral_escalada = umbrales
+
+    def clasificar_tendencia(ratio):
+        if ratio < umbral_descenso:
+            return 0
+        elif ratio <= umbral_escalada:
+            return 1
+        else:
+            return 2
+
+    return df_sorted['ratio'].apply(clasificar_tendencia).values
+
+
+def panel_sintetico(celdas, semanas, semilla):
+    """Panel celda×semana desordenado, con intensidades heterogéneas por celda."""
+    rng = np.random.default_rng(semilla)
+    intensidad = rng.gamma(0.5, 2.0, size=celdas)
+    conteos = rng.poisson(np.repeat(intensidad, semanas))
+
+    df = pd.DataFrame({
+        'grid_cell': np.repeat(rng.choice(2**40, size=celdas, replace=False), semanas).astype('int64'),
+        'semana_id': np.tile(np.arange(2600, 2600 + semanas), celdas).astype('int64'),
+        'crime_count': conteos.astype('int64')
+    })
+    return df.sample(frac=1.0, random_state=semilla).reset_index(drop=True)
+
+
+def medir(funcion, df, repeticiones):
+    """Mejor tiempo de `repeticiones` corridas y el último resultado."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(df)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de crear_target_tendencia')
+    parser.add_argument('--celdas', type=int, default=5000)
+    parser.add_argument('--semanas', type=int, default=220)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--semilla', type=int, default=RANDOM_STATE)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BENCHMARK: TARGET DE TENDENCIA")
+    print("=" * 70)
+
+    print(f"\n[1] Generando panel {args.celdas:,} celdas × {args.semanas} semanas...")
+    df = panel_sintetico(args.celdas, args.semanas, args.semilla)
+    print(f"   {len(df):,} filas celda×semana")
+
+    print(f"\n[2] Implementación groupby + apply (mejor de {args.repeticiones})...")
+    t_groupby, y_groupby = medir(tendencia_groupby, df, args.repeticiones)
+    print(f"   {t_groupby:.2f} s")
+
+    print(f"\n[3] Implementación vectorizada (mejor de {args.repeticiones})...")
+    # Sin la regla opcional de semanas sin actividad: mismas etiquetas que la referencia
+    vectorizada = partial(crear_target_tendencia, clase_sin_actividad=None)
+    t_vectorizada, y_vectorizada = medir(vectorizada, df, args.repeticiones)
+    print(f"   {t_vectorizada:.2f} s")
+
+    print("\n[4] Verificando etiquetas...")
+    if not np.array_equal(y_groupby, y_vectorizada):
+        distintas = int((y_groupby != y_vectorizada).sum())
+        raise AssertionError(f"Las etiquetas difieren en {distintas:,} filas")
+    clases = np.bincount(y_vectorizada, minlength=3)
+    print(f"   Idénticas. Descenso={clases[0]:,}  Estable={clases[1]:,}  Escalada={clases[2]:,}")
+
+    print(f"\n   Speedup: {t_groupby / t_vectorizada:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,10 @@ Modelos implementados:
 - 2 delitos (HURTO y EXTORSIÓN)
 
 Total: 7 × 3 × 2 = 42 modelos de clasificación
+
+Con ENTRENAMIENTO_PARALELO los datos de todos los delitos se preparan primero
+y los 42 trabajos (delito, tipo, modelo) se reparten en un pool de procesos
+(utils.entrenamiento_paralelo).
 """
 
 import sys
@@ -16,38 +20,57 @@ from pathlib import Path
 # Agregar raíz del proyecto al path para imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
-from config.config import DELITOS, MODELOS_CLASIFICACION, TIPOS_CLASIFICACION
-from utils.data_preparation import preparar_datos_completo
+from config.config import (
+    DELITOS, MODELOS_CLASIFICACION, TIPOS_CLASIFICACION, GRID_SIZE, GRID_NIVELES, USAR_FEATURE_STORE,
+    ENTRENAMIENTO_PARALELO, ENTRENAMIENTO_WORKERS
+)
+from utils.data_preparation import preparar_datos_completo, preparar_datos_multinivel, extraer_datos_delitos
+from utils.feature_store import clave_datos_preparados, existen_datos_preparados
+from utils.entrenamiento_paralelo import entrenar_en_paralelo
 from models.classification_models import entrenar_modelo_clasificacion
 from utils.model_evaluation import (
     guardar_mejores_modelos, generar_resumen_resultados,
     mostrar_mejores_por_delito, generar_recomendaciones_operacionales,
-    guardar_resultados_csv, mostrar_cumplimiento_pc3
+    guardar_resultados_csv, mostrar_cumplimiento_pc3, mostrar_comparacion_niveles
 )
 
 
-def procesar_delito_completo(delito_key, optimizar_hiperparametros=False):
+def nombre_mejores_modelos(delito_key, grid_size):
+    """
+    Sufijo de los archivos best_<tipo>_<sufijo>.joblib de un delito y nivel.
+    """
+    return delito_key if grid_size == GRID_SIZE else f'{delito_key}_grid{grid_size}'
+
+
+def procesar_delito_completo(delito_key, optimizar_hiperparametros=False, df_puntos=None, datos=None):
     """
     Procesa un delito con TODOS los modelos de clasificación.
     
     Args:
         delito_key: Nombre del delito ('hurto', 'extorsion')
         optimizar_hiperparametros: Si True, busca mejores hiperparámetros
+        df_puntos: Puntos ya extraídos del delito (None = extraer desde MySQL)
+        datos: Datos ya preparados de un nivel del grid (ej: de
+            preparar_datos_multinivel); si se entrega, se omite la preparación
         
     Returns:
         Lista de resultados de todos los modelos
     """
     delito_sql = DELITOS[delito_key]
+    grid_size = datos['grid_size'] if datos is not None else GRID_SIZE
     
     print(f"\n{'='*80}")
-    print(f"PROCESANDO: {delito_sql}{' [CON OPTIMIZACIÓN]' if optimizar_hiperparametros else ''}")
+    print(f"PROCESANDO: {delito_sql} (grid {grid_size})"
+          f"{' [CON OPTIMIZACIÓN]' if optimizar_hiperparametros else ''}")
     print(f"{'='*80}")
     
     # 1. PREPARAR DATOS
-    datos = preparar_datos_completo(delito_key)
+    if datos is None:
+        datos = preparar_datos_completo(delito_key, df_puntos=df_puntos)
     if datos is None:
         return None
     
@@ -70,19 +93,23 @@ def procesar_delito_completo(delito_key, optimizar_hiperparametros=False):
         # Entrenar los 7 algoritmos para este tipo
         for modelo in MODELOS_CLASIFICACION:
             try:
+                inicio = time.time()
                 resultado = entrenar_modelo_clasificacion(
                     modelo, tipo_clf,
                     X_train, y_train, X_test, y_test,
                     optimizar=optimizar_hiperparametros
                 )
                 resultado['delito'] = delito_key
+                resultado['grid_size'] = grid_size
+                resultado['segundos_entrenamiento'] = time.time() - inicio
+                resultado['procesos_pool'] = 1
                 resultados.append(resultado)
             except Exception as e:
                 print(f"         [ERROR] {modelo}: {e}")
     
     # 3. GUARDAR MEJORES MODELOS
     print(f"\n[OK] {len(resultados)} modelos entrenados para {delito_sql}")
-    guardar_mejores_modelos(resultados, delito_key)
+    guardar_mejores_modelos(resultados, nombre_mejores_modelos(delito_key, grid_size))
     
     return resultados
 
@@ -137,24 +164,73 @@ def main():
     else:
         print("\n[INFO] Entrenamiento rápido con parámetros por defecto.")
     
-    # Procesar delitos
+    # Resolución del grid
+    print("\n¿Resolución del grid?")
+    print(f"  1. Solo {GRID_SIZE}° (por defecto)")
+    print(f"  2. Comparar niveles {GRID_NIVELES} (una extracción, {len(GRID_NIVELES)}× modelos)")
+    
+    opcion_grid = input("\nOpción (1/2): ").strip()
+    comparar_niveles = opcion_grid == '2'
+    
+    # Extraer en un solo escaneo los delitos seleccionados que no estén ya
+    # preparados en el feature store
+    delitos_seleccionados = [
+        delito_key for delito_key, activo in [('hurto', procesar_hurto), ('extorsion', procesar_extorsion)]
+        if activo
+    ]
+    niveles = GRID_NIVELES if comparar_niveles else [GRID_SIZE]
+    delitos_a_extraer = [
+        delito_key for delito_key in delitos_seleccionados
+        if not (USAR_FEATURE_STORE and all(
+            existen_datos_preparados(clave_datos_preparados(delito_key, grid_size))
+            for grid_size in niveles
+        ))
+    ]
+    puntos = extraer_datos_delitos(delitos_a_extraer) if delitos_a_extraer else {}
+    
+    # Preparar los datos de cada delito (y nivel del grid)
+    datos_por_clave = {}
+    
+    for delito_key in delitos_seleccionados:
+        df_puntos = puntos.get(delito_key) if puntos else None
+        
+        if comparar_niveles:
+            datos_niveles = preparar_datos_multinivel(delito_key, df_puntos=df_puntos) or {}
+            for grid_size, datos in datos_niveles.items():
+                datos_por_clave[(delito_key, grid_size)] = datos
+        else:
+            datos = preparar_datos_completo(delito_key, df_puntos=df_puntos)
+            if datos is not None:
+                datos_por_clave[(delito_key, GRID_SIZE)] = datos
+    
+    # Entrenar: todos los trabajos en un pool de procesos, o delito por delito
     todos_resultados = []
-    
-    if procesar_hurto:
-        resultados = procesar_delito_completo('hurto', optimizar_hiperparametros=optimizar)
-        if resultados:
-            todos_resultados.extend(resultados)
-    
-    if procesar_extorsion:
-        resultados = procesar_delito_completo('extorsion', optimizar_hiperparametros=optimizar)
-        if resultados:
-            todos_resultados.extend(resultados)
+    fallidos = []
+    
+    if ENTRENAMIENTO_PARALELO and datos_por_clave:
+        print("\n[6] Entrenando modelos de clasificación en paralelo...")
+        todos_resultados, fallidos = entrenar_en_paralelo(datos_por_clave, optimizar=optimizar,
+                                                          max_workers=ENTRENAMIENTO_WORKERS)
+        for delito_key, grid_size in datos_por_clave:
+            resultados = [r for r in todos_resultados
+                          if r['delito'] == delito_key and r['grid_size'] == grid_size]
+            print(f"\n[OK] {len(resultados)} modelos entrenados para {DELITOS[delito_key]} (grid {grid_size})")
+            guardar_mejores_modelos(resultados, nombre_mejores_modelos(delito_key, grid_size))
+    else:
+        for (delito_key, grid_size), datos in datos_por_clave.items():
+            resultados = procesar_delito_completo(
+                delito_key, optimizar_hiperparametros=optimizar, datos=datos
+            )
+            if resultados:
+                todos_resultados.extend(resultados)
     
     # RESUMEN FINAL
-    if todos_resultados:
-        df_resultados = generar_resumen_resultados(todos_resultados)
+    df_resultados = generar_resumen_resultados(todos_resultados, fallidos)
+    if df_resultados is not None:
         mostrar_mejores_por_delito(df_resultados)
         generar_recomendaciones_operacionales(df_resultados)
+        if comparar_niveles:
+            mostrar_comparacion_niveles(df_resultados)
         guardar_resultados_csv(df_resultados)
         mostrar_cumplimiento_pc3(len(df_resultados))
         
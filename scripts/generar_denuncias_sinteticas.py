@@ -0,0 +1,102 @@
+"""
+Generación de Denuncias Sintéticas para Benchmarks de Escala
+============================================================
+Escribe N denuncias sintéticas (Lima, focos espaciales, ciclos semanales y
+estacionales, mezcla de modalidades) en el backend local SQLite o en Parquet.
+
+Uso:
+    python scripts/generar_denuncias_sinteticas.py --filas 1000000
+    python scripts/generar_denuncias_sinteticas.py --filas 10000000 --destino parquet --salida data/sinteticos_10M.parquet
+    python scripts/generar_denuncias_sinteticas.py --filas 50000000 --semilla 7 --mezcla-desde-bd
+
+Para correr el pipeline sobre el SQLite generado:
+    DENUNCIAS_BACKEND=sqlite DENUNCIAS_SQLITE_PATH=data/sinteticos.sqlite python scripts/ejecutar_todos_modelos.py
+"""
+
+import sys
+import os
+import time
+import argparse
+from pathlib import Path
+# Agregar raíz del proyecto al path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config.config import RANDOM_STATE
+from utils.datos_sinteticos import GeneradorDenuncias, mezcla_modalidades_desde_bd
+from utils.backend_local import (
+    abrir_para_carga, crear_tabla_denuncias, normalizar_lote, insertar_lote, crear_indices
+)
+
+
+def escribir_sqlite(generador, total, ruta, tamano_lote):
+    """Escribe las denuncias en un archivo SQLite con el esquema e índices del backend local."""
+    conn = abrir_para_carga(ruta)
+    escritas = 0
+    try:
+        for i, lote in enumerate(generador.generar(total, tamano_lote)):
+            if i == 0:
+                crear_tabla_denuncias(conn, lote.columns)
+            escritas += insertar_lote(conn, normalizar_lote(lote))
+            conn.commit()
+            print(f"   {escritas:,} / {total:,} filas")
+        print("   Creando índices...")
+        crear_indices(conn)
+    finally:
+        conn.close()
+
+
+def escribir_parquet(generador, total, ruta, tamano_lote):
+    """Escribe las denuncias en un archivo Parquet, un row group por lote."""
+    escritor = None
+    escritas = 0
+    try:
+        for lote in generador.generar(total, tamano_lote):
+            tabla = pa.Table.from_pandas(lote, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(ruta, tabla.schema)
+            escritor.write_table(tabla)
+            escritas += len(lote)
+            print(f"   {escritas:,} / {total:,} filas")
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera denuncias sintéticas para benchmarks')
+    parser.add_argument('--filas', type=int, default=1000000, help='Número de denuncias a generar')
+    parser.add_argument('--semilla', type=int, default=RANDOM_STATE, help='Semilla del generador')
+    parser.add_argument('--destino', choices=['sqlite', 'parquet'], default='sqlite')
+    parser.add_argument('--salida', default=None, help='Archivo de salida')
+    parser.add_argument('--lote', type=int, default=500000, help='Filas por lote')
+    parser.add_argument('--mezcla-desde-bd', action='store_true',
+                        help='Usar la proporción real de modalidades de la base de datos')
+    args = parser.parse_args()
+
+    salida = args.salida or f"data/sinteticos.{'sqlite' if args.destino == 'sqlite' else 'parquet'}"
+    os.makedirs(os.path.dirname(salida) or '.', exist_ok=True)
+
+    mezcla = None
+    if args.mezcla_desde_bd:
+        mezcla = mezcla_modalidades_desde_bd()
+        if mezcla is None:
+            print("[INFO] No se pudo leer la mezcla real; se usa MEZCLA_MODALIDADES_SINTETICAS")
+
+    print(f"[1] Generando {args.filas:,} denuncias (semilla {args.semilla}) → {salida}")
+    inicio = time.time()
+
+    generador = GeneradorDenuncias(semilla=args.semilla, mezcla=mezcla)
+    if args.destino == 'sqlite':
+        escribir_sqlite(generador, args.filas, salida, args.lote)
+    else:
+        escribir_parquet(generador, args.filas, salida, args.lote)
+
+    duracion = time.time() - inicio
+    print(f"\n[OK] {args.filas:,} filas en {duracion:.1f}s ({args.filas / max(duracion, 1e-9):,.0f} filas/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Importación de Denuncias al Backend Local (SQLite)
+==================================================
+Construye el archivo SQLite embebido a partir de un export de la tabla
+`denuncias` (CSV o Parquet), con los tipos e índices que usa el pipeline.
+
+Uso:
+    python scripts/importar_denuncias_local.py export_denuncias.csv
+    python scripts/importar_denuncias_local.py export.parquet --salida data/denuncias.sqlite
+
+Luego, para ejecutar cualquier script sin MySQL:
+    DENUNCIAS_BACKEND=sqlite python scripts/ejecutar_todos_modelos.py
+"""
+
+import sys
+import os
+import time
+import argparse
+from pathlib import Path
+# Agregar raíz del proyecto al path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from config.config import SQLITE_PATH
+from utils.backend_local import (
+    abrir_para_carga, crear_tabla_denuncias, normalizar_lote, insertar_lote, crear_indices
+)
+
+
+def leer_export_por_lotes(ruta, tamano_lote):
+    """
+    Lee un export CSV o Parquet en lotes de `tamano_lote` filas.
+
+    Yields:
+        DataFrame por lote
+    """
+    if ruta.endswith('.parquet'):
+        archivo = pq.ParquetFile(ruta)
+        for lote in archivo.iter_batches(batch_size=tamano_lote):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(ruta, chunksize=tamano_lote, low_memory=False)
+
+
+def importar(ruta_export, ruta_salida=SQLITE_PATH, tamano_lote=100000):
+    """
+    Importa el export completo al archivo SQLite local.
+
+    Args:
+        ruta_export: Archivo CSV o Parquet con las columnas de `denuncias`
+        ruta_salida: Archivo SQLite a crear (se reemplaza la tabla si existe)
+        tamano_lote: Filas por lote de inserción
+
+    Returns:
+        Número de filas importadas
+    """
+    os.makedirs(os.path.dirname(ruta_salida) or '.', exist_ok=True)
+
+    print(f"[1] Importando '{ruta_export}' → '{ruta_salida}'")
+    inicio = time.time()
+
+    conn = abrir_para_carga(ruta_salida)
+    total = 0
+
+    try:
+        for i, lote in enumerate(leer_export_por_lotes(ruta_export, tamano_lote)):
+            if i == 0:
+                crear_tabla_denuncias(conn, lote.columns)
+            total += insertar_lote(conn, normalizar_lote(lote))
+            conn.commit()
+            print(f"   {total:,} filas importadas...")
+
+        print("[2] Creando índices...")
+        crear_indices(conn)
+    finally:
+        conn.close()
+
+    print(f"\n[OK] {total:,} filas en {time.time() - inicio:.1f}s")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Importa un export de denuncias a SQLite')
+    parser.add_argument('export', help='Archivo CSV o Parquet exportado de la tabla denuncias')
+    parser.add_argument('--salida', default=SQLITE_PATH, help='Archivo SQLite de destino')
+    parser.add_argument('--lote', type=int, default=100000, help='Filas por lote de inserción')
+    args = parser.parse_args()
+
+    importar(args.export, args.salida, args.lote)
+
+
+if __name__ == '__main__':
+    main()
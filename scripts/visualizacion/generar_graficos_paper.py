@@ -31,6 +31,8 @@ from sklearn.model_selection import learning_curve
 import joblib
 import os
 
+from config.config import FEATURE_COLS
+
 # Configuración estética
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
@@ -288,14 +290,7 @@ def grafico_6_importancia_features():
         modelo = joblib.load(f'{MODELS_DIR}/best_hotspot_critico_hurto.joblib')
 
         # Nombres de features
-        feature_names = [
-            'crime_count_lag_1',
-            'crime_count_lag_2',
-            'crime_count_lag_3',
-            'crime_count_lag_4',
-            'mes',
-            'dia_semana'
-        ]
+        feature_names = FEATURE_COLS
 
         # Si el modelo tiene feature_importances_
         if hasattr(modelo, 'feature_importances_'):
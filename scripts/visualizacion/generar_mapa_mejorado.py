@@ -14,14 +14,32 @@ import numpy as np
 import warnings
 warnings.filterwarnings('ignore')
 
+from config.config import GRID_SIZE
+
 # Configuración
 FIGURES_DIR = Path('figures')
 FIGURES_DIR.mkdir(exist_ok=True)
 
-def crear_mapa_hotspots_lima():
+def obtener_periodo_test(datos):
+    """
+    Filas de las semanas de test (desde datos['semana_corte']) con las coordenadas de cada celda.
+    """
+    from utils.grid import decodificar_celda
+
+    df_completo = datos['df_completo']
+    df_test = df_completo[df_completo['semana_id'] >= datos['semana_corte']].copy()
+    df_test['lat_grid'], df_test['long_grid'] = decodificar_celda(df_test['grid_cell'], datos['grid_size'])
+
+    return df_test
+
+
+def crear_mapa_hotspots_lima(grid_size=GRID_SIZE):
     """
     Crea mapa de hotspots con contexto geográfico usando contextily
     Vista ampliada para incluir Villa El Salvador, Chorrillos (sur) y distritos norte
+
+    Args:
+        grid_size: Nivel del grid (ej: un valor de GRID_NIVELES)
     """
     print("\n" + "="*60)
     print("GENERANDO MAPA MEJORADO DE HOTSPOTS - LIMA")
@@ -36,12 +54,12 @@ def crear_mapa_hotspots_lima():
         print("\n[1/5] Cargando datos de hotspots...")
         try:
             from utils.data_preparation import preparar_datos_completo
-            datos = preparar_datos_completo('hurto')
+            datos = preparar_datos_completo('hurto', grid_size=grid_size)
             if datos is None:
                 raise Exception("No se pudieron cargar datos")
 
             # Obtener top 50 hotspots del período test
-            df_test = datos['df_test']
+            df_test = obtener_periodo_test(datos)
             top_hotspots = df_test.groupby(['lat_grid', 'long_grid'])['crime_count'].sum().reset_index()
             top_hotspots = top_hotspots.nlargest(50, 'crime_count')
 
@@ -169,10 +187,13 @@ def crear_mapa_hotspots_lima():
         return False
 
 
-def crear_mapa_alternativo_contextily():
+def crear_mapa_alternativo_contextily(grid_size=GRID_SIZE):
     """
     Mapa alternativo también con contextily (OpenStreetMap)
     Vista ampliada para incluir todo Lima Metropolitana
+
+    Args:
+        grid_size: Nivel del grid (ej: un valor de GRID_NIVELES)
     """
     print("\n" + "="*60)
     print("GENERANDO MAPA ALTERNATIVO CON CONTEXTILY")
@@ -186,8 +207,8 @@ def crear_mapa_alternativo_contextily():
         print("\n[1/4] Cargando datos...")
         try:
             from utils.data_preparation import preparar_datos_completo
-            datos = preparar_datos_completo('hurto')
-            df_test = datos['df_test']
+            datos = preparar_datos_completo('hurto', grid_size=grid_size)
+            df_test = obtener_periodo_test(datos)
             top_hotspots = df_test.groupby(['lat_grid', 'long_grid'])['crime_count'].sum().reset_index()
             top_hotspots = top_hotspots.nlargest(50, 'crime_count')
         except:
@@ -14,6 +14,8 @@ import numpy as np
 import warnings
 warnings.filterwarnings('ignore')
 
+from config.config import GRID_SIZE
+
 # Configuración
 OUTPUT_DIR = Path('mapas_interactivos')
 OUTPUT_DIR.mkdir(exist_ok=True)
@@ -58,13 +60,14 @@ ZONAS_LIMA = {
 }
 
 
-def crear_mapa_interactivo_zona(delito_key, zona_key=None):
+def crear_mapa_interactivo_zona(delito_key, zona_key=None, grid_size=GRID_SIZE):
     """
     Crea mapa interactivo con Folium
 
     Args:
         delito_key: 'hurto' o 'extorsion'
         zona_key: 'norte', 'centro', 'sur', 'este', 'oeste' o None (mapa completo)
+        grid_size: Nivel del grid (ej: un valor de GRID_NIVELES)
     """
     try:
         import folium
@@ -95,7 +98,8 @@ def crear_mapa_interactivo_zona(delito_key, zona_key=None):
         print(f"[1/4] Cargando datos de {delito_nombre}...")
         try:
             from utils.data_preparation import preparar_datos_completo
-            datos = preparar_datos_completo(delito_key)
+            from utils.grid import decodificar_celda
+            datos = preparar_datos_completo(delito_key, grid_size=grid_size)
 
             if datos is None:
                 raise Exception("No se pudieron cargar datos")
@@ -103,8 +107,7 @@ def crear_mapa_interactivo_zona(delito_key, zona_key=None):
             df = datos['df_completo']
 
             # Extraer coordenadas
-            df['lat_grid'] = df['grid_cell'].str.split('_').str[0].astype(float)
-            df['long_grid'] = df['grid_cell'].str.split('_').str[1].astype(float)
+            df['lat_grid'], df['long_grid'] = decodificar_celda(df['grid_cell'], datos['grid_size'])
 
             # Filtrar por zona si aplica
             if lat_bounds:
@@ -187,14 +190,14 @@ def crear_mapa_interactivo_zona(delito_key, zona_key=None):
         # Añadir marcadores con clusters y áreas de cobertura
         print(f"[4/4] Agregando marcadores y áreas de cobertura...")
 
+        lado_m = round(grid_size * 111000)  # ~111 km por grado
+
         # Feature group para áreas de grid (VISIBLE por defecto)
-        grid_areas = folium.FeatureGroup(name='🟦 Áreas de Grid (~555m)', show=True)
+        grid_areas = folium.FeatureGroup(name=f'🟦 Áreas de Grid (~{lado_m}m)', show=True)
 
         # Markers sin cluster para que sean siempre visibles
         markers_layer = folium.FeatureGroup(name='📍 Marcadores Hotspots', show=True)
 
-        GRID_SIZE = 0.005  # Mismo que config.py
-
         for idx, row in top_hotspots.iterrows():
             # Determinar color según intensidad
             if row['crime_count'] > 1000:
@@ -213,13 +216,13 @@ def crear_mapa_interactivo_zona(delito_key, zona_key=None):
             # Calcular límites de la celda (área que representa el marcador)
             # IMPORTANTE: El grid_cell ya es la esquina inferior-izquierda
             lat_min = row['lat_grid']
-            lat_max = row['lat_grid'] + GRID_SIZE
+            lat_max = row['lat_grid'] + grid_size
             long_min = row['long_grid']
-            long_max = row['long_grid'] + GRID_SIZE
+            long_max = row['long_grid'] + grid_size
 
             # Centro de la celda
-            lat_center = lat_min + GRID_SIZE / 2
-            long_center = long_min + GRID_SIZE / 2
+            lat_center = lat_min + grid_size / 2
+            long_center = long_min + grid_size / 2
 
             # Popup con información MEJORADA
             popup_html = f"""
@@ -231,7 +234,7 @@ def crear_mapa_interactivo_zona(delito_key, zona_key=None):
                 <div style="background: #f0f0f0; padding: 10px; border-radius: 5px; margin-bottom: 10px;">
                     <p style="margin: 5px 0; font-size: 13px;">
                         <b>💡 Qué representa:</b><br>
-                        Esta celda es un área de <b>~555m × 555m</b> donde se concentran crímenes.
+                        Esta celda es un área de <b>~{lado_m}m × {lado_m}m</b> donde se concentran crímenes.
                     </p>
                 </div>
 
@@ -252,7 +255,7 @@ def crear_mapa_interactivo_zona(delito_key, zona_key=None):
                     </tr>
                     <tr>
                         <td style="padding: 5px;"><b>Tamaño Celda:</b></td>
-                        <td style="padding: 5px;">~555m × 555m</td>
+                        <td style="padding: 5px;">~{lado_m}m × {lado_m}m</td>
                     </tr>
                     <tr style="background: #e8f4f8;">
                         <td style="padding: 5px;"><b>Centro (lat):</b></td>
@@ -294,7 +297,7 @@ def crear_mapa_interactivo_zona(delito_key, zona_key=None):
                 popup=folium.Popup(
                     f"""<div style="font-family: Arial;">
                         <b>Área de Grid</b><br>
-                        Tamaño: ~555m × 555m<br>
+                        Tamaño: ~{lado_m}m × {lado_m}m<br>
                         Crímenes: <b style="color: {color};">{int(row['crime_count'])}</b>
                     </div>""",
                     max_width=200
@@ -306,7 +309,7 @@ def crear_mapa_interactivo_zona(delito_key, zona_key=None):
             folium.Marker(
                 location=[lat_center, long_center],
                 popup=folium.Popup(popup_html, max_width=320),
-                tooltip=f"📍 {delito_nombre}: {int(row['crime_count'])} crímenes en ~555m²",
+                tooltip=f"📍 {delito_nombre}: {int(row['crime_count'])} crímenes en ~{lado_m}m × {lado_m}m",
                 icon=folium.Icon(color=color, icon=icon, prefix='glyphicon')
             ).add_to(markers_layer)
 
@@ -335,7 +338,7 @@ def crear_mapa_interactivo_zona(delito_key, zona_key=None):
 
             <div style="background: #f0f8ff; padding: 10px; border-radius: 5px; margin: 10px 0; border-left: 4px solid #2a5298;">
                 <p style="margin: 0; font-size: 12px;">
-                    <b>🟦 Rectángulos:</b> Áreas de ~555m × 555m<br>
+                    <b>🟦 Rectángulos:</b> Áreas de ~{lado_m}m × {lado_m}m<br>
                     <b>📍 Marcadores:</b> Centro de cada área
                 </p>
             </div>
@@ -365,7 +368,7 @@ def crear_mapa_interactivo_zona(delito_key, zona_key=None):
             <p style="font-size: 11px; color: gray; margin: 5px 0;">
                 📅 Período: Test 2024-2025<br>
                 📊 Fuente: PNP - Denuncias Lima<br>
-                📏 Grid: 0.005° (~555m)
+                📏 Grid: {grid_size}° (~{lado_m}m)
             </p>
         </div>
         """
@@ -376,6 +379,8 @@ def crear_mapa_interactivo_zona(delito_key, zona_key=None):
 
         # Guardar
         zona_suffix = zona_key if zona_key else 'completo'
+        if grid_size != GRID_SIZE:
+            zona_suffix += f'_grid{grid_size}'
         output_file = OUTPUT_DIR / f'mapa_{delito_key}_{zona_suffix}.html'
         mapa.save(str(output_file))
 
@@ -583,10 +588,13 @@ def generar_index_html():
     print(f"\n✓ Index generado: {output_file}")
 
 
-def generar_todos_los_mapas_interactivos():
+def generar_todos_los_mapas_interactivos(grid_size=GRID_SIZE):
     """
     Genera TODOS los mapas interactivos:
     - 2 delitos × (1 mapa completo + 5 zonas) = 12 mapas HTML
+
+    Args:
+        grid_size: Nivel del grid (ej: un valor de GRID_NIVELES)
     """
     print("\n" + "="*70)
     print(" GENERACIÓN DE MAPAS INTERACTIVOS - FOLIUM")
@@ -604,7 +612,7 @@ def generar_todos_los_mapas_interactivos():
     for delito in delitos:
         for zona in zonas:
             zona_nombre = "Completo" if zona is None else ZONAS_LIMA[zona]['nombre']
-            exito = crear_mapa_interactivo_zona(delito, zona)
+            exito = crear_mapa_interactivo_zona(delito, zona, grid_size)
             resultados.append({
                 'delito': delito.upper(),
                 'zona': zona_nombre,
@@ -632,4 +640,5 @@ def generar_todos_los_mapas_interactivos():
 
 
 if __name__ == "__main__":
-    generar_todos_los_mapas_interactivos()
+    # Uso: python generar_mapas_interactivos.py [grid_size]
+    generar_todos_los_mapas_interactivos(float(sys.argv[1]) if len(sys.argv) > 1 else GRID_SIZE)
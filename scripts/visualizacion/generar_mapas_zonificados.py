@@ -15,6 +15,8 @@ import numpy as np
 import warnings
 warnings.filterwarnings('ignore')
 
+from config.config import GRID_SIZE
+
 # Configuración
 FIGURES_DIR = Path('figures')
 FIGURES_DIR.mkdir(exist_ok=True)
@@ -55,7 +57,7 @@ ZONAS_LIMA = {
 }
 
 
-def crear_mapa_zona_delito(delito_key, zona_key):
+def crear_mapa_zona_delito(delito_key, zona_key, grid_size=GRID_SIZE):
     """
     Crea mapa de hotspots para una zona específica y delito específico
     Usa contextily (OpenStreetMap) con vista ajustada a la zona
@@ -63,6 +65,7 @@ def crear_mapa_zona_delito(delito_key, zona_key):
     Args:
         delito_key: 'hurto' o 'extorsion'
         zona_key: 'norte', 'centro', 'sur', 'este', 'oeste'
+        grid_size: Nivel del grid (ej: un valor de GRID_NIVELES)
     """
     try:
         import contextily as ctx
@@ -79,7 +82,8 @@ def crear_mapa_zona_delito(delito_key, zona_key):
         print(f"[1/5] Cargando datos de {delito_nombre}...")
         try:
             from utils.data_preparation import preparar_datos_completo
-            datos = preparar_datos_completo(delito_key)
+            from utils.grid import decodificar_celda
+            datos = preparar_datos_completo(delito_key, grid_size=grid_size)
 
             if datos is None:
                 raise Exception("No se pudieron cargar datos")
@@ -88,8 +92,7 @@ def crear_mapa_zona_delito(delito_key, zona_key):
             df = datos['df_completo']
 
             # Extraer coordenadas originales del grid
-            df['lat_grid'] = df['grid_cell'].str.split('_').str[0].astype(float)
-            df['long_grid'] = df['grid_cell'].str.split('_').str[1].astype(float)
+            df['lat_grid'], df['long_grid'] = decodificar_celda(df['grid_cell'], datos['grid_size'])
 
             # Filtrar por zona geográfica
             mask_zona = (
@@ -209,7 +212,8 @@ def crear_mapa_zona_delito(delito_key, zona_key):
 
         # Guardar
         plt.tight_layout()
-        output_filename = f'fig_mapa_{delito_key}_{zona_key}.png'
+        sufijo_grid = '' if grid_size == GRID_SIZE else f'_grid{grid_size}'
+        output_filename = f'fig_mapa_{delito_key}_{zona_key}{sufijo_grid}.png'
         output_path = FIGURES_DIR / output_filename
         plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white', edgecolor='none')
         print(f"\n✓ Guardado: {output_filename}")
@@ -228,9 +232,12 @@ def crear_mapa_zona_delito(delito_key, zona_key):
         return False
 
 
-def generar_todos_los_mapas():
+def generar_todos_los_mapas(grid_size=GRID_SIZE):
     """
     Genera TODOS los mapas: 2 delitos × 5 zonas = 10 mapas
+
+    Args:
+        grid_size: Nivel del grid (ej: un valor de GRID_NIVELES)
     """
     print("\n" + "="*70)
     print(" GENERACIÓN DE MAPAS ZONIFICADOS - LIMA METROPOLITANA")
@@ -247,7 +254,7 @@ def generar_todos_los_mapas():
 
     for delito in delitos:
         for zona in zonas:
-            exito = crear_mapa_zona_delito(delito, zona)
+            exito = crear_mapa_zona_delito(delito, zona, grid_size)
             resultados.append({
                 'delito': delito.upper(),
                 'zona': ZONAS_LIMA[zona]['nombre'],
@@ -284,4 +291,5 @@ def generar_todos_los_mapas():
 
 
 if __name__ == "__main__":
-    generar_todos_los_mapas()
+    # Uso: python generar_mapas_zonificados.py [grid_size]
+    generar_todos_los_mapas(float(sys.argv[1]) if len(sys.argv) > 1 else GRID_SIZE)
@@ -13,7 +13,6 @@ Preguntas críticas:
 6. ¿VALE LA PENA hacer predicciones o es ruido aleatorio?
 """
 
-import os
 import sys
 from pathlib import Path
 # Agregar raíz del proyecto al path para imports
@@ -23,13 +22,17 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from scipy import stats
 from sklearn.metrics import r2_score
-from dotenv import load_dotenv
 import warnings
 warnings.filterwarnings('ignore')
 
+from utils.acceso_datos import obtener_engine, obtener_backend, consultar_df, consultar_valor, columnas_tabla
+from utils.esquema_ingesta import compactar_tipos
+from utils.grid import codificar_celda, decodificar_celda
+from utils.semanas import semana_ordinal
+
 # Configuración visual
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
@@ -45,26 +48,17 @@ print()
 print("1. CONECTANDO A BASE DE DATOS MySQL...")
 print("-" * 80)
 
-load_dotenv()
-db_user = os.getenv("MYSQL_USER")
-db_password = os.getenv("MYSQL_PASSWORD")
-db_host = os.getenv("MYSQL_HOST")
-db_name = os.getenv("MYSQL_DB")
-
-print(f"Host: {db_host}")
-print(f"Base de datos: {db_name}")
-print(f"Usuario: {db_user}")
-
-try:
-    connection_string = f"mysql+mysqlconnector://{db_user}:{db_password}@{db_host}/{db_name}"
-    engine = create_engine(connection_string)
-    connection = engine.connect()
-    print("✓ Conexión exitosa a MySQL")
-    connection.close()
-except Exception as e:
-    print(f"❌ Error de conexión: {e}")
+engine = obtener_engine()
+if engine is None:
+    print("❌ Error de conexión: revisa las credenciales del archivo .env")
     sys.exit(1)
 
+print(f"Backend: {obtener_backend()}")
+print(f"Host: {engine.url.host}")
+print(f"Base de datos: {engine.url.database}")
+print(f"Usuario: {engine.url.username}")
+print("✓ Conexión exitosa")
+
 # ============================================================================
 # 2. EXPLORACIÓN DE LA ESTRUCTURA DE DATOS
 # ============================================================================
@@ -74,12 +68,11 @@ print("="*80)
 
 # Obtener info básica
 query_count = text("SELECT COUNT(*) as total FROM denuncias")
-total_records = pd.read_sql(query_count, engine).iloc[0]['total']
+total_records = consultar_valor(query_count)
 print(f"\n✓ Total de registros en la tabla: {total_records:,}")
 
 # Columnas disponibles
-query_columns = text("SHOW COLUMNS FROM denuncias")
-columns_info = pd.read_sql(query_columns, engine)
+columns_info = columnas_tabla('denuncias')
 print(f"\n✓ Columnas disponibles ({len(columns_info)}):")
 for idx, row in columns_info.iterrows():
     print(f"   - {row['Field']}: {row['Type']}")
@@ -92,7 +85,7 @@ query_modalidades = text("""
     ORDER BY count DESC
     LIMIT 10
 """)
-modalidades = pd.read_sql(query_modalidades, engine)
+modalidades = consultar_df(query_modalidades)
 print(f"\n✓ Top 10 Modalidades de Hecho:")
 for idx, row in modalidades.iterrows():
     print(f"   {idx+1}. {row['modalidad_hecho']}: {row['count']:,} denuncias")
@@ -105,7 +98,7 @@ query_deptos = text("""
     ORDER BY count DESC
     LIMIT 10
 """)
-departamentos = pd.read_sql(query_deptos, engine)
+departamentos = consultar_df(query_deptos)
 print(f"\n✓ Top 10 Departamentos:")
 for idx, row in departamentos.iterrows():
     print(f"   {idx+1}. {row['departamento_hecho']}: {row['count']:,} denuncias")
@@ -133,7 +126,7 @@ query_lima = text("""
 """)
 
 print("Cargando datos desde MySQL... (esto puede tomar un momento)")
-df = pd.read_sql(query_lima, engine)
+df = consultar_df(query_lima)
 print(f"✓ Datos cargados: {len(df):,} registros de Robo Agravado en Lima")
 
 # ============================================================================
@@ -150,10 +143,8 @@ for col, count in nulls.items():
         pct = count / len(df) * 100
         print(f"   {col}: {count:,} ({pct:.2f}%)")
 
-# Limpiar coordenadas
-df['lat_hecho'] = pd.to_numeric(df['lat_hecho'], errors='coerce')
-df['long_hecho'] = pd.to_numeric(df['long_hecho'], errors='coerce')
-df['fecha_hora_hecho'] = pd.to_datetime(df['fecha_hora_hecho'], errors='coerce')
+# Limpiar coordenadas y fechas con el esquema compacto (inválidos → NaN/NaT)
+df = compactar_tipos(df, reportar=True)
 
 inicial = len(df)
 df = df.dropna(subset=['lat_hecho', 'long_hecho', 'fecha_hora_hecho'])
@@ -204,7 +195,7 @@ print("="*80)
 df['año'] = df['fecha_hora_hecho'].dt.year
 df['mes'] = df['fecha_hora_hecho'].dt.month
 df['dia_semana'] = df['fecha_hora_hecho'].dt.dayofweek
-df['año_semana'] = df['fecha_hora_hecho'].dt.strftime('%Y-%U')
+df['semana_id'] = semana_ordinal(df['fecha_hora_hecho'])
 
 print("\n5.1 Distribución por Año:")
 por_año = df.groupby('año').size()
@@ -242,7 +233,7 @@ else:
 
 # Autocorrelación temporal
 print("\n5.4 Autocorrelación Temporal (crímenes por semana):")
-crimes_per_week = df.groupby('año_semana').size().sort_index()
+crimes_per_week = df.groupby('semana_id').size().sort_index()
 print(f"   Total de semanas: {len(crimes_per_week)}")
 print(f"   Promedio crímenes/semana: {crimes_per_week.mean():.2f}")
 print(f"   Desv. estándar: {crimes_per_week.std():.2f}")
@@ -267,9 +258,8 @@ print("="*80)
 
 # Crear grid (0.005 grados ≈ 555 metros en Lima)
 grid_size = 0.005
-df['grid_lat'] = (df['lat_hecho'] // grid_size) * grid_size
-df['grid_long'] = (df['long_hecho'] // grid_size) * grid_size
-df['grid_cell'] = df['grid_lat'].astype(str) + '_' + df['grid_long'].astype(str)
+df['grid_cell'] = codificar_celda(df['lat_hecho'], df['long_hecho'], grid_size)
+df['grid_lat'], df['grid_long'] = decodificar_celda(df['grid_cell'], grid_size)
 
 crimes_per_cell = df.groupby('grid_cell').size().sort_values(ascending=False)
 
@@ -283,7 +273,8 @@ print(f"   Coeficiente de Variación: {crimes_per_cell.std() / crimes_per_cell.m
 print(f"\n6.2 Top 10 Hotspots:")
 for i, (cell, count) in enumerate(crimes_per_cell.head(10).items(), 1):
     pct = count / len(df) * 100
-    print(f"   {i:2d}. Celda {cell}: {count:,} crímenes ({pct:.2f}% del total)")
+    lat_celda, long_celda = decodificar_celda(cell, grid_size)
+    print(f"   {i:2d}. Celda {lat_celda:.3f}_{long_celda:.3f}: {count:,} crímenes ({pct:.2f}% del total)")
 
 # Concentración tipo Pareto
 print(f"\n6.3 Concentración Espacial (Principio de Pareto):")
@@ -0,0 +1,87 @@
+"""
+Agregación celda×semana por los tres caminos de extracción
+===========================================================
+Sobre una base SQLite sintética pequeña, el camino pandas, el push-down SQL
+y la lectura en streaming deben producir los mismos conteos, y el dataset
+preparado debe tener exactamente una fila por (celda, semana).
+"""
+
+import pytest
+import pandas as pd
+
+from config.config import GRID_SIZE
+from utils import acceso_datos
+from utils.datos_sinteticos import GeneradorDenuncias
+from utils.backend_local import (
+    abrir_para_carga, crear_tabla_denuncias, normalizar_lote, insertar_lote, crear_indices
+)
+from utils.data_preparation import _obtener_conteos, extraer_conteos_streaming, _preparar_desde_conteos
+
+
+FILAS_SINTETICAS = 40000
+
+
+@pytest.fixture(scope='module')
+def base_sintetica(tmp_path_factory):
+    """Base SQLite sintética activa como backend; cachés en un directorio temporal."""
+    directorio = tmp_path_factory.mktemp('denuncias')
+    ruta = str(directorio / 'sinteticos.sqlite')
+
+    conn = abrir_para_carga(ruta)
+    try:
+        for i, lote in enumerate(GeneradorDenuncias(semilla=7).generar(FILAS_SINTETICAS, 20000)):
+            if i == 0:
+                crear_tabla_denuncias(conn, lote.columns)
+            insertar_lote(conn, normalizar_lote(lote))
+        crear_indices(conn)
+    finally:
+        conn.close()
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('DENUNCIAS_BACKEND', 'sqlite')
+        mp.setenv('DENUNCIAS_SQLITE_PATH', ruta)
+        mp.chdir(directorio)
+        acceso_datos.cerrar_engine()
+        yield ruta
+        acceso_datos.cerrar_engine()
+
+
+@pytest.fixture(scope='module')
+def conteos_por_camino(base_sintetica):
+    return {
+        'pandas': _obtener_conteos('hurto', True, False, False, False, None, False, GRID_SIZE),
+        'sql': _obtener_conteos('hurto', True, False, True, False, None, False, GRID_SIZE),
+        'streaming': extraer_conteos_streaming('hurto', chunksize=5000, grid_size=GRID_SIZE)
+    }
+
+
+def _ordenar(df, columnas):
+    return df.sort_values(columnas).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('camino', ['sql', 'streaming'])
+def test_caminos_producen_los_mismos_conteos(conteos_por_camino, camino):
+    esperado_conteos, esperado_perfil = conteos_por_camino['pandas']
+    conteos, perfil = conteos_por_camino[camino]
+
+    assert len(esperado_conteos) > 0
+    pd.testing.assert_frame_equal(
+        _ordenar(conteos, ['grid_cell', 'semana_id']).astype('int64'),
+        _ordenar(esperado_conteos, ['grid_cell', 'semana_id']).astype('int64')
+    )
+    pd.testing.assert_frame_equal(
+        _ordenar(perfil, ['semana_id', 'dia_semana']).astype('int64'),
+        _ordenar(esperado_perfil, ['semana_id', 'dia_semana']).astype('int64')
+    )
+
+
+@pytest.mark.parametrize('camino', ['pandas', 'sql', 'streaming'])
+def test_dataset_sin_duplicados_celda_semana(conteos_por_camino, camino):
+    hotspot_counts, perfil_dias = conteos_por_camino[camino]
+    datos = _preparar_desde_conteos(hotspot_counts, perfil_dias, GRID_SIZE)
+    df = datos['df_completo']
+
+    assert not df.duplicated(['grid_cell', 'semana_id']).any()
+    assert len(df) == df['grid_cell'].nunique() * df['semana_id'].nunique()
+    assert df['grid_cell'].nunique() == hotspot_counts['grid_cell'].nunique()
+    assert len(datos['X_train']) + len(datos['X_test']) == len(df)
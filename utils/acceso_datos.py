@@ -0,0 +1,256 @@
+"""
+Capa de Acceso a Datos - POOL ÚNICO POR PROCESO
+================================================
+Punto único de acceso a la tabla `denuncias` para el pipeline y los scripts.
+
+- Un solo Engine de SQLAlchemy por proceso, con pool de conexiones
+  (pool_pre_ping, tamaño, overflow y reciclado configurables en config.py).
+- Backend intercambiable: MySQL (por defecto) o un archivo SQLite local
+  (DB_BACKEND / variable DENUNCIAS_BACKEND), ver utils.backend_local.
+- API de consultas: consultar_df, consultar_valor y consultar_chunks.
+- Tras un fork (pool de procesos) el hijo descarta las conexiones heredadas
+  y crea su propio pool al primer uso.
+"""
+
+import os
+import threading
+import pandas as pd
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import URL
+from dotenv import load_dotenv
+
+from utils.lectura_streaming import leer_por_chunks
+from utils.backend_local import registrar_funciones_mysql
+from config.config import (
+    DB_BACKEND, SQLITE_PATH,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT_SEG, DB_POOL_RECYCLE_SEG,
+    STREAMING_CHUNK_SIZE
+)
+
+
+_engine = None
+_lock = threading.Lock()
+
+
+def obtener_backend():
+    """
+    Retorna el backend configurado: 'mysql' o 'sqlite'.
+    """
+    load_dotenv()
+    return os.getenv("DENUNCIAS_BACKEND", DB_BACKEND).lower()
+
+
+def origen_datos():
+    """
+    Identifica de dónde salen los datos, sin conectarse.
+
+    - sqlite: ruta absoluta del archivo, con su tamaño y fecha de modificación
+      (dos bases sintéticas distintas, o la misma regenerada, no coinciden)
+    - mysql: usuario, host, puerto y base (sin la contraseña)
+
+    Las claves de los cachés (snapshots, feature store) lo incluyen para que
+    los datos de un backend nunca se sirvan como si fueran de otro.
+
+    Returns:
+        String 'backend|origen'
+    """
+    backend = obtener_backend()
+
+    if backend == 'sqlite':
+        ruta = os.path.abspath(os.getenv("DENUNCIAS_SQLITE_PATH", SQLITE_PATH))
+        try:
+            info = os.stat(ruta)
+            return f"sqlite|{ruta}|{info.st_size}|{info.st_mtime_ns}"
+        except OSError:
+            return f"sqlite|{ruta}"
+
+    return (f"{backend}|{os.getenv('MYSQL_USER')}@{os.getenv('MYSQL_HOST')}:"
+            f"{os.getenv('MYSQL_PORT', '3306')}/{os.getenv('MYSQL_DB')}")
+
+
+def _crear_engine_sqlite():
+    """Construye el Engine del archivo SQLite local con las funciones MySQL emuladas."""
+    ruta = os.getenv("DENUNCIAS_SQLITE_PATH", SQLITE_PATH)
+
+    if not os.path.exists(ruta):
+        print(f"Error: No existe la base local '{ruta}'. "
+              f"Créala con scripts/importar_denuncias_local.py")
+        return None
+
+    engine = create_engine(
+        f"sqlite:///{ruta}",
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_SEG,
+        pool_pre_ping=True,
+        connect_args={'check_same_thread': False}
+    )
+    event.listen(engine, 'connect', registrar_funciones_mysql)
+
+    return engine
+
+
+def _crear_engine():
+    """Construye el Engine del backend configurado (MySQL lee el archivo .env)."""
+    if obtener_backend() == 'sqlite':
+        return _crear_engine_sqlite()
+
+    load_dotenv()
+    db_user = os.getenv("MYSQL_USER")
+    db_password = os.getenv("MYSQL_PASSWORD")
+    db_host = os.getenv("MYSQL_HOST")
+    db_port = os.getenv("MYSQL_PORT", "3306")
+    db_name = os.getenv("MYSQL_DB")
+
+    if not all([db_user, db_password, db_host, db_name]):
+        print("Error: Faltan variables de entorno para la base de datos en el archivo .env")
+        return None
+
+    url = URL.create(
+        "mysql+mysqlconnector",
+        username=db_user,
+        password=db_password,
+        host=db_host,
+        port=int(db_port),
+        database=db_name
+    )
+
+    return create_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_SEG,
+        pool_recycle=DB_POOL_RECYCLE_SEG,
+        pool_pre_ping=True
+    )
+
+
+def obtener_engine():
+    """
+    Retorna el Engine compartido del proceso (lo crea en el primer uso).
+
+    Returns:
+        sqlalchemy.Engine, o None si no hay credenciales o la conexión falla
+    """
+    global _engine
+
+    if _engine is not None:
+        return _engine
+
+    with _lock:
+        if _engine is None:
+            try:
+                engine = _crear_engine()
+                if engine is None:
+                    return None
+                # Probar la conexión una sola vez por proceso
+                with engine.connect():
+                    pass
+                print("Conexión a la base de datos exitosa.")
+                _engine = engine
+            except Exception as e:
+                print(f"Error al conectar a la base de datos: {e}")
+                return None
+
+    return _engine
+
+
+def cerrar_engine():
+    """Cierra todas las conexiones del pool (ej: al terminar un script)."""
+    global _engine
+
+    with _lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+
+
+def _reiniciar_en_hijo():
+    """Descarta el pool heredado tras un fork sin cerrar los sockets del padre."""
+    global _engine, _lock
+
+    if _engine is not None:
+        _engine.dispose(close=False)
+    _engine = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reiniciar_en_hijo)
+
+
+def _como_sql(query):
+    """Acepta un string SQL o un sqlalchemy.text."""
+    return text(query) if isinstance(query, str) else query
+
+
+def consultar_df(query, params=None):
+    """
+    Ejecuta una consulta y retorna el resultado completo.
+
+    Args:
+        query: String SQL o sqlalchemy.text (parámetros con :nombre)
+        params: Dict de parámetros
+
+    Returns:
+        DataFrame con el resultado
+    """
+    engine = obtener_engine()
+    if engine is None:
+        raise ConnectionError("No hay conexión a la base de datos")
+
+    with engine.connect() as conn:
+        return pd.read_sql(_como_sql(query), conn, params=params)
+
+
+def consultar_valor(query, params=None):
+    """
+    Ejecuta una consulta que devuelve un único valor (ej: COUNT(*)).
+
+    Returns:
+        Valor escalar de la primera columna de la primera fila (None si vacío)
+    """
+    engine = obtener_engine()
+    if engine is None:
+        raise ConnectionError("No hay conexión a la base de datos")
+
+    with engine.connect() as conn:
+        return conn.execute(_como_sql(query), params or {}).scalar()
+
+
+def columnas_tabla(tabla='denuncias'):
+    """
+    Describe las columnas de una tabla (equivalente portable a SHOW COLUMNS).
+
+    Returns:
+        DataFrame con ['Field', 'Type']
+    """
+    engine = obtener_engine()
+    if engine is None:
+        raise ConnectionError("No hay conexión a la base de datos")
+
+    columnas = inspect(engine).get_columns(tabla)
+    return pd.DataFrame({
+        'Field': [col['name'] for col in columnas],
+        'Type': [str(col['type']) for col in columnas]
+    })
+
+
+def consultar_chunks(query, params=None, chunksize=STREAMING_CHUNK_SIZE, clave='id'):
+    """
+    Recorre una consulta por páginas de `chunksize` filas (ver utils.lectura_streaming).
+
+    Args:
+        query: String SQL o sqlalchemy.text; debe devolver la columna `clave`
+        params: Dict de parámetros
+        chunksize: Filas por bloque
+        clave: Columna única por la que se pagina
+
+    Yields:
+        DataFrame con hasta `chunksize` filas
+    """
+    engine = obtener_engine()
+    if engine is None:
+        raise ConnectionError("No hay conexión a la base de datos")
+
+    yield from leer_por_chunks(engine, _como_sql(query), params=params, chunksize=chunksize, clave=clave)
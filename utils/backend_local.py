@@ -0,0 +1,195 @@
+"""
+Backend Local Embebido - SQLITE
+===============================
+Permite ejecutar el pipeline y los scripts sin servidor MySQL, sobre un único
+archivo SQLite con la tabla `denuncias`.
+
+Compatibilidad con las consultas del proyecto:
+- Se registran en cada conexión las funciones MySQL usadas en las consultas
+  (FLOOR, DATE_FORMAT, YEAR, MONTH, WEEKDAY, DATEDIFF, CONCAT).
+- Las fechas se guardan como texto 'YYYY-MM-DD HH:MM:SS', por lo que los
+  filtros fecha_hora_hecho >= 'YYYY-MM-DD' comparan igual que en MySQL.
+- departamento_hecho y modalidad_hecho usan COLLATE NOCASE, equivalente a la
+  collation insensible a mayúsculas por defecto de MySQL.
+"""
+
+import math
+import sqlite3
+from datetime import datetime
+import pandas as pd
+
+
+# Columnas conocidas de `denuncias` y su tipo en SQLite
+ESQUEMA_DENUNCIAS = {
+    'id': 'INTEGER PRIMARY KEY',
+    'lat_hecho': 'REAL',
+    'long_hecho': 'REAL',
+    'fecha_hora_hecho': 'TEXT',
+    'modalidad_hecho': 'TEXT COLLATE NOCASE',
+    'departamento_hecho': 'TEXT COLLATE NOCASE',
+    'provincia_hecho': 'TEXT',
+    'distrito_hecho': 'TEXT',
+    'turno_hecho': 'TEXT',
+    'periodo_dia': 'TEXT',
+    'tipo_via_hecho': 'TEXT'
+}
+
+# Índices para los filtros del pipeline (departamento, modalidad, fecha)
+INDICES_DENUNCIAS = {
+    'idx_denuncias_depto_modalidad_fecha': ['departamento_hecho', 'modalidad_hecho', 'fecha_hora_hecho'],
+    'idx_denuncias_fecha': ['fecha_hora_hecho'],
+    'idx_denuncias_modalidad': ['modalidad_hecho']
+}
+
+FORMATO_FECHA = '%Y-%m-%d %H:%M:%S'
+
+
+# ============================================================================
+# FUNCIONES MYSQL EMULADAS
+# ============================================================================
+
+def _fecha(valor):
+    if valor is None:
+        return None
+    try:
+        return datetime.fromisoformat(str(valor))
+    except ValueError:
+        return None
+
+
+def _floor(x):
+    return None if x is None else math.floor(x)
+
+
+def _date_format(valor, formato):
+    fecha = _fecha(valor)
+    if fecha is None or formato is None:
+        return None
+    # Especificadores MySQL que difieren de strftime
+    formato = formato.replace('%i', '%M').replace('%s', '%S')
+    return fecha.strftime(formato)
+
+
+def _year(valor):
+    fecha = _fecha(valor)
+    return None if fecha is None else fecha.year
+
+
+def _month(valor):
+    fecha = _fecha(valor)
+    return None if fecha is None else fecha.month
+
+
+def _weekday(valor):
+    fecha = _fecha(valor)
+    return None if fecha is None else fecha.weekday()
+
+
+def _datediff(a, b):
+    fa, fb = _fecha(a), _fecha(b)
+    if fa is None or fb is None:
+        return None
+    return (fa.date() - fb.date()).days
+
+
+def _concat(*valores):
+    if any(v is None for v in valores):
+        return None
+    return ''.join(str(v) for v in valores)
+
+
+def registrar_funciones_mysql(dbapi_conn, connection_record=None):
+    """
+    Registra las funciones MySQL emuladas en una conexión sqlite3.
+
+    Firma compatible con el evento 'connect' de SQLAlchemy.
+    """
+    dbapi_conn.create_function('FLOOR', 1, _floor, deterministic=True)
+    dbapi_conn.create_function('DATE_FORMAT', 2, _date_format, deterministic=True)
+    dbapi_conn.create_function('YEAR', 1, _year, deterministic=True)
+    dbapi_conn.create_function('MONTH', 1, _month, deterministic=True)
+    dbapi_conn.create_function('WEEKDAY', 1, _weekday, deterministic=True)
+    dbapi_conn.create_function('DATEDIFF', 2, _datediff, deterministic=True)
+    dbapi_conn.create_function('CONCAT', -1, _concat, deterministic=True)
+
+
+# ============================================================================
+# CONSTRUCCIÓN DEL ARCHIVO LOCAL
+# ============================================================================
+
+def abrir_para_carga(ruta):
+    """
+    Abre el archivo SQLite con ajustes de carga masiva (sin journal ni fsync).
+
+    Returns:
+        sqlite3.Connection
+    """
+    conn = sqlite3.connect(ruta)
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    return conn
+
+
+def crear_tabla_denuncias(conn, columnas, reemplazar=True):
+    """
+    Crea la tabla `denuncias` con los tipos de ESQUEMA_DENUNCIAS.
+
+    Args:
+        conn: sqlite3.Connection
+        columnas: Columnas del export; las desconocidas se crean como TEXT
+        reemplazar: Si True, elimina la tabla existente
+    """
+    if reemplazar:
+        conn.execute('DROP TABLE IF EXISTS denuncias')
+
+    definiciones = [f'"{col}" {ESQUEMA_DENUNCIAS.get(col, "TEXT")}' for col in columnas]
+    conn.execute(f"CREATE TABLE IF NOT EXISTS denuncias ({', '.join(definiciones)})")
+
+
+def normalizar_lote(df):
+    """
+    Convierte un lote del export a los tipos del esquema local.
+
+    Returns:
+        DataFrame listo para insertar
+    """
+    df = df.copy()
+
+    for col in ('lat_hecho', 'long_hecho'):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    if 'fecha_hora_hecho' in df.columns:
+        fechas = pd.to_datetime(df['fecha_hora_hecho'], errors='coerce')
+        df['fecha_hora_hecho'] = fechas.dt.strftime(FORMATO_FECHA)
+
+    return df.astype(object).where(df.notna(), None)
+
+
+def insertar_lote(conn, df):
+    """
+    Inserta un lote normalizado en `denuncias`.
+
+    Returns:
+        Número de filas insertadas
+    """
+    columnas = ', '.join(f'"{col}"' for col in df.columns)
+    marcadores = ', '.join('?' for _ in df.columns)
+    conn.executemany(
+        f'INSERT INTO denuncias ({columnas}) VALUES ({marcadores})',
+        df.itertuples(index=False, name=None)
+    )
+    return len(df)
+
+
+def crear_indices(conn):
+    """Crea los índices de los filtros del pipeline y actualiza estadísticas."""
+    columnas_tabla = {fila[1] for fila in conn.execute('PRAGMA table_info(denuncias)')}
+
+    for nombre, columnas in INDICES_DENUNCIAS.items():
+        if all(col in columnas_tabla for col in columnas):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON denuncias ({', '.join(columnas)})")
+
+    conn.execute('ANALYZE')
+    conn.commit()
@@ -0,0 +1,209 @@
+"""
+Caché Local de Snapshots - PARQUET
+==================================
+Almacén columnar local para las extracciones de MySQL.
+
+Cada snapshot se identifica por (delito, departamento, ventana de consulta) y
+se guarda como un archivo Parquet acompañado de un JSON de metadatos.
+Políticas:
+- TTL: un snapshot más antiguo que CACHE_TTL_HORAS se considera inválido.
+- Refresco explícito: invalidar_snapshot() / invalidar_cache().
+- Tamaño acotado: al guardar se desalojan los snapshots menos usados (LRU)
+  hasta quedar por debajo de CACHE_MAX_MB.
+"""
+
+import os
+import json
+import time
+import hashlib
+import pandas as pd
+
+from utils.acceso_datos import obtener_backend, origen_datos
+from config.config import CACHE_DIR, CACHE_TTL_HORAS, CACHE_MAX_MB
+
+
+def clave_snapshot(delito_sql, departamento, fecha_inicio, fecha_fin=None, extra=None):
+    """
+    Construye la clave de un snapshot a partir de los parámetros de la consulta
+    y del origen de los datos (backend y base, ver utils.acceso_datos.origen_datos).
+
+    Args:
+        delito_sql: Modalidad del hecho (ej: 'HURTO')
+        departamento: Departamento del hecho (ej: 'LIMA')
+        fecha_inicio: Inicio de la ventana de consulta
+        fecha_fin: Fin de la ventana de consulta (None = sin límite)
+        extra: Texto adicional que distingue variantes de la consulta
+
+    Returns:
+        String legible y único para la consulta
+    """
+    firma = f"{delito_sql}|{departamento}|{fecha_inicio}|{fecha_fin}|{extra}|{origen_datos()}"
+    digest = hashlib.sha1(firma.encode('utf-8')).hexdigest()[:12]
+    nombre = f"{delito_sql}_{departamento}_{obtener_backend()}".lower().replace(' ', '_')
+
+    return f"{nombre}_{digest}"
+
+
+def _rutas(clave):
+    """Retorna (ruta_parquet, ruta_metadatos) de un snapshot."""
+    base = os.path.join(CACHE_DIR, clave)
+    return f"{base}.parquet", f"{base}.json"
+
+
+def _leer_metadatos(ruta_meta):
+    try:
+        with open(ruta_meta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _escribir_metadatos(ruta_meta, metadatos):
+    tmp = f"{ruta_meta}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(metadatos, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp, ruta_meta)
+
+
+def leer_snapshot(clave, ttl_horas=CACHE_TTL_HORAS):
+    """
+    Lee un snapshot del caché si existe y está fresco.
+
+    Args:
+        clave: Clave del snapshot (ver clave_snapshot)
+        ttl_horas: Antigüedad máxima permitida (None = sin expiración)
+
+    Returns:
+        DataFrame del snapshot, o None si no existe o expiró
+    """
+    ruta_parquet, ruta_meta = _rutas(clave)
+    metadatos = _leer_metadatos(ruta_meta)
+
+    if metadatos is None or not os.path.exists(ruta_parquet):
+        return None
+
+    edad_horas = (time.time() - metadatos['creado']) / 3600
+    if ttl_horas is not None and edad_horas > ttl_horas:
+        print(f"   [CACHÉ] Snapshot expirado ({edad_horas:.1f}h > {ttl_horas}h)")
+        return None
+
+    df = pd.read_parquet(ruta_parquet)
+
+    metadatos['ultimo_acceso'] = time.time()
+    _escribir_metadatos(ruta_meta, metadatos)
+
+    print(f"   [CACHÉ] Snapshot local ({edad_horas:.1f}h de antigüedad)")
+    return df
+
+
+def guardar_snapshot(clave, df, parametros=None):
+    """
+    Guarda un DataFrame como snapshot y aplica el límite de tamaño del caché.
+
+    Args:
+        clave: Clave del snapshot
+        df: DataFrame a persistir
+        parametros: Dict con los parámetros de la consulta (se guarda como metadato)
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    ruta_parquet, ruta_meta = _rutas(clave)
+
+    # Escritura atómica: un lector concurrente nunca ve un Parquet a medias
+    tmp = f"{ruta_parquet}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, ruta_parquet)
+
+    ahora = time.time()
+    _escribir_metadatos(ruta_meta, {
+        'clave': clave,
+        'parametros': parametros or {},
+        'filas': len(df),
+        'bytes': os.path.getsize(ruta_parquet),
+        'creado': ahora,
+        'ultimo_acceso': ahora
+    })
+
+    desalojar_por_tamano()
+
+
+def invalidar_snapshot(clave):
+    """
+    Elimina un snapshot del caché (refresco explícito).
+
+    Returns:
+        True si existía un snapshot para la clave
+    """
+    existia = False
+    for ruta in _rutas(clave):
+        if os.path.exists(ruta):
+            os.remove(ruta)
+            existia = True
+
+    return existia
+
+
+def invalidar_cache(delito_sql=None):
+    """
+    Invalida todos los snapshots, o solo los de un delito.
+
+    Args:
+        delito_sql: Modalidad del hecho (None = todo el caché)
+
+    Returns:
+        Número de snapshots eliminados
+    """
+    eliminados = 0
+    for metadatos in listar_snapshots():
+        params = metadatos.get('parametros', {})
+        if delito_sql is None or params.get('delito') == delito_sql:
+            eliminados += invalidar_snapshot(metadatos['clave'])
+
+    return eliminados
+
+
+def listar_snapshots():
+    """
+    Lista los metadatos de todos los snapshots del caché.
+
+    Returns:
+        Lista de dicts de metadatos
+    """
+    if not os.path.isdir(CACHE_DIR):
+        return []
+
+    snapshots = []
+    for nombre in os.listdir(CACHE_DIR):
+        if nombre.endswith('.json'):
+            metadatos = _leer_metadatos(os.path.join(CACHE_DIR, nombre))
+            if metadatos is not None:
+                snapshots.append(metadatos)
+
+    return snapshots
+
+
+def desalojar_por_tamano(max_mb=CACHE_MAX_MB):
+    """
+    Desaloja snapshots menos usados recientemente hasta respetar el límite.
+
+    Args:
+        max_mb: Tamaño máximo del caché en MB
+
+    Returns:
+        Lista de claves desalojadas
+    """
+    snapshots = sorted(listar_snapshots(), key=lambda m: m['ultimo_acceso'])
+    total = sum(m['bytes'] for m in snapshots)
+    limite = max_mb * 1024 * 1024
+
+    desalojados = []
+    for metadatos in snapshots:
+        if total <= limite:
+            break
+        invalidar_snapshot(metadatos['clave'])
+        total -= metadatos['bytes']
+        desalojados.append(metadatos['clave'])
+
+    if desalojados:
+        print(f"   [CACHÉ] {len(desalojados)} snapshot(s) desalojado(s) por tamaño")
+
+    return desalojados
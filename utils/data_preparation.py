@@ -6,22 +6,84 @@ Funciones para extraer datos de MySQL y prepararlos para clasificación.
 
 import pandas as pd
 import numpy as np
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
 from sklearn.preprocessing import StandardScaler
 
-from models.common import get_db_connection
-from utils.target_engineering import crear_todos_los_targets, imprimir_distribucion_target
+from utils.acceso_datos import obtener_engine, consultar_df, consultar_chunks
+from utils.extraccion_incremental import extraer_incremental, ultima_relectura
+from utils.extraccion_paralela import extraer_particionado
+from utils.lectura_streaming import AgregadorConteos
+from utils.esquema_ingesta import compactar_tipos
+from utils.tensor_conteos import construir_tensor
+from utils.semanas import SQL_SEMANA_ID, semana_ordinal, inicio_semana, calendario_semanas
+from utils.grid import codificar_celda, empaquetar_celda, factor_nivel, reducir_celda
+from utils.cache_datos import clave_snapshot, leer_snapshot, guardar_snapshot, invalidar_snapshot
+from utils.target_engineering import (
+    crear_todos_los_targets, imprimir_distribucion_target, targets_por_tipo, definiciones_con_umbrales
+)
+from utils.umbrales_targets import umbrales_targets
+from utils.feature_store import (
+    clave_datos_preparados, parametros_preparacion, leer_datos_preparados,
+    guardar_datos_preparados, invalidar_datos_preparados
+)
+from utils.feature_engineering import construir_features, crear_features_vecinos, semanas_historia
 from config.config import (
-    DELITOS, GRID_SIZE, NUM_LAGS, TRAIN_TEST_SPLIT, FEATURE_COLS
+    DELITOS, GRID_SIZE, GRID_NIVELES, NUM_LAGS, TRAIN_TEST_SPLIT, FEATURE_COLS,
+    DEPARTAMENTO, FECHA_INICIO_DATOS, AGREGACION_EN_SQL, STREAMING_CHUNK_SIZE,
+    EXTRACCION_PARALELA, PARTICION_EXTRACCION, EXTRACCION_WORKERS, BACKEND_TENSOR,
+    FEATURE_COLS_VECINOS, ESPEC_FEATURES, VENTANA_TENDENCIA, USAR_FEATURE_STORE, TIPOS_CLASIFICACION
 )
 
 
-def extraer_datos_delito(delito_key):
+def _filtro_denuncias(fecha_fin=None):
+    """
+    Cláusula FROM/WHERE común a todas las extracciones de un delito.
+    
+    Parámetros esperados: :departamento, :delito, :fecha_inicio y,
+    si fecha_fin no es None, :fecha_fin.
+    """
+    filtro_fin = "AND fecha_hora_hecho < :fecha_fin" if fecha_fin is not None else ""
+    
+    return f"""
+        FROM denuncias
+        WHERE departamento_hecho = :departamento
+            AND modalidad_hecho = :delito
+            AND lat_hecho IS NOT NULL
+            AND long_hecho IS NOT NULL
+            AND fecha_hora_hecho >= :fecha_inicio
+            {filtro_fin}
+    """
+
+
+def extraer_datos_delito(delito_key, departamento=DEPARTAMENTO, fecha_inicio=FECHA_INICIO_DATOS,
+                         fecha_fin=None, usar_cache=True, refrescar=False, incremental=False,
+                         paralelo=EXTRACCION_PARALELA, particiones=PARTICION_EXTRACCION,
+                         max_workers=EXTRACCION_WORKERS):
     """
     Extrae datos de un delito desde MySQL.
     
+    Si usar_cache=True, primero busca un snapshot local fresco (Parquet) para la
+    misma consulta; solo consulta MySQL si no existe, expiró o refrescar=True.
+    
+    Si incremental=True, actualiza el dataset local del delito trayendo solo las
+    denuncias posteriores al watermark (ver utils.extraccion_incremental) y
+    filtra la ventana pedida sobre ese dataset.
+    
+    Si paralelo=True, la consulta se divide en particiones de fecha_hora_hecho
+    que se extraen en paralelo (ver utils.extraccion_paralela); el resultado y
+    el snapshot son los mismos que sin particionar.
+    
     Args:
         delito_key: Clave del delito ('hurto', 'extorsion')
+        departamento: Departamento del hecho
+        fecha_inicio: Inicio de la ventana (fecha_hora_hecho >= fecha_inicio)
+        fecha_fin: Fin de la ventana (fecha_hora_hecho < fecha_fin), None = sin límite
+        usar_cache: Si True, lee/escribe el caché local de snapshots
+        refrescar: Si True, invalida el snapshot y fuerza la consulta a MySQL
+        incremental: Si True, usa la extracción incremental por watermark
+        paralelo: Si True, extrae por particiones de fecha en paralelo
+        particiones: Frecuencia de pandas ('MS' = mensual) o número de particiones
+        max_workers: Hilos concurrentes de la extracción paralela
         
     Returns:
         DataFrame con los datos extraídos
@@ -30,121 +92,659 @@ def extraer_datos_delito(delito_key):
     
     print(f"[1] Extrayendo datos de {delito_sql}...")
     
-    engine = get_db_connection()
+    if incremental:
+        df = extraer_incremental(delito_key, departamento, reconstruir=refrescar)
+        if df is None:
+            return None
+        fechas = df['fecha_hora_hecho']
+        mask = fechas >= pd.Timestamp(fecha_inicio)
+        if fecha_fin is not None:
+            mask &= fechas < pd.Timestamp(fecha_fin)
+        df = df.loc[mask, ['lat_hecho', 'long_hecho', 'fecha_hora_hecho']].reset_index(drop=True)
+        print(f"   {len(df):,} registros cargados")
+        return compactar_tipos(df, reportar=True)
+    
+    clave = clave_snapshot(delito_sql, departamento, fecha_inicio, fecha_fin)
+    if usar_cache:
+        if refrescar:
+            invalidar_snapshot(clave)
+        else:
+            df = leer_snapshot(clave)
+            if df is not None:
+                print(f"   {len(df):,} registros cargados")
+                return compactar_tipos(df)
+    
+    engine = obtener_engine()
     if engine is None:
         print("[ERROR] No se pudo conectar a la base de datos")
         return None
     
-    query = text("""
+    params = {
+        'delito': delito_sql,
+        'departamento': departamento,
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin
+    }
+    
+    if paralelo:
+        df = extraer_particionado(
+            ['lat_hecho', 'long_hecho', 'fecha_hora_hecho'], _filtro_denuncias,
+            {'delito': delito_sql, 'departamento': departamento},
+            fecha_inicio, fecha_fin, particiones=particiones, max_workers=max_workers
+        )
+    else:
+        query = text(f"""
+            SELECT
+                lat_hecho,
+                long_hecho,
+                fecha_hora_hecho
+            {_filtro_denuncias(fecha_fin)}
+        """)
+        df = consultar_df(query, params=params)
+    print(f"   {len(df):,} registros cargados")
+    compactar_tipos(df, reportar=True)
+    
+    if usar_cache:
+        guardar_snapshot(clave, df, parametros=params)
+    
+    return df
+
+
+def extraer_datos_modalidades(modalidades, departamento=DEPARTAMENTO, fecha_inicio=FECHA_INICIO_DATOS,
+                              fecha_fin=None, columnas=('lat_hecho', 'long_hecho', 'fecha_hora_hecho')):
+    """
+    Extrae varias modalidades en un solo escaneo (IN) y las separa en memoria.
+    
+    Reemplaza N consultas "WHERE modalidad_hecho = :delito" (N escaneos de
+    `denuncias`) por una sola consulta "WHERE modalidad_hecho IN (...)".
+    
+    Args:
+        modalidades: Lista de modalidades (valores de modalidad_hecho)
+        departamento: Departamento del hecho
+        fecha_inicio: Inicio de la ventana (None = sin límite inferior)
+        fecha_fin: Fin de la ventana (None = sin límite superior)
+        columnas: Columnas a extraer
+        
+    Returns:
+        Dict {modalidad: DataFrame}; las modalidades sin registros tienen un
+        DataFrame vacío. None si no hay conexión.
+    """
+    modalidades = list(dict.fromkeys(modalidades))
+    
+    print(f"[1] Extrayendo {len(modalidades)} modalidades en un solo escaneo...")
+    
+    engine = obtener_engine()
+    if engine is None:
+        print("[ERROR] No se pudo conectar a la base de datos")
+        return None
+    
+    filtro_inicio = "AND fecha_hora_hecho >= :fecha_inicio" if fecha_inicio is not None else ""
+    filtro_fin = "AND fecha_hora_hecho < :fecha_fin" if fecha_fin is not None else ""
+    query = text(f"""
         SELECT
-            lat_hecho,
-            long_hecho,
-            fecha_hora_hecho
+            modalidad_hecho,
+            {', '.join(columnas)}
         FROM denuncias
-        WHERE departamento_hecho = 'LIMA'
-            AND modalidad_hecho = :delito
+        WHERE departamento_hecho = :departamento
+            AND modalidad_hecho IN :modalidades
             AND lat_hecho IS NOT NULL
             AND long_hecho IS NOT NULL
-            AND fecha_hora_hecho >= '2020-01-01'
+            {filtro_inicio}
+            {filtro_fin}
+    """).bindparams(bindparam('modalidades', expanding=True))
+    
+    params = {
+        'modalidades': modalidades,
+        'departamento': departamento,
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin
+    }
+    df = compactar_tipos(consultar_df(query, params=params), reportar=True)
+    
+    particiones = {
+        modalidad: grupo.drop(columns='modalidad_hecho').reset_index(drop=True)
+        for modalidad, grupo in df.groupby('modalidad_hecho', sort=False)
+    }
+    vacio = df.drop(columns='modalidad_hecho').iloc[0:0]
+    
+    resultado = {}
+    for modalidad in modalidades:
+        resultado[modalidad] = particiones.get(modalidad, vacio.copy())
+        print(f"   {modalidad}: {len(resultado[modalidad]):,} registros")
+    
+    return resultado
+
+
+def extraer_datos_delitos(delito_keys, departamento=DEPARTAMENTO, fecha_inicio=FECHA_INICIO_DATOS,
+                          fecha_fin=None, usar_cache=True, refrescar=False):
+    """
+    Versión por lotes de extraer_datos_delito para varios delitos del pipeline.
+    
+    Los delitos con snapshot fresco se leen del caché; el resto se extrae en
+    un solo escaneo y cada partición se guarda como el snapshot que usaría
+    extraer_datos_delito, de modo que las llamadas posteriores no consultan MySQL.
+    
+    Args:
+        delito_keys: Lista de claves ('hurto', 'extorsion')
+        departamento, fecha_inicio, fecha_fin: Ventana de consulta
+        usar_cache, refrescar: Ver extraer_datos_delito
+        
+    Returns:
+        Dict {delito_key: DataFrame}, o None si no hay conexión
+    """
+    resultado = {}
+    pendientes = {}
+    
+    for delito_key in delito_keys:
+        delito_sql = DELITOS[delito_key]
+        clave = clave_snapshot(delito_sql, departamento, fecha_inicio, fecha_fin)
+        df = None
+        if usar_cache:
+            if refrescar:
+                invalidar_snapshot(clave)
+            else:
+                df = leer_snapshot(clave)
+        if df is not None:
+            resultado[delito_key] = compactar_tipos(df)
+        else:
+            pendientes[delito_sql] = (delito_key, clave)
+    
+    if pendientes:
+        particiones = extraer_datos_modalidades(
+            list(pendientes), departamento=departamento,
+            fecha_inicio=fecha_inicio, fecha_fin=fecha_fin
+        )
+        if particiones is None:
+            return None
+        
+        for delito_sql, (delito_key, clave) in pendientes.items():
+            df = particiones[delito_sql]
+            resultado[delito_key] = df
+            if usar_cache:
+                guardar_snapshot(clave, df, parametros={
+                    'delito': delito_sql,
+                    'departamento': departamento,
+                    'fecha_inicio': fecha_inicio,
+                    'fecha_fin': fecha_fin
+                })
+    
+    return resultado
+
+
+def extraer_conteos_agregados(delito_key, departamento=DEPARTAMENTO, fecha_inicio=FECHA_INICIO_DATOS,
+                              fecha_fin=None, usar_cache=True, refrescar=False, grid_size=GRID_SIZE):
+    """
+    Extrae los conteos celda×semana ya agregados por MySQL (push-down).
+    
+    Equivale a extraer_datos_delito + agregar_conteos, pero el FLOOR de las
+    coordenadas y el GROUP BY se ejecutan en la base de datos, por lo que se
+    transfieren filas agregadas en lugar de cada denuncia.
+    
+    Args:
+        delito_key: Clave del delito ('hurto', 'extorsion')
+        departamento, fecha_inicio, fecha_fin: Ventana de consulta
+        usar_cache: Si True, lee/escribe el caché local de snapshots
+        refrescar: Si True, invalida el snapshot y fuerza la consulta a MySQL
+        grid_size: Tamaño de celda del grid
+        
+    Returns:
+        Tupla: (hotspot_counts, perfil_dias), o None si no hay conexión
+    """
+    delito_sql = DELITOS[delito_key]
+    
+    print(f"[1] Extrayendo conteos agregados de {delito_sql} (push-down SQL)...")
+    
+    clave_conteos = clave_snapshot(delito_sql, departamento, fecha_inicio, fecha_fin,
+                                   extra=f'conteos|{grid_size}|semana_id')
+    clave_perfil = clave_snapshot(delito_sql, departamento, fecha_inicio, fecha_fin,
+                                  extra='perfil_dias|semana_id')
+    if usar_cache:
+        if refrescar:
+            invalidar_snapshot(clave_conteos)
+            invalidar_snapshot(clave_perfil)
+        else:
+            conteos = leer_snapshot(clave_conteos)
+            perfil_dias = leer_snapshot(clave_perfil)
+            if conteos is not None and perfil_dias is not None:
+                print(f"   {len(conteos):,} filas celda×semana cargadas")
+                return _conteos_desde_indices(conteos), perfil_dias
+    
+    engine = obtener_engine()
+    if engine is None:
+        print("[ERROR] No se pudo conectar a la base de datos")
+        return None
+    
+    filtro = _filtro_denuncias(fecha_fin)
+    
+    query_conteos = text(f"""
+        SELECT
+            FLOOR(lat_hecho / :grid_size) AS celda_lat,
+            FLOOR(long_hecho / :grid_size) AS celda_long,
+            {SQL_SEMANA_ID} AS semana_id,
+            COUNT(*) AS crime_count
+        {filtro}
+        GROUP BY celda_lat, celda_long, semana_id
     """)
     
-    df = pd.read_sql(query, engine, params={'delito': delito_sql})
-    print(f"   {len(df):,} registros cargados")
+    query_perfil = text(f"""
+        SELECT
+            {SQL_SEMANA_ID} AS semana_id,
+            WEEKDAY(fecha_hora_hecho) AS dia_semana,
+            COUNT(*) AS denuncias
+        {filtro}
+        GROUP BY semana_id, dia_semana
+    """)
     
-    return df
+    params = {
+        'delito': delito_sql,
+        'departamento': departamento,
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        'grid_size': grid_size
+    }
+    conteos = consultar_df(query_conteos, params=params)
+    perfil_dias = consultar_df(query_perfil, params=params)
+    perfil_dias = perfil_dias.astype({'semana_id': 'int64', 'dia_semana': 'int32', 'denuncias': 'int64'})
+    perfil_dias = perfil_dias.sort_values(['semana_id', 'dia_semana']).reset_index(drop=True)
+    print(f"   {len(conteos):,} filas celda×semana cargadas ({int(conteos['crime_count'].sum()):,} denuncias)")
+    
+    if usar_cache:
+        guardar_snapshot(clave_conteos, conteos, parametros=params)
+        guardar_snapshot(clave_perfil, perfil_dias, parametros=params)
+    
+    return _conteos_desde_indices(conteos), perfil_dias
+
+
+def extraer_conteos_streaming(delito_key, departamento=DEPARTAMENTO, fecha_inicio=FECHA_INICIO_DATOS,
+                              fecha_fin=None, chunksize=STREAMING_CHUNK_SIZE, grid_size=GRID_SIZE):
+    """
+    Extrae los puntos de un delito por chunks y los agrega en línea.
+    
+    La memoria pico queda acotada por el tamaño del chunk más la tabla de
+    conteos celda×semana, sin importar cuántos años se consulten.
+    
+    Args:
+        delito_key: Clave del delito ('hurto', 'extorsion')
+        departamento, fecha_inicio, fecha_fin: Ventana de consulta
+        chunksize: Filas por página de la lectura paginada por id
+        grid_size: Tamaño de celda del grid
+        
+    Returns:
+        Tupla: (hotspot_counts, perfil_dias), o None si no hay conexión
+    """
+    delito_sql = DELITOS[delito_key]
+    
+    print(f"[1] Extrayendo datos de {delito_sql} en streaming (chunks de {chunksize:,})...")
+    
+    engine = obtener_engine()
+    if engine is None:
+        print("[ERROR] No se pudo conectar a la base de datos")
+        return None
+    
+    query = text(f"""
+        SELECT
+            id,
+            lat_hecho,
+            long_hecho,
+            fecha_hora_hecho
+        {_filtro_denuncias(fecha_fin)}
+    """)
+    params = {
+        'delito': delito_sql,
+        'departamento': departamento,
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin
+    }
+    
+    agregador = AgregadorConteos(grid_size=grid_size)
+    for chunk in consultar_chunks(query, params=params, chunksize=chunksize):
+        agregador.actualizar(compactar_tipos(chunk))
+    
+    hotspot_counts, perfil_dias = agregador.resultado()
+    print(f"   {agregador.filas_leidas:,} registros leídos en {agregador.chunks} chunks "
+          f"→ {len(hotspot_counts):,} filas celda×semana")
+    
+    return hotspot_counts, perfil_dias
 
 
-def crear_grid_espacial(df):
+def _conteos_desde_indices(conteos):
+    """
+    Convierte los índices FLOOR(coord / GRID_SIZE) devueltos por SQL al mismo
+    grid_cell que crear_grid_espacial, ordenado como el groupby de pandas.
+    """
+    hotspot_counts = pd.DataFrame({
+        'grid_cell': empaquetar_celda(conteos['celda_lat'], conteos['celda_long']),
+        'semana_id': conteos['semana_id'].astype('int64'),
+        'crime_count': conteos['crime_count'].astype('int64')
+    })
+    
+    return hotspot_counts.sort_values(['grid_cell', 'semana_id']).reset_index(drop=True)
+
+
+def crear_grid_espacial(df, grid_size=GRID_SIZE):
     """
     Crea un grid espacial para agrupar crímenes.
+    
+    grid_cell es el id int64 de la celda (ver utils.grid); usa floor(coord /
+    grid_size), la misma expresión que FLOOR() en MySQL, para que el camino
+    pandas y el push-down SQL asignen las mismas celdas.
     """
-    df['grid_lat'] = (df['lat_hecho'] // GRID_SIZE) * GRID_SIZE
-    df['grid_long'] = (df['long_hecho'] // GRID_SIZE) * GRID_SIZE
-    df['grid_cell'] = df['grid_lat'].astype(str) + '_' + df['grid_long'].astype(str)
+    df['grid_cell'] = codificar_celda(df['lat_hecho'], df['long_hecho'], grid_size)
     
     return df
 
 
 def crear_features_temporales(df):
     """
-    Crea features temporales (mes, día de semana, año-semana).
+    Crea features temporales (mes, día de semana, semana_id).
+    
+    semana_id es el ordinal entero de la semana lunes-domingo (ver utils.semanas).
     """
     df['fecha'] = pd.to_datetime(df['fecha_hora_hecho'])
-    df['año_semana'] = df['fecha'].dt.strftime('%Y-%U')
+    df['semana_id'] = semana_ordinal(df['fecha'])
     df['mes'] = df['fecha'].dt.month
     df['dia_semana'] = df['fecha'].dt.dayofweek
     
     return df
 
 
-def preparar_datos_completo(delito_key):
+def agregar_conteos(df, grid_size=GRID_SIZE):
+    """
+    Agrega los puntos crudos en conteos celda×semana (camino pandas).
+    
+    Args:
+        df: DataFrame con lat_hecho, long_hecho, fecha_hora_hecho
+        grid_size: Tamaño de celda del grid
+        
+    Returns:
+        Tupla: (hotspot_counts, perfil_dias)
+        - hotspot_counts: ['grid_cell', 'semana_id', 'crime_count']
+        - perfil_dias: denuncias por ['semana_id', 'dia_semana'] (todas las celdas),
+          insumo del perfil por día de semana de calendario_semanas
+    """
+    df = crear_grid_espacial(df, grid_size)
+    df = crear_features_temporales(df)
+    
+    hotspot_counts = df.groupby(['grid_cell', 'semana_id']).size().reset_index(name='crime_count')
+    
+    perfil_dias = df.groupby(['semana_id', 'dia_semana']).size().reset_index(name='denuncias')
+    perfil_dias = perfil_dias.astype({'dia_semana': 'int32', 'denuncias': 'int64'})
+    
+    return hotspot_counts, perfil_dias
+
+
+def construir_piramide(hotspot_counts, grid_base, niveles=GRID_NIVELES):
+    """
+    Conteos celda×semana en varias resoluciones a partir del nivel base.
+    
+    Cada nivel se obtiene reduciendo los índices enteros de la celda base
+    (fila // k, columna // k) y sumando los conteos, sin volver a leer puntos.
+    
+    Args:
+        hotspot_counts: Conteos ['grid_cell', 'semana_id', 'crime_count'] en grid_base
+        grid_base: Tamaño de celda de hotspot_counts
+        niveles: Tamaños de celda a construir (múltiplos enteros de grid_base)
+        
+    Returns:
+        Dict {grid_size: hotspot_counts}
+    """
+    piramide = {}
+    
+    for grid_size in sorted(niveles):
+        factor = factor_nivel(grid_base, grid_size)
+        if factor == 1:
+            piramide[grid_size] = hotspot_counts
+            continue
+        
+        conteos = hotspot_counts.assign(grid_cell=reducir_celda(hotspot_counts['grid_cell'], factor))
+        piramide[grid_size] = (
+            conteos.groupby(['grid_cell', 'semana_id'], sort=True)['crime_count']
+            .sum().reset_index()
+        )
+    
+    return piramide
+
+
+def _obtener_conteos(delito_key, refrescar, incremental, agregar_en_sql, streaming,
+                     df_puntos, paralelo, grid_size):
+    """
+    Pasos 1-4 del pipeline: extrae y agrega los conteos celda×semana por el
+    camino elegido (puntos ya extraídos, streaming, push-down SQL o pandas).
+    
+    Returns:
+        Tupla: (hotspot_counts, perfil_dias), o None si no hay conexión
+    """
+    if agregar_en_sql and incremental:
+        print("[INFO] El modo incremental trabaja sobre puntos crudos; se desactiva el push-down SQL")
+        agregar_en_sql = False
+    
+    if df_puntos is not None:
+        # 1. Puntos ya extraídos (extracción por lotes)
+        print(f"[1] Usando {len(df_puntos):,} registros ya extraídos de {DELITOS[delito_key]}")
+        print("[2] Creando features espaciales...")
+        return agregar_conteos(df_puntos.copy(), grid_size)
+    
+    if streaming and not agregar_en_sql and not incremental:
+        # 1-4. Leer por chunks y agregar en línea
+        return extraer_conteos_streaming(delito_key, grid_size=grid_size)
+    
+    if agregar_en_sql:
+        # 1-4. Extraer conteos ya agregados por la base de datos
+        return extraer_conteos_agregados(delito_key, refrescar=refrescar, grid_size=grid_size)
+    
+    # 1. Extraer datos
+    df = extraer_datos_delito(delito_key, refrescar=refrescar, incremental=incremental,
+                              paralelo=paralelo)
+    if df is None:
+        return None
+    
+    # 2-4. Crear grid espacial y features temporales, agrupar por semana y grid
+    print("[2] Creando features espaciales...")
+    return agregar_conteos(df, grid_size)
+
+
+def preparar_datos_completo(delito_key, refrescar=False, incremental=False,
+                            agregar_en_sql=AGREGACION_EN_SQL, streaming=False, df_puntos=None,
+                            paralelo=EXTRACCION_PARALELA, grid_size=GRID_SIZE,
+                            backend_tensor=BACKEND_TENSOR, usar_feature_store=USAR_FEATURE_STORE):
     """
     Pipeline completo de preparación de datos para CLASIFICACIÓN.
     
     Args:
         delito_key: Clave del delito ('hurto', 'extorsion')
+        refrescar: Si True, ignora el caché local y vuelve a consultar MySQL
+        incremental: Si True, actualiza el dataset local solo con denuncias nuevas
+        agregar_en_sql: Si True, MySQL devuelve los conteos celda×semana ya
+            agregados (push-down); la salida es idéntica al camino pandas
+        streaming: Si True, lee los puntos por páginas (paginación por id) y
+            los agrega en línea (memoria acotada); no usa el caché de snapshots
+        df_puntos: DataFrame de puntos ya extraído (ej: por extraer_datos_delitos);
+            si se entrega, se omite la extracción
+        paralelo: Si True, extrae los puntos por particiones de fecha en paralelo
+        grid_size: Tamaño de celda del grid (ej: un nivel de GRID_NIVELES)
+        backend_tensor: 'denso', 'disperso' o 'auto' (según la densidad del
+            agregado, ver utils.tensor_conteos.construir_tensor)
+        usar_feature_store: Si True, carga los datos ya preparados para la
+            misma configuración (utils.feature_store) y guarda los nuevos;
+            refrescar e incremental fuerzan a prepararlos de nuevo
         
     Returns:
         Dict con todos los datos preparados para los 3 tipos de clasificación
     """
-    # 1. Extraer datos
-    df = extraer_datos_delito(delito_key)
-    if df is None:
+    if usar_feature_store:
+        datos = _leer_feature_store(delito_key, grid_size, refrescar or incremental)
+        if datos is not None:
+            return datos
+    
+    resultado = _obtener_conteos(delito_key, refrescar, incremental, agregar_en_sql,
+                                 streaming, df_puntos, paralelo, grid_size)
+    if resultado is None:
         return None
+    hotspot_counts, perfil_dias = resultado
+    relectura = ultima_relectura(delito_key) if incremental and df_puntos is None else None
     
-    # 2. Crear grid espacial
-    print(f"[2] Creando features espaciales...")
-    df = crear_grid_espacial(df)
+    datos = _preparar_desde_conteos(hotspot_counts, perfil_dias, grid_size, backend_tensor,
+                                    delito_key, relectura)
     
-    # 3. Crear features temporales
-    df = crear_features_temporales(df)
+    if usar_feature_store:
+        _guardar_feature_store(delito_key, grid_size, datos)
+    
+    return datos
+
+
+def preparar_datos_multinivel(delito_key, niveles=GRID_NIVELES, refrescar=False, incremental=False,
+                              agregar_en_sql=AGREGACION_EN_SQL, streaming=False, df_puntos=None,
+                              paralelo=EXTRACCION_PARALELA, backend_tensor=BACKEND_TENSOR,
+                              usar_feature_store=USAR_FEATURE_STORE):
+    """
+    Prepara los datos de un delito en varias resoluciones con una sola extracción.
+    
+    Los conteos se agregan una vez en el nivel más fino y el resto de niveles
+    se obtienen con construir_piramide; cada nivel pasa luego por los mismos
+    pasos 5-10 que preparar_datos_completo.
+    
+    Args:
+        delito_key: Clave del delito ('hurto', 'extorsion')
+        niveles: Tamaños de celda (múltiplos enteros del menor)
+        refrescar, incremental, agregar_en_sql, streaming, df_puntos, paralelo,
+        backend_tensor: Ver preparar_datos_completo (el backend 'auto' se
+            decide por nivel: los niveles finos suelen quedar en disperso)
+        usar_feature_store: Ver preparar_datos_completo; solo se extrae si
+            falta algún nivel
+        
+    Returns:
+        Dict {grid_size: datos}, con datos en el formato de preparar_datos_completo
+    """
+    grid_base = min(niveles)
+    
+    if usar_feature_store:
+        datos_niveles = {}
+        for grid_size in sorted(niveles):
+            datos = _leer_feature_store(delito_key, grid_size, refrescar or incremental)
+            if datos is None:
+                break
+            datos_niveles[grid_size] = datos
+        else:
+            return datos_niveles
+    
+    resultado = _obtener_conteos(delito_key, refrescar, incremental, agregar_en_sql,
+                                 streaming, df_puntos, paralelo, grid_base)
+    if resultado is None:
+        return None
+    hotspot_counts, perfil_dias = resultado
+    relectura = ultima_relectura(delito_key) if incremental and df_puntos is None else None
     
-    # 4. Agrupar por semana y grid
-    hotspot_counts = df.groupby(['grid_cell', 'año_semana']).size().reset_index(name='crime_count')
+    piramide = construir_piramide(hotspot_counts, grid_base, niveles)
     
-    # 5. Añadir features temporales al agregado
-    merged = hotspot_counts.merge(
-        df[['año_semana', 'mes', 'dia_semana']].drop_duplicates(),
-        on='año_semana',
-        how='left'
-    )
+    datos_niveles = {}
+    for grid_size, conteos in piramide.items():
+        print(f"\n--- Nivel grid {grid_size} ({len(conteos):,} filas celda×semana) ---")
+        datos_niveles[grid_size] = _preparar_desde_conteos(conteos, perfil_dias, grid_size,
+                                                           backend_tensor, delito_key, relectura)
+        if usar_feature_store:
+            _guardar_feature_store(delito_key, grid_size, datos_niveles[grid_size])
     
-    # 6. Crear lags
-    print(f"[3] Creando features de lags temporales...")
-    merged = merged.sort_values(['grid_cell', 'año_semana'])
-    for lag in range(1, NUM_LAGS + 1):
-        merged[f'crime_count_lag_{lag}'] = merged.groupby('grid_cell')['crime_count'].shift(lag)
+    return datos_niveles
+
+
+def _leer_feature_store(delito_key, grid_size, invalidar=False):
+    """
+    Datos preparados del feature store para (delito, grid), o None.
     
-    merged = merged.dropna()
-    print(f"   {len(merged):,} registros con features completas")
+    Con invalidar=True descarta la entrada (refresco o modo incremental).
+    """
+    clave = clave_datos_preparados(delito_key, grid_size)
+    if invalidar:
+        invalidar_datos_preparados(clave)
+        return None
     
-    # 7. Crear los 3 tipos de targets de clasificación
+    datos = leer_datos_preparados(clave)
+    if datos is not None:
+        print(f"[1-5] {DELITOS[delito_key]} (grid {grid_size}) desde el feature store: "
+              f"Train {len(datos['X_train']):,} | Test {len(datos['X_test']):,}")
+    return datos
+
+
+def _guardar_feature_store(delito_key, grid_size, datos):
+    """
+    Guarda los datos preparados en el feature store bajo su clave de contenido.
+    """
+    guardar_datos_preparados(clave_datos_preparados(delito_key, grid_size), datos,
+                             parametros=parametros_preparacion(delito_key, grid_size))
+
+
+def _preparar_desde_conteos(hotspot_counts, perfil_dias, grid_size, backend_tensor=BACKEND_TENSOR,
+                            delito_key=None, relectura=None):
+    """
+    Pasos 5-10 del pipeline: features, targets, split y escalado a partir de
+    los conteos celda×semana.
+    
+    delito_key identifica el sketch de conteos persistido del que salen los
+    umbrales de los targets en modo 'cuantiles'; relectura (semanas re-leídas
+    por la extracción incremental) permite actualizarlo solo en esas semanas.
+    """
+    # 5. Tensor celda×semana (las semanas sin denuncias valen 0)
+    tensor = construir_tensor(hotspot_counts, backend_tensor)
+    print(f"   Tensor {tensor.backend} {tensor.forma[0]:,} celdas × {tensor.forma[1]} semanas "
+          f"({tensor.densidad():.1%} con denuncias, {tensor.memoria_bytes() / 1e6:,.1f} MB)")
+    
+    # 6. Crear features temporales (ESPEC_FEATURES) en una pasada sobre el
+    #    tensor; se descartan las primeras semanas, sin historia completa
+    print("[3] Creando features temporales...")
+    desde_semana = max(semanas_historia(ESPEC_FEATURES), NUM_LAGS)
+    conteos = tensor.a_dataframe(desde_semana=desde_semana)
+    for col, valores in construir_features(tensor, ESPEC_FEATURES, desde_semana).items():
+        conteos[col] = valores
+    conteos['crime_promedio_historico'] = tensor.aplanar(tensor.media_movil(VENTANA_TENDENCIA), desde_semana)
+    
+    if any(col in FEATURE_COLS_VECINOS for col in FEATURE_COLS):
+        conteos = crear_features_vecinos(tensor, conteos, desde_semana=desde_semana)
+    
+    # Añadir features temporales desde el calendario semanal (una fila por
+    # semana): la unión por semana_id no puede multiplicar filas
+    calendario = calendario_semanas(tensor.semanas, perfil_dias)
+    columnas_calendario = ['semana_id'] + [c for c in FEATURE_COLS if c in calendario.columns]
+    merged = conteos.merge(calendario[columnas_calendario], on='semana_id', how='left',
+                           validate='many_to_one')
+    
+    filas_esperadas = tensor.forma[0] * (tensor.forma[1] - desde_semana)
+    if len(merged) != filas_esperadas or merged[FEATURE_COLS].isna().any().any():
+        raise ValueError(f"El dataset tiene {len(merged):,} filas; se esperaban exactamente "
+                         f"{tensor.forma[0]:,} celdas × {tensor.forma[1] - desde_semana} semanas "
+                         f"= {filas_esperadas:,} con features completas")
+    
+    promedio_historico = merged.pop('crime_promedio_historico').values
+    print(f"   {len(merged):,} registros con features completas "
+          f"({tensor.forma[0]:,} celdas × {tensor.forma[1] - desde_semana} semanas)")
+    
+    # Semana de corte del split temporal (paso 9): los umbrales de los
+    # targets solo pueden mirar las semanas de train
+    semanas = tensor.semanas[desde_semana:]
+    semana_corte = int(semanas[int(len(semanas) * TRAIN_TEST_SPLIT)])
+    
+    # 7. Crear los targets de clasificación (una columna int8 por target)
     print(f"[4] Creando targets de clasificación...")
-    y_nivel_riesgo, y_hotspot_critico, y_tendencia = crear_todos_los_targets(merged)
+    umbrales = umbrales_targets(hotspot_counts, semana_corte, delito_key, grid_size, relectura)
+    definiciones = definiciones_con_umbrales(umbrales['bins_nivel_riesgo'], umbrales['umbral_hotspot'])
+    tipos_target = list(definiciones)
+    Y = crear_todos_los_targets(merged, promedio_historico=promedio_historico,
+                                definiciones=definiciones)
     
     # Mostrar distribución de clases
-    imprimir_distribucion_target(y_nivel_riesgo, "Nivel de Riesgo")
-    imprimir_distribucion_target(y_hotspot_critico, "Hotspot Crítico")
-    imprimir_distribucion_target(y_tendencia, "Tendencia")
+    for j, tipo in enumerate(tipos_target):
+        imprimir_distribucion_target(Y[:, j], TIPOS_CLASIFICACION.get(tipo, {}).get('nombre', tipo))
     
     # 8. Separar features
     X = merged[FEATURE_COLS].values
     
-    # 9. Split temporal
-    print(f"\n[5] Dividiendo datos (train/test: {TRAIN_TEST_SPLIT:.0%}/{1-TRAIN_TEST_SPLIT:.0%})...")
-    split_idx = int(len(X) * TRAIN_TEST_SPLIT)
-    
-    X_train, X_test = X[:split_idx], X[split_idx:]
-    
-    # Splits para cada tipo de clasificación
-    y_nivel_riesgo_train = y_nivel_riesgo[:split_idx]
-    y_nivel_riesgo_test = y_nivel_riesgo[split_idx:]
-    
-    y_hotspot_train = y_hotspot_critico[:split_idx]
-    y_hotspot_test = y_hotspot_critico[split_idx:]
+    # 9. Split temporal: las primeras semanas a train y las últimas a test
+    print(f"\n[5] Dividiendo datos por semana (train/test: {TRAIN_TEST_SPLIT:.0%}/{1-TRAIN_TEST_SPLIT:.0%})...")
+    en_train = merged['semana_id'].to_numpy() < semana_corte
+    en_test = ~en_train
+    print(f"   Test desde la semana del {inicio_semana(semana_corte)}")
     
-    y_tendencia_train = y_tendencia[:split_idx]
-    y_tendencia_test = y_tendencia[split_idx:]
+    X_train, X_test = X[en_train], X[en_test]
+    Y_train, Y_test = Y[en_train], Y[en_test]
     
     # 10. Escalar
     scaler = StandardScaler()
@@ -157,20 +757,13 @@ def preparar_datos_completo(delito_key):
     return {
         'X_train': X_train_scaled,
         'X_test': X_test_scaled,
-        'targets': {
-            'nivel_riesgo': {
-                'train': y_nivel_riesgo_train,
-                'test': y_nivel_riesgo_test
-            },
-            'hotspot_critico': {
-                'train': y_hotspot_train,
-                'test': y_hotspot_test
-            },
-            'tendencia': {
-                'train': y_tendencia_train,
-                'test': y_tendencia_test
-            }
-        },
+        'Y_train': Y_train,
+        'Y_test': Y_test,
+        'targets': targets_por_tipo(Y_train, Y_test, tipos_target),
         'scaler': scaler,
-        'df_completo': merged
+        'df_completo': merged,
+        'grid_size': grid_size,
+        'semana_corte': semana_corte,
+        'umbrales_targets': umbrales,
+        'calendario_semanas': calendario
     }
@@ -0,0 +1,175 @@
+"""
+Generador de Denuncias Sintéticas
+=================================
+Produce filas con el esquema de `denuncias` para medir el pipeline a escalas
+mayores que los datos reales (1M, 10M, 50M filas).
+
+Modelo generativo (reproducible con una semilla fija):
+- Espacio: mezcla de focos gaussianos con pesos de cola pesada (pocos focos
+  concentran la mayoría de casos) + 15% de fondo uniforme en LIMA_BBOX.
+- Tiempo: probabilidad diaria = ciclo semanal × estacionalidad anual × tendencia;
+  la hora sigue un perfil bimodal (mediodía y noche).
+- Modalidad: mezcla de MEZCLA_MODALIDADES_SINTETICAS (o la real de la BD).
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.acceso_datos import consultar_df
+from config.config import (
+    LIMA_BBOX, SINTETICOS_FECHA_INICIO, SINTETICOS_FECHA_FIN,
+    MEZCLA_MODALIDADES_SINTETICAS, DEPARTAMENTO
+)
+
+
+NUM_FOCOS = 80
+FRACCION_FONDO = 0.15
+FRACCION_SIN_COORDENADAS = 0.02
+
+# Lunes..Domingo
+PESOS_DIA_SEMANA = np.array([0.95, 0.95, 1.0, 1.0, 1.15, 1.10, 0.85])
+
+# Perfil horario 0..23 (picos al mediodía y en la noche)
+PESOS_HORA = np.array([
+    2.0, 1.5, 1.2, 1.0, 0.8, 0.9, 1.5, 2.5, 3.5, 4.0, 4.2, 4.5,
+    5.0, 4.8, 4.5, 4.5, 4.8, 5.2, 6.0, 6.5, 6.0, 5.0, 3.8, 2.8
+])
+
+DISTRITOS = [
+    'SAN JUAN DE LURIGANCHO', 'LIMA', 'ATE', 'SAN MARTIN DE PORRES', 'COMAS',
+    'VILLA EL SALVADOR', 'LOS OLIVOS', 'SAN JUAN DE MIRAFLORES', 'CHORRILLOS',
+    'LA VICTORIA', 'SANTIAGO DE SURCO', 'MIRAFLORES', 'INDEPENDENCIA', 'CARABAYLLO'
+]
+TIPOS_VIA = ['AVENIDA', 'JIRON', 'CALLE', 'PASAJE', 'CARRETERA']
+PESOS_TIPO_VIA = np.array([0.45, 0.25, 0.2, 0.07, 0.03])
+
+
+def mezcla_modalidades_desde_bd(departamento=DEPARTAMENTO, minimo=1000):
+    """
+    Obtiene la proporción real de modalidades del departamento desde la BD.
+
+    Returns:
+        Dict {modalidad: proporción}, o None si no hay conexión
+    """
+    try:
+        df = consultar_df("""
+            SELECT modalidad_hecho, COUNT(*) AS total
+            FROM denuncias
+            WHERE departamento_hecho = :departamento
+            GROUP BY modalidad_hecho
+            HAVING COUNT(*) >= :minimo
+        """, params={'departamento': departamento, 'minimo': minimo})
+    except ConnectionError:
+        return None
+
+    if len(df) == 0:
+        return None
+
+    return dict(zip(df['modalidad_hecho'], df['total'] / df['total'].sum()))
+
+
+class GeneradorDenuncias:
+    """
+    Generador reproducible de denuncias sintéticas por lotes.
+
+    Los focos, las probabilidades diarias y la mezcla se fijan al crear el
+    generador; cada lote se obtiene con generar_lote().
+    """
+
+    def __init__(self, semilla=42, mezcla=None, fecha_inicio=SINTETICOS_FECHA_INICIO,
+                 fecha_fin=SINTETICOS_FECHA_FIN, bbox=LIMA_BBOX):
+        self.rng = np.random.default_rng(semilla)
+        self.bbox = bbox
+        self.siguiente_id = 1
+
+        mezcla = mezcla or MEZCLA_MODALIDADES_SINTETICAS
+        self.modalidades = np.array(list(mezcla.keys()))
+        pesos = np.array(list(mezcla.values()), dtype=float)
+        self.pesos_modalidad = pesos / pesos.sum()
+
+        # Focos espaciales: centros, dispersión y pesos de cola pesada (Pareto)
+        lat_min, lat_max, long_min, long_max = bbox
+        self.focos_lat = self.rng.uniform(lat_min, lat_max, NUM_FOCOS)
+        self.focos_long = self.rng.uniform(long_min, long_max, NUM_FOCOS)
+        self.focos_sigma = self.rng.uniform(0.003, 0.015, NUM_FOCOS)
+        pesos_focos = self.rng.pareto(1.2, NUM_FOCOS) + 0.05
+        self.pesos_focos = pesos_focos / pesos_focos.sum()
+        self.focos_distrito = self.rng.integers(0, len(DISTRITOS), NUM_FOCOS)
+
+        # Probabilidad diaria: ciclo semanal × estacionalidad × tendencia
+        self.dias = pd.date_range(fecha_inicio, fecha_fin, freq='D')
+        dia_año = self.dias.dayofyear.values
+        estacional = 1 + 0.15 * np.sin(2 * np.pi * (dia_año - 80) / 365.25)
+        tendencia = np.linspace(0.85, 1.15, len(self.dias))
+        p_dia = PESOS_DIA_SEMANA[self.dias.dayofweek.values] * estacional * tendencia
+        self.p_dia = p_dia / p_dia.sum()
+        self.p_hora = PESOS_HORA / PESOS_HORA.sum()
+        self.dias_ns = self.dias.values.astype('datetime64[s]')
+
+    def _coordenadas(self, n):
+        lat_min, lat_max, long_min, long_max = self.bbox
+
+        es_fondo = self.rng.random(n) < FRACCION_FONDO
+        foco = self.rng.choice(NUM_FOCOS, size=n, p=self.pesos_focos)
+        sigma = self.focos_sigma[foco]
+
+        lat = self.focos_lat[foco] + self.rng.normal(0, 1, n) * sigma
+        lon = self.focos_long[foco] + self.rng.normal(0, 1, n) * sigma
+        lat[es_fondo] = self.rng.uniform(lat_min, lat_max, es_fondo.sum())
+        lon[es_fondo] = self.rng.uniform(long_min, long_max, es_fondo.sum())
+
+        lat = np.clip(lat, lat_min, lat_max).round(6)
+        lon = np.clip(lon, long_min, long_max).round(6)
+
+        return lat, lon, foco
+
+    def generar_lote(self, n):
+        """
+        Genera un lote de `n` denuncias.
+
+        Returns:
+            DataFrame con el esquema de `denuncias`
+        """
+        lat, lon, foco = self._coordenadas(n)
+
+        dia = self.rng.choice(len(self.dias), size=n, p=self.p_dia)
+        hora = self.rng.choice(24, size=n, p=self.p_hora)
+        segundos = hora * 3600 + self.rng.integers(0, 3600, n)
+        fechas = self.dias_ns[dia] + segundos.astype('timedelta64[s]')
+
+        sin_coords = self.rng.random(n) < FRACCION_SIN_COORDENADAS
+        lat = np.where(sin_coords, np.nan, lat)
+        lon = np.where(sin_coords, np.nan, lon)
+
+        turno = np.select([hora < 6, hora < 12, hora < 18], ['MADRUGADA', 'MAÑANA', 'TARDE'], 'NOCHE')
+        periodo = np.where((hora >= 6) & (hora < 18), 'DIA', 'NOCHE')
+
+        ids = np.arange(self.siguiente_id, self.siguiente_id + n)
+        self.siguiente_id += n
+
+        return pd.DataFrame({
+            'id': ids,
+            'lat_hecho': lat,
+            'long_hecho': lon,
+            'fecha_hora_hecho': pd.to_datetime(fechas),
+            'modalidad_hecho': self.rng.choice(self.modalidades, size=n, p=self.pesos_modalidad),
+            'departamento_hecho': DEPARTAMENTO,
+            'provincia_hecho': 'LIMA',
+            'distrito_hecho': np.array(DISTRITOS)[self.focos_distrito[foco]],
+            'turno_hecho': turno,
+            'periodo_dia': periodo,
+            'tipo_via_hecho': self.rng.choice(TIPOS_VIA, size=n, p=PESOS_TIPO_VIA)
+        })
+
+    def generar(self, total, tamano_lote=500000):
+        """
+        Genera `total` denuncias en lotes.
+
+        Yields:
+            DataFrame de hasta `tamano_lote` filas
+        """
+        restantes = total
+        while restantes > 0:
+            n = min(tamano_lote, restantes)
+            yield self.generar_lote(n)
+            restantes -= n
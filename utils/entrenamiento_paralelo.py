@@ -0,0 +1,271 @@
+"""
+Entrenamiento Paralelo de Modelos
+=================================
+Reparte los trabajos (delito, grid, tipo de clasificación, modelo) entre un
+pool de procesos, de modo que la corrida completa queda acotada por el
+modelo más lento y no por la suma de todos.
+
+Las matrices (X_train, X_test, Y_train, Y_test) no se copian a cada proceso:
+cada worker recibe solo las rutas de sus .npy y los abre con
+np.load(mmap_mode='r'), de modo que todos comparten las mismas páginas del
+caché del sistema operativo y la memoria residual por worker no crece con
+el tamaño de las matrices. Si los datos vienen del feature store se usan sus
+propios .npy; si no, se escriben una vez en ENTRENAMIENTO_MMAP_DIR y se
+borran al terminar.
+
+Los árboles de sklearn (random_forest, gradient_boosting, decision_tree y
+adaboost) convierten X a float32 C-contiguo en fit y predict: sobre el .npy
+float64 cada worker haría su propia copia privada de X. Por eso X_train y
+X_test se publican también en float32 (una conversión por bloques en el
+proceso principal) y esos modelos leen esa versión; los demás usan float64,
+que aceptan sin copiar.
+
+Los trabajos se encolan de los algoritmos más costosos a los más baratos
+para que los largos no queden al final. Los resultados se devuelven en el
+mismo orden que el entrenamiento secuencial (delito, tipo, modelo), con el
+formato de entrenar_modelo_clasificacion, junto con los trabajos que no
+terminaron: un error del modelo o un worker muerto (ej: por falta de
+memoria, BrokenProcessPool) no aborta la corrida ni descarta lo ya entrenado.
+
+El número de procesos y los núcleos de cada trabajo salen del presupuesto
+de CPU (utils.presupuesto_cpu), de modo que pool, búsqueda, estimador y
+BLAS no se sobresuscriben entre sí.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from config.config import (
+    MODELOS_CLASIFICACION, TIPOS_CLASIFICACION, ENTRENAMIENTO_WORKERS, ENTRENAMIENTO_MMAP_DIR
+)
+from utils.presupuesto_cpu import repartir_pool
+
+
+# Orden de encolado: primero los algoritmos que más tardan
+ORDEN_COSTO = [
+    'gradient_boosting', 'random_forest', 'adaboost', 'knn', 'logistic', 'decision_tree', 'sgd'
+]
+
+MATRICES = ('X_train', 'X_test', 'Y_train', 'Y_test')
+
+# Modelos que entrenan y predicen sobre X en float32 (árboles de sklearn)
+MODELOS_FLOAT32 = ('random_forest', 'gradient_boosting', 'decision_tree', 'adaboost')
+MATRICES_FLOAT32 = {'X_train': 'X_train_f32', 'X_test': 'X_test_f32'}
+FILAS_BLOQUE_FLOAT32 = 262144
+
+# Datos de entrenamiento del proceso worker: (delito, grid) → matrices memory-mapped
+_DATOS_WORKER = {}
+
+
+def _archivo_npy(arreglo):
+    """
+    Ruta del .npy si el arreglo es el archivo completo abierto con mmap, o None.
+    """
+    if not isinstance(arreglo, np.memmap) or not arreglo.filename or not arreglo.flags['C_CONTIGUOUS']:
+        return None
+    try:
+        completo = np.load(arreglo.filename, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if completo.shape != arreglo.shape or completo.dtype != arreglo.dtype or completo.offset != arreglo.offset:
+        return None
+    return arreglo.filename
+
+
+def _guardar_float32(arreglo, ruta):
+    """
+    Escribe `arreglo` como .npy float32 C-contiguo, por bloques de filas.
+    """
+    destino = np.lib.format.open_memmap(ruta, mode='w+', dtype='float32', shape=arreglo.shape)
+    for inicio in range(0, arreglo.shape[0], FILAS_BLOQUE_FLOAT32):
+        fin = inicio + FILAS_BLOQUE_FLOAT32
+        destino[inicio:fin] = arreglo[inicio:fin]
+    destino.flush()
+    del destino
+
+
+def publicar_matrices(datos_por_clave, directorio):
+    """
+    Deja las matrices de cada (delito, grid) en archivos .npy.
+
+    Las que ya son un .npy memory-mapped (feature store) se reutilizan; el
+    resto se escribe una sola vez en `directorio`. X_train y X_test se
+    escriben además en float32 para los modelos de MODELOS_FLOAT32.
+
+    Returns:
+        Dict {(delito_key, grid_size): {'X_train': ruta, ..., 'tipos': [...]}}
+    """
+    rutas = {}
+    for (delito_key, grid_size), datos in datos_por_clave.items():
+        tipos = list(datos['targets'])
+        matrices = {'X_train': datos['X_train'], 'X_test': datos['X_test']}
+        for split in ('train', 'test'):
+            Y = datos.get(f'Y_{split}')
+            matrices[f'Y_{split}'] = (Y if Y is not None else
+                                      np.column_stack([datos['targets'][tipo][split] for tipo in tipos]))
+
+        rutas[(delito_key, grid_size)] = {'tipos': tipos}
+        for nombre, arreglo in matrices.items():
+            ruta = _archivo_npy(arreglo)
+            if ruta is None:
+                ruta = os.path.join(directorio, f'{delito_key}_grid{grid_size}_{nombre}.npy')
+                np.save(ruta, np.ascontiguousarray(arreglo))
+            rutas[(delito_key, grid_size)][nombre] = ruta
+
+        for nombre, nombre_f32 in MATRICES_FLOAT32.items():
+            ruta = _archivo_npy(matrices[nombre]) if matrices[nombre].dtype == np.float32 else None
+            if ruta is None:
+                ruta = os.path.join(directorio, f'{delito_key}_grid{grid_size}_{nombre_f32}.npy')
+                _guardar_float32(matrices[nombre], ruta)
+            rutas[(delito_key, grid_size)][nombre_f32] = ruta
+
+    return rutas
+
+
+def _inicializar_worker(rutas_por_clave):
+    for clave, rutas in rutas_por_clave.items():
+        nombres = MATRICES + tuple(MATRICES_FLOAT32.values())
+        matrices = {nombre: np.load(rutas[nombre], mmap_mode='r') for nombre in nombres}
+        _DATOS_WORKER[clave] = {
+            'X_train': matrices['X_train'],
+            'X_test': matrices['X_test'],
+            'X_train_f32': matrices['X_train_f32'],
+            'X_test_f32': matrices['X_test_f32'],
+            'targets': {tipo: (matrices['Y_train'][:, j], matrices['Y_test'][:, j])
+                        for j, tipo in enumerate(rutas['tipos'])}
+        }
+
+
+def _entrenar_trabajo(trabajo):
+    """
+    Entrena un modelo en el proceso worker.
+
+    Returns:
+        Tupla (trabajo, resultado o None, error o None, segundos)
+    """
+    # Import local: el worker solo carga sklearn al recibir trabajo
+    from models.classification_models import entrenar_modelo_clasificacion
+
+    clave = (trabajo['delito'], trabajo['grid_size'])
+    datos = _DATOS_WORKER[clave]
+    y_train, y_test = datos['targets'][trabajo['tipo']]
+    sufijo = '_f32' if trabajo['modelo'] in MODELOS_FLOAT32 else ''
+
+    inicio = time.time()
+    try:
+        resultado = entrenar_modelo_clasificacion(
+            trabajo['modelo'], trabajo['tipo'],
+            datos[f'X_train{sufijo}'], y_train, datos[f'X_test{sufijo}'], y_test,
+            optimizar=trabajo['optimizar'], nucleos=trabajo['nucleos']
+        )
+    except Exception as e:
+        return trabajo, None, str(e), time.time() - inicio
+
+    return trabajo, resultado, None, time.time() - inicio
+
+
+def crear_trabajos(claves, optimizar=False, tipos=None, modelos=None):
+    """
+    Lista de trabajos en el orden secuencial (delito, grid, tipo, modelo).
+    """
+    tipos = list(TIPOS_CLASIFICACION) if tipos is None else tipos
+    modelos = MODELOS_CLASIFICACION if modelos is None else modelos
+
+    return [
+        {'delito': delito_key, 'grid_size': grid_size, 'tipo': tipo, 'modelo': modelo,
+         'optimizar': optimizar, 'orden': orden}
+        for orden, (delito_key, grid_size, tipo, modelo) in enumerate(
+            (d, g, t, m) for d, g in claves for t in tipos for m in modelos
+        )
+    ]
+
+
+def entrenar_en_paralelo(datos_por_clave, optimizar=False, max_workers=ENTRENAMIENTO_WORKERS):
+    """
+    Entrena todos los modelos de todos los delitos y niveles en un pool de procesos.
+
+    Args:
+        datos_por_clave: Dict {(delito_key, grid_size): datos}, con datos en
+            el formato de preparar_datos_completo
+        optimizar: Si True, busca mejores hiperparámetros
+        max_workers: Tope de procesos del pool (None = todo el presupuesto de CPU)
+
+    Returns:
+        Tupla (resultados, fallidos):
+        - resultados: Lista de resultados (con 'delito', 'grid_size',
+          'segundos_entrenamiento', 'procesos_pool' y la asignación de núcleos)
+        - fallidos: Lista de {'delito', 'grid_size', 'tipo_clasificacion',
+          'modelo', 'error'} de los trabajos sin resultado
+        Ambas en orden (delito, grid, tipo, modelo)
+    """
+    os.makedirs(ENTRENAMIENTO_MMAP_DIR, exist_ok=True)
+    directorio = tempfile.mkdtemp(dir=ENTRENAMIENTO_MMAP_DIR)
+    try:
+        rutas = publicar_matrices(datos_por_clave, directorio)
+        return _entrenar_en_pool(rutas, optimizar, max_workers)
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def _entrenar_en_pool(rutas, optimizar, max_workers):
+    """
+    Ejecuta los trabajos de las matrices publicadas en `rutas`.
+    """
+    trabajos = crear_trabajos(list(rutas), optimizar)
+    procesos, nucleos = repartir_pool(len(trabajos), max_workers)
+    for trabajo in trabajos:
+        trabajo['nucleos'] = nucleos
+    costo = {modelo: i for i, modelo in enumerate(ORDEN_COSTO)}
+    encolados = sorted(trabajos, key=lambda t: costo.get(t['modelo'], -1))
+
+    print(f"   {len(trabajos)} modelos con {procesos} procesos × {nucleos} núcleos...")
+    inicio_total = time.time()
+    resultados = []
+    fallidos = []
+
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_worker,
+                             initargs=(rutas,)) as pool:
+        futuros = {pool.submit(_entrenar_trabajo, trabajo): trabajo for trabajo in encolados}
+        for i, futuro in enumerate(as_completed(futuros), 1):
+            trabajo = futuros[futuro]
+            try:
+                _, resultado, error, segundos = futuro.result()
+            except BrokenProcessPool:
+                # Un worker murió: este trabajo y los pendientes quedan sin resultado
+                resultado, error = None, "worker terminado (BrokenProcessPool)"
+
+            etiqueta = f"{trabajo['delito']} grid {trabajo['grid_size']} | {trabajo['tipo']} | {trabajo['modelo']}"
+            if error is not None:
+                print(f"   [{i}/{len(trabajos)}] [ERROR] {etiqueta}: {error}")
+                fallidos.append((trabajo['orden'], {
+                    'delito': trabajo['delito'], 'grid_size': trabajo['grid_size'],
+                    'tipo_clasificacion': trabajo['tipo'], 'modelo': trabajo['modelo'], 'error': error
+                }))
+                continue
+
+            resultado['delito'] = trabajo['delito']
+            resultado['grid_size'] = trabajo['grid_size']
+            resultado['segundos_entrenamiento'] = segundos
+            resultado['procesos_pool'] = procesos
+            resultados.append((trabajo['orden'], resultado))
+            print(f"   [{i}/{len(trabajos)}] {etiqueta}: F1 {resultado['f1']:.4f} en {segundos:.1f}s")
+
+    duracion_total = time.time() - inicio_total
+    suma = sum(r['segundos_entrenamiento'] for _, r in resultados)
+    mas_lento = max((r['segundos_entrenamiento'] for _, r in resultados), default=0.0)
+    print(f"   Total: {duracion_total:.1f}s de reloj, {suma:.1f}s sumando modelos "
+          f"(x{suma / max(duracion_total, 1e-9):.1f}); el más lento tardó {mas_lento:.1f}s")
+
+    if fallidos:
+        print(f"   [AVISO] {len(fallidos)} de {len(trabajos)} modelos sin resultado")
+
+    def en_orden(pares):
+        return [valor for _, valor in sorted(pares, key=lambda par: par[0])]
+
+    return en_orden(resultados), en_orden(fallidos)
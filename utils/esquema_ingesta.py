@@ -0,0 +1,70 @@
+"""
+Esquema Compacto de Ingesta
+===========================
+Convierte las columnas de `denuncias` a tipos compactos apenas se cargan:
+- lat_hecho / long_hecho: TIPO_COORDENADAS (float64 por defecto)
+- fecha_hora_hecho: object/datetime64[ns] → datetime64[s]
+- Texto de baja cardinalidad (modalidad, distrito, turno, ...): object → Categorical
+
+Las coordenadas se mantienen en float64: la celda se calcula después, con
+floor(coord / grid_size), y debe coincidir con FLOOR() del push-down SQL.
+Con TIPO_COORDENADAS = 'float32' (~4e-6° de resolución en Lima) el redondeo
+previo al floor cambia de celda a los puntos cercanos a un borde (~1.6% en
+el conjunto sintético) y los caminos pandas/streaming dejan de coincidir
+con el push-down SQL.
+"""
+
+import pandas as pd
+
+from config.config import COMPACTAR_TIPOS, TIPO_COORDENADAS, TIPO_FECHA, COLUMNAS_CATEGORICAS
+
+
+COLUMNAS_COORDENADAS = ['lat_hecho', 'long_hecho']
+COLUMNAS_FECHA = ['fecha_hora_hecho']
+
+
+def bytes_por_fila(df):
+    """
+    Memoria real del DataFrame (incluye los strings de Python) por fila.
+    """
+    if len(df) == 0:
+        return 0.0
+    return df.memory_usage(deep=True).sum() / len(df)
+
+
+def compactar_tipos(df, reportar=False):
+    """
+    Aplica el esquema compacto a las columnas presentes en `df` (in place).
+
+    Los valores no convertibles quedan como NaN / NaT.
+
+    Args:
+        df: DataFrame recién cargado
+        reportar: Si True, imprime los bytes por fila antes y después
+
+    Returns:
+        El mismo DataFrame con los tipos compactos
+    """
+    if not COMPACTAR_TIPOS or df is None:
+        return df
+
+    antes = bytes_por_fila(df) if reportar else None
+
+    for col in COLUMNAS_COORDENADAS:
+        if col in df.columns and df[col].dtype != TIPO_COORDENADAS:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(TIPO_COORDENADAS)
+
+    for col in COLUMNAS_FECHA:
+        if col in df.columns and df[col].dtype != TIPO_FECHA:
+            df[col] = pd.to_datetime(df[col], errors='coerce').astype(TIPO_FECHA)
+
+    for col in COLUMNAS_CATEGORICAS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    if reportar and len(df) > 0:
+        despues = bytes_por_fila(df)
+        print(f"   Memoria: {antes:.1f} → {despues:.1f} bytes/fila "
+              f"({despues / antes:.0%}, {df.memory_usage(deep=True).sum() / 1e6:,.1f} MB)")
+
+    return df
@@ -0,0 +1,185 @@
+"""
+Extracción Incremental por Watermark
+====================================
+Mantiene un dataset local por delito y trae de MySQL solo las denuncias nuevas.
+
+El watermark guarda el mayor (fecha_hora_hecho, id) ya ingerido. En cada
+actualización se consultan:
+- Las filas con fecha_hora_hecho dentro de la ventana de re-lectura
+  (watermark - INCREMENTAL_LOOKBACK_DIAS), que reemplazan por completo a las
+  locales de esa ventana (así se recogen correcciones y bajas tardías).
+- Las filas con id > watermark.id, aunque su fecha de hecho sea antigua
+  (denuncias registradas tarde).
+El costo de cada refresco crece con el volumen de la ventana, no con el historial.
+
+El watermark también identifica cada extracción (version) y anota qué semanas
+re-leyó la última (relectura), para que los resúmenes derivados del dataset
+(ej: el sketch de utils.umbrales_targets) actualicen solo esas semanas.
+"""
+
+import os
+import json
+import uuid
+import pandas as pd
+from sqlalchemy import text
+
+from utils.acceso_datos import obtener_engine, consultar_df
+from utils.semanas import semana_ordinal
+from config.config import (
+    DELITOS, DEPARTAMENTO, FECHA_INICIO_DATOS,
+    INCREMENTAL_DIR, INCREMENTAL_LOOKBACK_DIAS
+)
+
+
+COLUMNAS_INCREMENTAL = ['id', 'lat_hecho', 'long_hecho', 'fecha_hora_hecho']
+
+
+def _rutas(delito_sql, departamento):
+    """Retorna (ruta_dataset, ruta_watermark) de un delito."""
+    base = os.path.join(INCREMENTAL_DIR, f"{delito_sql}_{departamento}".lower().replace(' ', '_'))
+    return f"{base}.parquet", f"{base}.watermark.json"
+
+
+def leer_watermark(delito_key, departamento=DEPARTAMENTO):
+    """
+    Lee el watermark de un delito.
+
+    Returns:
+        Dict {'fecha_hora_hecho': Timestamp, 'id': int, 'filas': int, 'version', 'relectura'} o None
+    """
+    _, ruta_wm = _rutas(DELITOS[delito_key], departamento)
+    if not os.path.exists(ruta_wm):
+        return None
+
+    with open(ruta_wm, 'r', encoding='utf-8') as f:
+        wm = json.load(f)
+    wm['fecha_hora_hecho'] = pd.Timestamp(wm['fecha_hora_hecho'])
+
+    return wm
+
+
+def ultima_relectura(delito_key, departamento=DEPARTAMENTO):
+    """
+    Semanas re-leídas por la última extracción del dataset local.
+
+    Returns:
+        Dict {'version', 'version_previa', 'desde_semana', 'semanas_tardias'}
+        (version_previa None = extracción completa), o None sin watermark
+    """
+    wm = leer_watermark(delito_key, departamento)
+    if wm is None or 'version' not in wm:
+        return None
+    return dict(wm['relectura'], version=wm['version'])
+
+
+def _guardar(df, delito_sql, departamento, version, relectura):
+    """Persiste dataset y watermark de forma atómica."""
+    os.makedirs(INCREMENTAL_DIR, exist_ok=True)
+    ruta_df, ruta_wm = _rutas(delito_sql, departamento)
+
+    tmp = f"{ruta_df}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, ruta_df)
+
+    wm = {
+        'fecha_hora_hecho': str(df['fecha_hora_hecho'].max()),
+        'id': int(df['id'].max()),
+        'filas': len(df),
+        'actualizado': str(pd.Timestamp.now()),
+        'version': version,
+        'relectura': relectura
+    }
+    tmp = f"{ruta_wm}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(wm, f, indent=2)
+    os.replace(tmp, ruta_wm)
+
+
+def extraer_incremental(delito_key, departamento=DEPARTAMENTO,
+                        lookback_dias=INCREMENTAL_LOOKBACK_DIAS, reconstruir=False):
+    """
+    Actualiza el dataset local de un delito con las denuncias nuevas.
+
+    Args:
+        delito_key: Clave del delito ('hurto', 'extorsion')
+        departamento: Departamento del hecho
+        lookback_dias: Días antes del watermark que se vuelven a leer
+        reconstruir: Si True, descarta el dataset local y extrae todo el historial
+
+    Returns:
+        DataFrame con el dataset local completo (id, lat, long, fecha), o None
+    """
+    delito_sql = DELITOS[delito_key]
+    ruta_df, _ = _rutas(delito_sql, departamento)
+
+    wm = None if reconstruir else leer_watermark(delito_key, departamento)
+    if wm is not None and not os.path.exists(ruta_df):
+        wm = None
+
+    engine = obtener_engine()
+    if engine is None:
+        print("[ERROR] No se pudo conectar a la base de datos")
+        return None
+
+    columnas = ',\n            '.join(COLUMNAS_INCREMENTAL)
+    filtro_base = """
+        FROM denuncias
+        WHERE departamento_hecho = :departamento
+            AND modalidad_hecho = :delito
+            AND lat_hecho IS NOT NULL
+            AND long_hecho IS NOT NULL
+            AND fecha_hora_hecho >= :fecha_inicio
+    """
+    params = {
+        'delito': delito_sql,
+        'departamento': departamento,
+        'fecha_inicio': FECHA_INICIO_DATOS
+    }
+
+    if wm is None:
+        print(f"   [INCREMENTAL] Sin watermark: extracción completa de {delito_sql}")
+        query = text(f"SELECT\n            {columnas}\n{filtro_base}")
+        df = consultar_df(query, params=params)
+        df['fecha_hora_hecho'] = pd.to_datetime(df['fecha_hora_hecho'])
+        relectura = {'version_previa': None, 'desde_semana': None, 'semanas_tardias': []}
+    else:
+        corte = wm['fecha_hora_hecho'] - pd.Timedelta(days=lookback_dias)
+        print(f"   [INCREMENTAL] Watermark: {wm['fecha_hora_hecho']} (id {wm['id']:,}) | "
+              f"re-lectura desde {corte}")
+
+        query = text(f"""SELECT\n            {columnas}\n{filtro_base}
+            AND (fecha_hora_hecho >= :corte OR id > :ultimo_id)
+        """)
+        params.update({'corte': str(corte), 'ultimo_id': wm['id']})
+        df_nuevo = consultar_df(query, params=params)
+        df_nuevo['fecha_hora_hecho'] = pd.to_datetime(df_nuevo['fecha_hora_hecho'])
+
+        df_local = pd.read_parquet(ruta_df)
+
+        # La ventana re-leída reemplaza a la local; las tardías se deduplican por id
+        conservar = (
+            (df_local['fecha_hora_hecho'] < corte) &
+            (~df_local['id'].isin(df_nuevo['id']))
+        )
+        df = pd.concat([df_local[conservar], df_nuevo], ignore_index=True)
+
+        # Semanas cuyo contenido pudo cambiar: desde la del corte, más las de
+        # las denuncias tardías con fecha anterior al corte
+        tardias = df_nuevo.loc[df_nuevo['fecha_hora_hecho'] < corte, 'fecha_hora_hecho']
+        relectura = {
+            'version_previa': wm.get('version'),
+            'desde_semana': int(semana_ordinal([corte])[0]),
+            'semanas_tardias': sorted(int(s) for s in set(semana_ordinal(tardias)))
+        }
+
+        print(f"   [INCREMENTAL] {len(df_nuevo):,} filas leídas | "
+              f"{len(df) - len(df_local):+,} netas")
+
+    if len(df) == 0:
+        print(f"   [INCREMENTAL] Sin registros para {delito_sql}")
+        return df
+
+    df = df.sort_values(['fecha_hora_hecho', 'id']).reset_index(drop=True)
+    _guardar(df, delito_sql, departamento, uuid.uuid4().hex, relectura)
+
+    return df
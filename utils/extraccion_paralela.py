@@ -0,0 +1,109 @@
+"""
+Extracción Paralela por Particiones de Fecha
+============================================
+Divide el rango de fecha_hora_hecho en particiones (por mes o en N tramos
+iguales) y las consulta en paralelo con un pool de hilos sobre el Engine
+compartido, de modo que el SELECT no queda limitado a un solo hilo del
+servidor ni a un solo decodificador del cliente.
+
+Las particiones son intervalos [inicio, fin) contiguos; la última no tiene
+límite superior si no se pidió fecha_fin, por lo que la unión es exactamente
+el resultado de la consulta sin particionar.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from sqlalchemy import text
+
+from utils.acceso_datos import consultar_df, consultar_valor
+from utils.esquema_ingesta import compactar_tipos
+from config.config import PARTICION_EXTRACCION, EXTRACCION_WORKERS
+
+
+FORMATO_LIMITE = '%Y-%m-%d %H:%M:%S'
+
+
+def particionar_rango_fechas(fecha_inicio, fecha_fin, particiones=PARTICION_EXTRACCION):
+    """
+    Divide [fecha_inicio, fecha_fin) en intervalos contiguos.
+
+    Args:
+        fecha_inicio: Inicio del rango
+        fecha_fin: Fin del rango (exclusivo)
+        particiones: Frecuencia de pandas ('MS', 'QS', 'YS', ...) o número de tramos iguales
+
+    Returns:
+        Lista de tuplas (inicio, fin) como strings 'YYYY-MM-DD HH:MM:SS'
+    """
+    inicio, fin = pd.Timestamp(fecha_inicio), pd.Timestamp(fecha_fin)
+    if fin <= inicio:
+        return [(inicio.strftime(FORMATO_LIMITE), fin.strftime(FORMATO_LIMITE))]
+
+    if isinstance(particiones, int):
+        limites = pd.date_range(inicio, fin, periods=max(particiones, 1) + 1).floor('s')
+    else:
+        limites = pd.date_range(inicio, fin, freq=particiones)
+    limites = sorted({inicio, fin, *limites[(limites > inicio) & (limites < fin)]})
+
+    return [(a.strftime(FORMATO_LIMITE), b.strftime(FORMATO_LIMITE))
+            for a, b in zip(limites[:-1], limites[1:])]
+
+
+def extraer_particionado(columnas, construir_filtro, params, fecha_inicio, fecha_fin=None,
+                         particiones=PARTICION_EXTRACCION, max_workers=EXTRACCION_WORKERS):
+    """
+    Ejecuta una consulta por particiones de fecha en paralelo y concatena en orden.
+
+    Args:
+        columnas: Lista de columnas del SELECT
+        construir_filtro: Función fecha_fin → cláusula FROM/WHERE con
+            :fecha_inicio y, si fecha_fin no es None, :fecha_fin
+        params: Parámetros comunes de la consulta (sin fechas)
+        fecha_inicio: Inicio del rango
+        fecha_fin: Fin del rango (None = sin límite; se usa MAX(fecha_hora_hecho)
+            para trazar las particiones y la última queda abierta)
+        particiones: Frecuencia de pandas o número de tramos
+        max_workers: Hilos concurrentes
+
+    Returns:
+        DataFrame con el resultado completo, en el orden de las particiones
+    """
+    def _query(fin):
+        return text(f"SELECT {', '.join(columnas)} {construir_filtro(fin)}")
+
+    fin_rango = fecha_fin
+    if fin_rango is None:
+        maximo = consultar_valor(f"SELECT MAX(fecha_hora_hecho) {construir_filtro(None)}",
+                                 params={**params, 'fecha_inicio': fecha_inicio})
+        if maximo is None:
+            return compactar_tipos(consultar_df(_query(None), params={**params, 'fecha_inicio': fecha_inicio}))
+        fin_rango = pd.Timestamp(maximo) + pd.Timedelta(seconds=1)
+
+    rangos = particionar_rango_fechas(fecha_inicio, fin_rango, particiones)
+    if fecha_fin is None:
+        rangos[-1] = (rangos[-1][0], None)
+
+    def _extraer(rango):
+        inicio = time.time()
+        df = consultar_df(_query(rango[1]),
+                          params={**params, 'fecha_inicio': rango[0], 'fecha_fin': rango[1]})
+        return compactar_tipos(df), time.time() - inicio
+
+    print(f"   {len(rangos)} particiones con {max_workers} hilos...")
+    inicio_total = time.time()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        resultados = list(pool.map(_extraer, rangos))
+
+    duracion_total = time.time() - inicio_total
+    for (desde, hasta), (df, duracion) in zip(rangos, resultados):
+        print(f"   [{desde[:10]} → {hasta[:10] if hasta else '...'}) "
+              f"{len(df):>9,} filas en {duracion:.2f}s")
+
+    suma = sum(duracion for _, duracion in resultados)
+    print(f"   Total: {duracion_total:.2f}s de reloj, {suma:.2f}s sumando particiones "
+          f"(x{suma / max(duracion_total, 1e-9):.1f})")
+
+    return pd.concat([df for df, _ in resultados], ignore_index=True)
@@ -2,11 +2,23 @@
 Feature Engineering
 ===================
 Funciones para crear y transformar features.
+
+construir_features calcula las features temporales declaradas en
+config.ESPEC_FEATURES (lags, ventanas móviles, EWMA, misma semana del año
+anterior, acumulado) en una sola pasada por bloques de celdas del tensor
+celda×semana: cada bloque se densifica una vez, se calculan sus sumas
+acumuladas y todas las features salen de recortes de esas matrices.
 """
 
+import time
+
 import pandas as pd
 import numpy as np
-from config.config import GRID_SIZE, NUM_LAGS
+from numpy.lib.stride_tricks import sliding_window_view
+from utils.grid import codificar_celda, decodificar_celda
+from config.config import NUM_LAGS, VECINOS_LADOS, ESPEC_FEATURES, FEATURES_FILAS_BLOQUE
+
+SEMANAS_AÑO = 52
 
 
 def crear_features_espaciales(lat, long):
@@ -18,11 +30,10 @@ def crear_features_espaciales(lat, long):
         long: Longitud
         
     Returns:
-        Tupla: (grid_lat, grid_long, grid_cell)
+        Tupla: (grid_lat, grid_long, grid_cell), grid_cell es el id int64 de la celda
     """
-    grid_lat = (lat // GRID_SIZE) * GRID_SIZE
-    grid_long = (long // GRID_SIZE) * GRID_SIZE
-    grid_cell = f"{grid_lat}_{grid_long}"
+    grid_cell = codificar_celda(lat, long)
+    grid_lat, grid_long = decodificar_celda(grid_cell)
     
     return grid_lat, grid_long, grid_cell
 
@@ -40,7 +51,7 @@ def crear_features_lags(df, target_col, group_col, num_lags=NUM_LAGS):
     Returns:
         DataFrame con columnas de lags añadidas
     """
-    df = df.sort_values([group_col, 'año_semana'])
+    df = df.sort_values([group_col, 'semana_id'])
     
     for lag in range(1, num_lags + 1):
         df[f'{target_col}_lag_{lag}'] = df.groupby(group_col)[target_col].shift(lag)
@@ -68,3 +79,164 @@ def agregar_features_estadisticas(df, value_col, group_col):
     ]).reset_index()
     
     return df.merge(stats, on=group_col, how='left')
+
+
+def crear_features_vecinos(tensor, df, lados=VECINOS_LADOS, num_lags=NUM_LAGS, desde_semana=0):
+    """
+    Crea features de lags de las celdas vecinas sobre el tensor celda×semana.
+    
+    Para cada ventana lado×lado calcula una sola vez el promedio ponderado de
+    los vecinos en todas las semanas (convolución 2D en el backend denso,
+    W @ X en el disperso) y obtiene cada lag desplazando esa matriz.
+    
+    Args:
+        tensor: TensorConteos o TensorConteosDisperso
+        df: DataFrame de tensor.a_dataframe(..., desde_semana) (mismo orden de filas)
+        lados: Lados de las ventanas de vecindad
+        num_lags: Número de lags a crear
+        desde_semana: Primera semana incluida en df
+        
+    Returns:
+        DataFrame con columnas vecinos_{lado}x{lado}_lag_{k} añadidas
+    """
+    for lado in lados:
+        inicio = time.time()
+        vecinos = tensor.vecinos(lado)
+        for lag in range(1, num_lags + 1):
+            df[f'vecinos_{lado}x{lado}_lag_{lag}'] = tensor.aplanar(tensor.lag(lag, vecinos), desde_semana)
+        print(f"   Vecinos {lado}×{lado} ({tensor.backend}): {time.time() - inicio:.2f}s")
+    
+    return df
+
+
+def semanas_historia(espec=ESPEC_FEATURES):
+    """
+    Semanas previas que necesita la spec para que todas las features estén completas.
+    """
+    ventanas = (list(espec.get('lag', [])) + list(espec.get('media_movil', []))
+                + list(espec.get('std_movil', [])) + list(espec.get('max_movil', [])))
+    if espec.get('año_anterior'):
+        ventanas.append(SEMANAS_AÑO)
+    if espec.get('ewma') or espec.get('acumulado'):
+        ventanas.append(1)
+    return max(ventanas, default=0)
+
+
+def _ventana_previa(suma_acumulada, k):
+    """
+    Suma de las k semanas previas a cada semana t (columnas [t-k, t)).
+    
+    suma_acumulada tiene una columna inicial en 0: S[:, t] = suma de semanas < t.
+    Las primeras k semanas quedan con ventana incompleta (se descartan aguas abajo).
+    """
+    n_semanas = suma_acumulada.shape[1] - 1
+    t = np.arange(n_semanas)
+    return suma_acumulada[:, t] - suma_acumulada[:, np.maximum(t - k, 0)]
+
+
+def construir_features(tensor, espec=ESPEC_FEATURES, desde_semana=0, filas_bloque=FEATURES_FILAS_BLOQUE):
+    """
+    Calcula las features temporales de la spec sobre el tensor celda×semana.
+    
+    Para cada bloque de celdas el conteo se densifica una vez (también en el
+    backend disperso) y se calculan sus sumas acumuladas de x y x²; lags,
+    ventanas móviles, año anterior y acumulado son recortes de esas matrices
+    y el EWMA es una recurrencia vectorizada sobre las semanas. Todas las
+    features de la semana t usan solo semanas < t.
+    
+    Args:
+        tensor: TensorConteos o TensorConteosDisperso
+        espec: Spec declarativa (ver config.ESPEC_FEATURES)
+        desde_semana: Primera semana a devolver (>= semanas_historia(espec)
+            para que no haya ventanas incompletas)
+        filas_bloque: Celdas por bloque
+        
+    Returns:
+        Dict {columna: array 1-D en orden (celda, semana) desde desde_semana}
+    """
+    n_celdas, n_semanas = tensor.forma
+    n_salida = n_semanas - desde_semana
+    
+    columnas = {}
+    tiempos = {'(densificar + sumas acumuladas)': 0.0}
+    
+    def _guardar(nombre, valores, inicio, fin, inicio_feature):
+        if nombre not in columnas:
+            columnas[nombre] = np.empty(n_celdas * n_salida)
+            tiempos[nombre] = 0.0
+        columnas[nombre][inicio * n_salida:fin * n_salida] = valores[:, desde_semana:].ravel()
+        tiempos[nombre] += time.time() - inicio_feature
+    
+    for inicio in range(0, n_celdas, filas_bloque):
+        fin = min(inicio + filas_bloque, n_celdas)
+        
+        t0 = time.time()
+        x = tensor.filas_densas(inicio, fin).astype('float64')
+        b = fin - inicio
+        
+        # S[:, t] = suma de las semanas < t (una columna extra al inicio)
+        suma = np.zeros((b, n_semanas + 1))
+        np.cumsum(x, axis=1, out=suma[:, 1:])
+        usa_cuadrados = bool(espec.get('std_movil'))
+        if usa_cuadrados:
+            suma_cuadrados = np.zeros((b, n_semanas + 1))
+            np.cumsum(x * x, axis=1, out=suma_cuadrados[:, 1:])
+        tiempo_base = time.time() - t0
+        
+        for k in espec.get('lag', []):
+            t0 = time.time()
+            valores = np.full((b, n_semanas), np.nan)
+            valores[:, k:] = x[:, :n_semanas - k]
+            _guardar(f'crime_count_lag_{k}', valores, inicio, fin, t0)
+        
+        for k in espec.get('media_movil', []):
+            t0 = time.time()
+            _guardar(f'crime_count_media_{k}', _ventana_previa(suma, k) / k, inicio, fin, t0)
+        
+        for k in espec.get('std_movil', []):
+            t0 = time.time()
+            s1 = _ventana_previa(suma, k)
+            s2 = _ventana_previa(suma_cuadrados, k)
+            varianza = np.maximum(s2 - s1 * s1 / k, 0.0) / (k - 1) if k > 1 else np.zeros_like(s1)
+            _guardar(f'crime_count_std_{k}', np.sqrt(varianza), inicio, fin, t0)
+        
+        for k in espec.get('max_movil', []):
+            t0 = time.time()
+            valores = np.full((b, n_semanas), np.nan)
+            if k < n_semanas:
+                # Ventana [t-k, t) = ventanas deslizantes de x desplazadas una semana
+                valores[:, k:] = sliding_window_view(x, k, axis=1)[:, :n_semanas - k].max(axis=2)
+            _guardar(f'crime_count_max_{k}', valores, inicio, fin, t0)
+        
+        for span in espec.get('ewma', []):
+            t0 = time.time()
+            # Igual que pandas ewm(span, adjust=True).mean() sobre la historia previa
+            decaimiento = 1.0 - 2.0 / (span + 1.0)
+            valores = np.full((b, n_semanas), np.nan)
+            numerador = np.zeros(b)
+            denominador = 0.0
+            for t in range(1, n_semanas):
+                numerador = x[:, t - 1] + decaimiento * numerador
+                denominador = 1.0 + decaimiento * denominador
+                valores[:, t] = numerador / denominador
+            _guardar(f'crime_count_ewma_{span}', valores, inicio, fin, t0)
+        
+        if espec.get('año_anterior'):
+            t0 = time.time()
+            valores = np.full((b, n_semanas), np.nan)
+            if SEMANAS_AÑO < n_semanas:
+                valores[:, SEMANAS_AÑO:] = x[:, :n_semanas - SEMANAS_AÑO]
+            _guardar('crime_count_año_anterior', valores, inicio, fin, t0)
+        
+        if espec.get('acumulado'):
+            t0 = time.time()
+            _guardar('crime_count_acumulado', suma[:, :n_semanas], inicio, fin, t0)
+        
+        tiempos['(densificar + sumas acumuladas)'] += tiempo_base
+    
+    total = sum(tiempos.values())
+    print(f"   Features temporales ({n_celdas:,} celdas × {n_salida} semanas): {total:.2f}s")
+    for nombre, duracion in tiempos.items():
+        print(f"      {nombre:<35} {duracion:6.2f}s ({duracion / max(total, 1e-9):.0%})")
+    
+    return columnas
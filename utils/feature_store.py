@@ -0,0 +1,213 @@
+"""
+Feature Store de Datos Preparados
+=================================
+Persiste el resultado de preparar_datos_completo (X_train/X_test, targets,
+scaler, df_completo y calendario semanal) para que el runner, los mapas y
+las figuras no vuelvan a extraer, agregar y construir features.
+
+Cada entrada se direcciona por contenido: la clave es un hash de todo lo que
+determina las matrices (backend y base de origen, consulta de extracción,
+tipo de coordenadas, tamaño del grid, spec de features, FEATURE_COLS, split y
+umbrales de los targets).
+Si cambia cualquiera de ellos la clave cambia y la entrada vieja no se usa.
+
+Formato (un directorio por clave):
+- X_train.npy, X_test.npy, Y_train.npy, Y_test.npy (targets int8, una
+  columna por tipo): se abren con np.load(mmap_mode='r'), sin copiar a memoria
+- df_completo.parquet, calendario_semanas.parquet
+- scaler.joblib, meta.json (parámetros, grid_size, semana_corte, umbrales
+  de los targets, fecha)
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from config.config import (
+    DELITOS, DEPARTAMENTO, FECHA_INICIO_DATOS, TIPO_COORDENADAS, NUM_LAGS, ESPEC_FEATURES,
+    FEATURE_COLS, VECINOS_LADOS, TRAIN_TEST_SPLIT, VENTANA_TENDENCIA, MODO_UMBRALES_TARGETS,
+    CUANTILES_NIVEL_RIESGO, CUANTIL_HOTSPOT, FEATURE_STORE_DIR, FEATURE_STORE_TTL_HORAS
+)
+from utils.acceso_datos import obtener_backend, origen_datos
+from utils.target_engineering import DEFINICIONES_TARGETS, targets_por_tipo
+
+
+# Se incrementa si cambia el formato o la semántica de lo guardado
+VERSION_FEATURE_STORE = 3
+
+
+def parametros_preparacion(delito_key, grid_size, departamento=DEPARTAMENTO,
+                           fecha_inicio=FECHA_INICIO_DATOS, fecha_fin=None):
+    """
+    Todo lo que determina los datos preparados de un delito y nivel del grid.
+    """
+    return {
+        'version': VERSION_FEATURE_STORE,
+        'origen': {
+            'backend': obtener_backend(),
+            'datos': origen_datos()
+        },
+        'consulta': {
+            'delito': DELITOS[delito_key],
+            'departamento': departamento,
+            'fecha_inicio': str(fecha_inicio),
+            'fecha_fin': None if fecha_fin is None else str(fecha_fin),
+            'tipo_coordenadas': TIPO_COORDENADAS
+        },
+        'grid_size': grid_size,
+        'features': {
+            'num_lags': NUM_LAGS,
+            'espec': ESPEC_FEATURES,
+            'feature_cols': FEATURE_COLS,
+            'vecinos_lados': VECINOS_LADOS
+        },
+        'split': TRAIN_TEST_SPLIT,
+        'targets': {
+            'definiciones': DEFINICIONES_TARGETS,
+            'ventana_tendencia': VENTANA_TENDENCIA,
+            'umbrales': {
+                'modo': MODO_UMBRALES_TARGETS,
+                'cuantiles_nivel_riesgo': list(CUANTILES_NIVEL_RIESGO),
+                'cuantil_hotspot': CUANTIL_HOTSPOT
+            }
+        }
+    }
+
+
+def clave_datos_preparados(delito_key, grid_size, **kwargs):
+    """
+    Clave de contenido de los datos preparados.
+
+    Returns:
+        String '<delito>_grid<grid_size>_<hash>'
+    """
+    parametros = parametros_preparacion(delito_key, grid_size, **kwargs)
+    firma = json.dumps(parametros, sort_keys=True, default=str)
+    digest = hashlib.sha1(firma.encode('utf-8')).hexdigest()[:16]
+
+    return f"{delito_key}_grid{grid_size}_{digest}"
+
+
+def _ruta(clave):
+    return os.path.join(FEATURE_STORE_DIR, clave)
+
+
+def _leer_meta(ruta):
+    try:
+        with open(os.path.join(ruta, 'meta.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def existen_datos_preparados(clave, ttl_horas=FEATURE_STORE_TTL_HORAS):
+    """
+    True si hay una entrada completa y fresca para la clave.
+    """
+    meta = _leer_meta(_ruta(clave))
+    if meta is None:
+        return False
+    return ttl_horas is None or (time.time() - meta['creado']) / 3600 <= ttl_horas
+
+
+def leer_datos_preparados(clave, ttl_horas=FEATURE_STORE_TTL_HORAS):
+    """
+    Carga los datos preparados de la clave.
+
+    Las matrices se abren memory-mapped (solo lectura): cargar es O(metadatos)
+    y las páginas se leen del disco a medida que el modelo las usa.
+
+    Returns:
+        Dict con el formato de preparar_datos_completo, o None si no existe o expiró
+    """
+    ruta = _ruta(clave)
+    meta = _leer_meta(ruta)
+    if meta is None:
+        return None
+
+    edad_horas = (time.time() - meta['creado']) / 3600
+    if ttl_horas is not None and edad_horas > ttl_horas:
+        print(f"   [FEATURE STORE] Entrada expirada ({edad_horas:.1f}h > {ttl_horas}h)")
+        return None
+
+    inicio = time.time()
+
+    def _matriz(nombre):
+        return np.load(os.path.join(ruta, f'{nombre}.npy'), mmap_mode='r')
+
+    Y_train, Y_test = _matriz('Y_train'), _matriz('Y_test')
+    datos = {
+        'X_train': _matriz('X_train'),
+        'X_test': _matriz('X_test'),
+        'Y_train': Y_train,
+        'Y_test': Y_test,
+        'targets': targets_por_tipo(Y_train, Y_test, meta['tipos']),
+        'scaler': joblib.load(os.path.join(ruta, 'scaler.joblib')),
+        'df_completo': pd.read_parquet(os.path.join(ruta, 'df_completo.parquet')),
+        'grid_size': meta['grid_size'],
+        'semana_corte': meta['semana_corte'],
+        'umbrales_targets': meta['umbrales_targets'],
+        'calendario_semanas': pd.read_parquet(os.path.join(ruta, 'calendario_semanas.parquet'))
+    }
+
+    print(f"   [FEATURE STORE] {clave} ({edad_horas:.1f}h de antigüedad) "
+          f"cargado en {(time.time() - inicio) * 1000:.0f} ms")
+    return datos
+
+
+def guardar_datos_preparados(clave, datos, parametros=None):
+    """
+    Guarda los datos preparados bajo la clave.
+
+    Se escribe en un directorio temporal y se renombra al final, de modo que
+    un lector nunca ve una entrada a medias.
+    """
+    ruta = _ruta(clave)
+    tmp = f"{ruta}.tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    np.save(os.path.join(tmp, 'X_train.npy'), np.ascontiguousarray(datos['X_train']))
+    np.save(os.path.join(tmp, 'X_test.npy'), np.ascontiguousarray(datos['X_test']))
+    np.save(os.path.join(tmp, 'Y_train.npy'), np.ascontiguousarray(datos['Y_train']))
+    np.save(os.path.join(tmp, 'Y_test.npy'), np.ascontiguousarray(datos['Y_test']))
+
+    joblib.dump(datos['scaler'], os.path.join(tmp, 'scaler.joblib'))
+    datos['df_completo'].to_parquet(os.path.join(tmp, 'df_completo.parquet'), index=False)
+    datos['calendario_semanas'].to_parquet(os.path.join(tmp, 'calendario_semanas.parquet'), index=False)
+
+    with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'clave': clave,
+            'parametros': parametros or {},
+            'tipos': list(datos['targets']),
+            'grid_size': datos['grid_size'],
+            'semana_corte': int(datos['semana_corte']),
+            'umbrales_targets': datos['umbrales_targets'],
+            'filas_train': len(datos['X_train']),
+            'filas_test': len(datos['X_test']),
+            'creado': time.time()
+        }, f, ensure_ascii=False, indent=2, default=str)
+
+    shutil.rmtree(ruta, ignore_errors=True)
+    os.replace(tmp, ruta)
+    print(f"   [FEATURE STORE] Guardado {clave}")
+
+
+def invalidar_datos_preparados(clave):
+    """
+    Elimina la entrada de la clave.
+
+    Returns:
+        True si existía
+    """
+    ruta = _ruta(clave)
+    existia = os.path.isdir(ruta)
+    shutil.rmtree(ruta, ignore_errors=True)
+    return existia
@@ -0,0 +1,134 @@
+"""
+Identificadores Enteros de Celdas del Grid
+==========================================
+Cada celda del grid se identifica por su índice entero (fila, columna) en la
+retícula de GRID_SIZE:
+
+    fila = floor(lat / GRID_SIZE)      columna = floor(long / GRID_SIZE)
+
+y ambos índices se empaquetan en un único int64:
+
+    celda_id = (fila + OFFSET) * BASE + (columna + OFFSET)
+
+Agrupar, ordenar y unir por un int64 es mucho más rápido que por strings de
+Python, y el id no depende de la representación textual de los floats. El
+orden de celda_id es (fila, columna), es decir de sur a norte y de oeste a este.
+
+Pirámide multi-resolución: si un nivel es k veces el tamaño base, su celda es
+(fila // k, columna // k); se obtiene de los índices base sin volver a leer
+las coordenadas (ver reducir_celda).
+
+Vecindad: kernel_vecindad define los pesos de las celdas vecinas en una
+ventana lado×lado alrededor de (fila, columna).
+"""
+
+import numpy as np
+
+from config.config import GRID_SIZE
+
+
+# Los índices se desplazan a [0, 2^31) para que el empaquetado no desborde int64
+OFFSET = 2 ** 30
+BASE = 2 ** 32
+
+
+def indices_celda(lat, long, grid_size=GRID_SIZE):
+    """
+    Índices enteros (fila, columna) de las coordenadas en la retícula.
+
+    Usa floor(coord / grid_size) en float64, la misma expresión que FLOOR()
+    en MySQL, para que el camino pandas y el push-down SQL coincidan.
+
+    Returns:
+        Tupla de arrays int64: (fila, columna)
+    """
+    fila = np.floor(np.asarray(lat, dtype='float64') / grid_size).astype('int64')
+    columna = np.floor(np.asarray(long, dtype='float64') / grid_size).astype('int64')
+    return fila, columna
+
+
+def empaquetar_celda(fila, columna):
+    """
+    Empaqueta índices (fila, columna) en celda_id int64.
+    """
+    fila = np.asarray(fila, dtype='int64')
+    columna = np.asarray(columna, dtype='int64')
+    return (fila + OFFSET) * BASE + (columna + OFFSET)
+
+
+def desempaquetar_celda(celda_id):
+    """
+    Recupera los índices (fila, columna) de celda_id.
+
+    Returns:
+        Tupla de arrays int64: (fila, columna)
+    """
+    celda_id = np.asarray(celda_id, dtype='int64')
+    return celda_id // BASE - OFFSET, celda_id % BASE - OFFSET
+
+
+def codificar_celda(lat, long, grid_size=GRID_SIZE):
+    """
+    Calcula el celda_id int64 de cada par de coordenadas.
+    """
+    return empaquetar_celda(*indices_celda(lat, long, grid_size))
+
+
+def decodificar_celda(celda_id, grid_size=GRID_SIZE):
+    """
+    Coordenadas de la esquina inferior-izquierda (sur-oeste) de cada celda.
+
+    Returns:
+        Tupla de arrays float64: (lat_grid, long_grid)
+    """
+    fila, columna = desempaquetar_celda(celda_id)
+    return fila * grid_size, columna * grid_size
+
+
+def factor_nivel(grid_base, grid_size):
+    """
+    Factor entero k tal que grid_size = k × grid_base.
+
+    Raises:
+        ValueError: Si grid_size no es un múltiplo entero de grid_base
+    """
+    factor = int(round(grid_size / grid_base))
+    if factor < 1 or abs(factor * grid_base - grid_size) > 1e-9:
+        raise ValueError(f"El nivel {grid_size} no es múltiplo entero de {grid_base}")
+    return factor
+
+
+def kernel_vecindad(lado):
+    """
+    Pesos de la ventana lado×lado centrada en una celda, sin la celda central.
+
+    Cada vecina pesa 1 / distancia (en celdas) y los pesos suman 1, de modo
+    que la convolución da el promedio de los vecinos ponderado por cercanía.
+
+    Args:
+        lado: Celdas por lado de la ventana (impar, >= 3)
+
+    Returns:
+        Array float64 (lado, lado); kernel[radio + dfila, radio + dcolumna]
+
+    Raises:
+        ValueError: Si lado no es impar o es menor que 3
+    """
+    if lado < 3 or lado % 2 == 0:
+        raise ValueError(f"El lado de la vecindad debe ser impar y >= 3 (se recibió {lado})")
+
+    radio = lado // 2
+    dfila, dcolumna = np.mgrid[-radio:radio + 1, -radio:radio + 1]
+    distancia = np.hypot(dfila, dcolumna)
+
+    pesos = np.zeros((lado, lado))
+    pesos[distancia > 0] = 1.0 / distancia[distancia > 0]
+    return pesos / pesos.sum()
+
+
+def reducir_celda(celda_id, factor):
+    """
+    celda_id del nivel `factor` veces más grueso que el de celda_id.
+    """
+    fila, columna = desempaquetar_celda(celda_id)
+    return empaquetar_celda(fila // factor, columna // factor)
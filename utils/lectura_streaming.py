@@ -0,0 +1,146 @@
+"""
+Lectura en Streaming y Agregación por Chunks
+============================================
+Lee resultados por páginas de tamaño fijo y los agrega en línea, de modo
+que la memoria pico depende del número de pares celda×semana distintos y no
+del número de denuncias leídas.
+
+Las páginas se piden con paginación por clave (WHERE id > :ultimo ORDER BY
+id LIMIT n) y no con stream_results: el dialecto mysql+mysqlconnector no
+tiene cursores del lado del servidor y con stream_results igual traería
+todo el resultado al cliente antes del primer chunk. Cada página es una
+consulta independiente que recorre el índice de la clave primaria, con
+cualquier driver y también en el backend SQLite.
+"""
+
+import pandas as pd
+from sqlalchemy import text
+
+from config.config import STREAMING_CHUNK_SIZE, GRID_SIZE
+
+
+def leer_por_chunks(engine, query, params=None, chunksize=STREAMING_CHUNK_SIZE, clave='id'):
+    """
+    Itera sobre el resultado de una consulta en DataFrames de `chunksize` filas.
+
+    La consulta se envuelve en una tabla derivada paginada por `clave`, de
+    modo que el cliente nunca tiene más de una página en memoria. Las filas
+    salen ordenadas por `clave`; las insertadas durante la lectura con una
+    clave mayor que la última leída también se incluyen.
+
+    Args:
+        engine: Engine de SQLAlchemy
+        query: Consulta (sqlalchemy.text o string) que incluya la columna `clave`
+        params: Parámetros de la consulta
+        chunksize: Filas por bloque
+        clave: Columna única y creciente por la que se pagina (clave primaria)
+
+    Yields:
+        DataFrame con hasta `chunksize` filas
+    """
+    sql = query.text if hasattr(query, 'text') else str(query)
+    params = dict(params or {})
+    ultima_clave = None
+
+    while True:
+        filtro = f"WHERE pagina.{clave} > :ultima_clave" if ultima_clave is not None else ""
+        pagina = text(f"""
+            SELECT * FROM ({sql}) AS pagina
+            {filtro}
+            ORDER BY pagina.{clave}
+            LIMIT :filas_pagina
+        """)
+        with engine.connect() as conn:
+            chunk = pd.read_sql(pagina, conn,
+                                params={**params, 'ultima_clave': ultima_clave, 'filas_pagina': chunksize})
+
+        if len(chunk) == 0:
+            return
+        yield chunk
+        if len(chunk) < chunksize:
+            return
+        ultima_clave = chunk[clave].iloc[-1].item()
+
+
+class AgregadorConteos:
+    """
+    Agregador en línea de conteos celda×semana.
+
+    Cada chunk de puntos crudos se agrega con utils.data_preparation.agregar_conteos
+    y queda pendiente; los parciales pendientes se fusionan con el acumulado
+    cuando suman tantas filas como él (y al pedir el resultado). Así cada
+    fusión cuesta a lo sumo el doble de lo pendiente y el costo total es
+    lineal en las filas de los parciales, en vez de re-agregar el acumulado
+    completo en cada chunk. El resultado final es idéntico a agregar el
+    DataFrame completo de una sola vez.
+    """
+
+    def __init__(self, grid_size=GRID_SIZE):
+        self.grid_size = grid_size
+        self._conteos = None
+        self._perfil = None
+        self._pendientes = []
+        self._filas_pendientes = 0
+        self.filas_leidas = 0
+        self.chunks = 0
+
+    def actualizar(self, chunk):
+        """
+        Incorpora un chunk de puntos (lat_hecho, long_hecho, fecha_hora_hecho).
+        """
+        # Import local: data_preparation importa este módulo
+        from utils.data_preparation import agregar_conteos
+
+        if len(chunk) == 0:
+            return
+
+        parcial, perfil = agregar_conteos(chunk, self.grid_size)
+        self._pendientes.append((
+            parcial.set_index(['grid_cell', 'semana_id'])['crime_count'],
+            perfil.set_index(['semana_id', 'dia_semana'])['denuncias']
+        ))
+        self._filas_pendientes += len(parcial)
+
+        if self._filas_pendientes >= (0 if self._conteos is None else len(self._conteos)):
+            self._fusionar()
+
+        self.filas_leidas += len(chunk)
+        self.chunks += 1
+
+    def _fusionar(self):
+        """Suma los parciales pendientes al acumulado en una sola pasada."""
+        if not self._pendientes:
+            return
+
+        conteos = [parcial for parcial, _ in self._pendientes]
+        perfiles = [perfil for _, perfil in self._pendientes]
+        if self._conteos is not None:
+            conteos.insert(0, self._conteos)
+            perfiles.insert(0, self._perfil)
+
+        self._conteos = pd.concat(conteos).groupby(level=[0, 1]).sum()
+        self._perfil = pd.concat(perfiles).groupby(level=[0, 1]).sum()
+        self._pendientes = []
+        self._filas_pendientes = 0
+
+    def resultado(self):
+        """
+        Retorna el agregado acumulado.
+
+        Returns:
+            Tupla: (hotspot_counts, perfil_dias) con el mismo formato que agregar_conteos
+        """
+        self._fusionar()
+        if self._conteos is None:
+            return (
+                pd.DataFrame(columns=['grid_cell', 'semana_id', 'crime_count']),
+                pd.DataFrame(columns=['semana_id', 'dia_semana', 'denuncias'])
+            )
+
+        hotspot_counts = self._conteos.sort_index().reset_index(name='crime_count')
+        hotspot_counts['crime_count'] = hotspot_counts['crime_count'].astype('int64')
+
+        perfil_dias = self._perfil.sort_index().reset_index(name='denuncias')
+        perfil_dias = perfil_dias.astype({'dia_semana': 'int32', 'denuncias': 'int64'})
+
+        return hotspot_counts, perfil_dias
@@ -34,13 +34,18 @@ def guardar_mejores_modelos(resultados, delito_key):
             print(f"   {mejor['nombre_clasificacion']}: {mejor['modelo']} (F1: {mejor['f1']:.4f})")
 
 
-def generar_resumen_resultados(todos_resultados):
+def generar_resumen_resultados(todos_resultados, fallidos=None):
     """
     Genera resumen completo con enfoque operacional.
     
     Args:
         todos_resultados: Lista de diccionarios con resultados
+        fallidos: Lista de trabajos sin resultado ({'delito', 'grid_size',
+            'tipo_clasificacion', 'modelo', 'error'}, ver entrenar_en_paralelo)
     """
+    if fallidos:
+        mostrar_modelos_fallidos(fallidos)
+    
     if not todos_resultados:
         print("\n[ERROR] No hay resultados para mostrar")
         return None
@@ -52,7 +57,8 @@ def generar_resumen_resultados(todos_resultados):
     print(f"{'='*80}")
     
     # Resumen general
-    print(f"\n📊 Total modelos entrenados: {len(df_resultados)}")
+    print(f"\n📊 Total modelos entrenados: {len(df_resultados)}"
+          f"{f' ({len(fallidos)} sin resultado)' if fallidos else ''}")
     
     for tipo_clf, info in TIPOS_CLASIFICACION.items():
         count = len(df_resultados[df_resultados['tipo_clasificacion'] == tipo_clf])
@@ -88,6 +94,19 @@ def generar_resumen_resultados(todos_resultados):
     return df_resultados
 
 
+def mostrar_modelos_fallidos(fallidos):
+    """
+    Lista los modelos que no produjeron resultado y el motivo.
+    """
+    print(f"\n{'='*80}")
+    print(f"MODELOS SIN RESULTADO ({len(fallidos)})")
+    print(f"{'='*80}")
+    
+    for fallido in fallidos:
+        print(f"   {fallido['delito'].upper():10s} grid {fallido['grid_size']} | "
+              f"{fallido['tipo_clasificacion']:16s} | {fallido['modelo']:20s} → {fallido['error']}")
+
+
 def mostrar_mejores_por_delito(df_resultados):
     """
     Muestra los mejores modelos por delito y tipo de clasificación.
@@ -147,6 +166,28 @@ def generar_recomendaciones_operacionales(df_resultados):
                 print(f"      ✗ Requiere mejora significativa")
 
 
+def mostrar_comparacion_niveles(df_resultados):
+    """
+    Compara el mejor F1 por delito y tipo de clasificación entre niveles del grid.
+    """
+    if 'grid_size' not in df_resultados.columns:
+        return
+    
+    print(f"\n{'='*80}")
+    print("COMPARACIÓN ENTRE RESOLUCIONES DEL GRID (mejor F1)")
+    print(f"{'='*80}")
+    
+    tabla = df_resultados.pivot_table(
+        index=['delito', 'nombre_clasificacion'], columns='grid_size',
+        values='f1', aggfunc='max'
+    )
+    
+    for (delito, nombre), fila in tabla.iterrows():
+        mejor_nivel = fila.idxmax()
+        valores = '  '.join(f"{nivel}: {f1:.4f}" for nivel, f1 in fila.items())
+        print(f"   {delito.upper():10s} {nombre:20s} {valores}  → mejor {mejor_nivel}")
+
+
 def guardar_resultados_csv(df_resultados):
     """
     Guarda los resultados en CSV.
@@ -0,0 +1,81 @@
+"""
+Presupuesto de CPU del Entrenamiento
+====================================
+Reparte PRESUPUESTO_CPU núcleos entre los cuatro niveles de paralelismo que
+pueden anidarse al entrenar, para que su producto no supere el presupuesto:
+
+- procesos del pool de entrenamiento (utils.entrenamiento_paralelo)
+- n_jobs de RandomizedSearchCV (solo con optimizar=True)
+- n_jobs del estimador (random_forest, knn, sgd one-vs-all)
+- hilos de BLAS/OpenMP (threadpoolctl), que usa logistic
+
+Primero se reparte el presupuesto entre los procesos del pool; dentro de
+cada trabajo, la búsqueda toma los núcleos que puede aprovechar (hasta
+n_iter × folds ajustes) y lo que queda va al estimador o a BLAS según el
+algoritmo. Los modelos sin paralelismo propio corren con 1 hilo.
+"""
+
+import os
+
+from config.config import PRESUPUESTO_CPU
+
+
+# Dónde aprovecha núcleos cada algoritmo fuera de la búsqueda
+PARALELISMO_MODELOS = {
+    'sgd': 'estimador',
+    'logistic': 'blas',
+    'random_forest': 'estimador',
+    'gradient_boosting': None,
+    'knn': 'estimador',
+    'decision_tree': None,
+    'adaboost': None
+}
+
+
+def nucleos_presupuesto(presupuesto=PRESUPUESTO_CPU):
+    """
+    Núcleos totales del presupuesto (None = os.cpu_count()).
+    """
+    return max(1, presupuesto or os.cpu_count() or 1)
+
+
+def repartir_pool(num_trabajos, max_workers=None, presupuesto=PRESUPUESTO_CPU):
+    """
+    Procesos del pool y núcleos de cada trabajo.
+
+    Args:
+        num_trabajos: Trabajos a ejecutar
+        max_workers: Tope de procesos pedido (None = sin tope propio)
+        presupuesto: Núcleos totales
+
+    Returns:
+        Tupla (procesos, nucleos_por_trabajo)
+    """
+    total = nucleos_presupuesto(presupuesto)
+    procesos = max(1, min(total, num_trabajos, max_workers or total))
+    return procesos, max(1, total // procesos)
+
+
+def asignar_nucleos(nombre_modelo, nucleos, ajustes_busqueda=0):
+    """
+    Reparto de los núcleos de un trabajo entre búsqueda, estimador y BLAS.
+
+    Args:
+        nombre_modelo: Nombre del modelo
+        nucleos: Núcleos disponibles para el trabajo
+        ajustes_busqueda: n_iter × folds de RandomizedSearchCV (0 = sin búsqueda)
+
+    Returns:
+        Dict {'nucleos', 'n_jobs_busqueda', 'n_jobs_estimador', 'hilos_blas'}
+    """
+    nucleos = max(1, int(nucleos))
+    n_jobs_busqueda = max(1, min(nucleos, ajustes_busqueda)) if ajustes_busqueda else 1
+    internos = max(1, nucleos // n_jobs_busqueda)
+    paralelismo = PARALELISMO_MODELOS.get(nombre_modelo)
+
+    return {
+        'nucleos': nucleos,
+        'n_jobs_busqueda': n_jobs_busqueda,
+        'n_jobs_estimador': internos if paralelismo == 'estimador' else 1,
+        'hilos_blas': internos if paralelismo == 'blas' else 1
+    }
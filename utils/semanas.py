@@ -0,0 +1,100 @@
+"""
+Ordinal Entero de Semana
+========================
+Cada semana (lunes a domingo) se identifica por un entero:
+
+    semana_id = floor((días desde 1970-01-01 + 3) / 7)
+
+El 1970-01-01 fue jueves; sumar 3 días alinea los cortes con el lunes, por lo
+que las semanas coinciden con las semanas ISO. A diferencia de la clave
+strftime('%Y-%U'), la semana t-1 es siempre semana_id - 1 (ordenar y desplazar
+es aritmética entera) y el cambio de año no parte una semana real en dos
+(la semana '00' de %U).
+
+calendario_semanas construye la tabla semanal (una fila por semana_id) con
+las fechas, el mes canónico y el perfil por día de semana; se une al
+agregado celda×semana por la clave entera sin multiplicar filas.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+DESFASE_LUNES = 3
+
+# Misma expresión en SQL (MySQL y el backend SQLite emulan DATEDIFF)
+SQL_SEMANA_ID = "FLOOR((DATEDIFF(fecha_hora_hecho, '1970-01-01') + 3) / 7)"
+
+
+def semana_ordinal(fechas):
+    """
+    semana_id de cada fecha (vectorizado, sin formatear strings).
+
+    Args:
+        fechas: Serie/array datetime64 (cualquier resolución)
+
+    Returns:
+        Array int64
+    """
+    dias = np.asarray(fechas, dtype='datetime64[D]').astype('int64')
+    return (dias + DESFASE_LUNES) // 7
+
+
+def inicio_semana(semana_id):
+    """
+    Lunes de cada semana_id.
+
+    Returns:
+        Array datetime64[D]
+    """
+    semana_id = np.asarray(semana_id, dtype='int64')
+    return (semana_id * 7 - DESFASE_LUNES).astype('datetime64[D]')
+
+
+def calendario_semanas(semana_ids, perfil_dias=None):
+    """
+    Calendario semanal: una fila por semana_id.
+
+    - inicio / fin: lunes y domingo de la semana
+    - etiqueta: 'YYYY-Www' (ISO 8601), para mostrar resultados
+    - mes: mes canónico, el del jueves (la semana pertenece al mes que
+      contiene la mayoría de sus días, como en ISO 8601)
+    - semana_año: número de semana ISO (1-53)
+    - perfil_dia_0..6 (si se entrega perfil_dias): fracción de las denuncias
+      de la semana ocurridas cada día (0 = lunes); 0 en semanas sin denuncias
+
+    Args:
+        semana_ids: Iterable de semana_id
+        perfil_dias: DataFrame ['semana_id', 'dia_semana', 'denuncias'] (opcional)
+
+    Returns:
+        DataFrame ordenado por semana_id, sin semanas repetidas
+    """
+    semana_ids = np.unique(np.asarray(semana_ids, dtype='int64'))
+    inicio = pd.to_datetime(inicio_semana(semana_ids))
+    iso = inicio.isocalendar()
+
+    calendario = pd.DataFrame({
+        'semana_id': semana_ids,
+        'inicio': inicio,
+        'fin': inicio + pd.Timedelta(days=6),
+        'etiqueta': (iso['year'].astype(str) + '-W' + iso['week'].astype(str).str.zfill(2)).to_numpy(),
+        'mes': (inicio + pd.Timedelta(days=3)).month.astype('int32'),
+        'semana_año': iso['week'].to_numpy().astype('int32')
+    })
+
+    if perfil_dias is not None:
+        denuncias = np.zeros((len(semana_ids), 7))
+        fila = np.searchsorted(semana_ids, perfil_dias['semana_id'].to_numpy(dtype='int64'))
+        dentro = (fila < len(semana_ids)) & (semana_ids[np.minimum(fila, len(semana_ids) - 1)]
+                                             == perfil_dias['semana_id'].to_numpy(dtype='int64'))
+        np.add.at(denuncias,
+                  (fila[dentro], perfil_dias['dia_semana'].to_numpy(dtype='int64')[dentro]),
+                  perfil_dias['denuncias'].to_numpy()[dentro])
+
+        total = denuncias.sum(axis=1, keepdims=True)
+        perfil = np.divide(denuncias, total, out=np.zeros_like(denuncias), where=total > 0)
+        for dia in range(7):
+            calendario[f'perfil_dia_{dia}'] = perfil[:, dia]
+
+    return calendario
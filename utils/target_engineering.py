@@ -2,17 +2,27 @@
 Ingeniería de Targets de Clasificación
 =======================================
 Define múltiples targets de clasificación con valor operacional claro.
+
+Todos los targets se calculan en una sola pasada (construir_targets) a partir
+de un registro de definiciones (DEFINICIONES_TARGETS): cada target clasifica
+una entrada por fila ('conteo' o 'ratio_tendencia') según sus bordes.
+Las funciones crear_target_* se mantienen para calcular un target suelto.
 """
 
 import pandas as pd
 import numpy as np
 
+from config.config import (
+    BINS_NIVEL_RIESGO, UMBRAL_HOTSPOT, UMBRALES_TENDENCIA, VENTANA_TENDENCIA, TARGETS_FILAS_BLOQUE,
+    CLASE_SIN_ACTIVIDAD_TENDENCIA
+)
+
 
 # ============================================================================
 # CLASIFICACIÓN 1: NIVEL DE RIESGO (MULTICLASE - 4 CATEGORÍAS)
 # ============================================================================
 
-def crear_target_nivel_riesgo(crime_counts):
+def crear_target_nivel_riesgo(crime_counts, bins=BINS_NIVEL_RIESGO):
     """
     Clasifica zonas según nivel de riesgo para asignación de recursos.
     
@@ -27,11 +37,11 @@ def crear_target_nivel_riesgo(crime_counts):
     
     Args:
         crime_counts: Array con cantidad de crímenes
+        bins: Límites de las categorías (default: BINS_NIVEL_RIESGO)
         
     Returns:
         Array categórico (0, 1, 2, 3)
     """
-    bins = [0, 2, 5, 10, float('inf')]
     labels = [0, 1, 2, 3]  # Bajo, Medio, Alto, Muy Alto
     
     return pd.cut(
@@ -46,7 +56,7 @@ def crear_target_nivel_riesgo(crime_counts):
 # CLASIFICACIÓN 2: HOTSPOT CRÍTICO (BINARIA)
 # ============================================================================
 
-def crear_target_hotspot_critico(crime_counts, umbral=5):
+def crear_target_hotspot_critico(crime_counts, umbral=UMBRAL_HOTSPOT):
     """
     Identifica zonas que requieren intervención inmediata.
     
@@ -71,7 +81,9 @@ def crear_target_hotspot_critico(crime_counts, umbral=5):
 # CLASIFICACIÓN 3: TENDENCIA DE RIESGO (MULTICLASE - 3 CATEGORÍAS)
 # ============================================================================
 
-def crear_target_tendencia(df_completo, group_col='grid_cell'):
+def crear_target_tendencia(df_completo, group_col='grid_cell', promedio_historico=None,
+                           umbrales=UMBRALES_TENDENCIA, ventana=VENTANA_TENDENCIA,
+                           clase_sin_actividad=CLASE_SIN_ACTIVIDAD_TENDENCIA):
     """
     Clasifica zonas según si están mejorando, estables o empeorando.
     
@@ -80,6 +92,10 @@ def crear_target_tendencia(df_completo, group_col='grid_cell'):
     - 1 = ESTABLE   → Entre 0.7 y 1.3 del promedio             → Estable
     - 2 = ESCALADA  → Crime_actual > Promedio_histórico * 1.3  → Empeorando (ALERTA)
     
+    Una semana sin denuncias en una celda sin denuncias en las semanas
+    previas (0 / promedio 0) tiene ratio 0 y queda como DESCENSO, salvo que
+    se indique otra clase con clase_sin_actividad (ej: 1 = ESTABLE).
+    
     Pregunta que responde:
     "¿Esta zona está mejorando o empeorando?"
     
@@ -89,64 +105,240 @@ def crear_target_tendencia(df_completo, group_col='grid_cell'):
     - Alertas tempranas de deterioro
     
     Args:
-        df_completo: DataFrame con columnas ['grid_cell', 'año_semana', 'crime_count']
-        group_col: Columna para agrupar (default: 'grid_cell')
+        df_completo: DataFrame con columnas ['grid_cell', 'semana_id', 'crime_count']
+        group_col: Columna para agrupar (default: 'grid_cell', id int64 de la celda)
+        promedio_historico: Promedio de las `ventana` semanas previas alineado con las
+            filas de df_completo (p.ej. TensorConteos.media_movil). Si es None
+            se calcula con promedio_previo_por_grupo sobre df_completo ordenado
+            por celda y semana (el resultado queda en ese orden).
+        umbrales: (descenso, escalada) del ratio (default: UMBRALES_TENDENCIA)
+        ventana: Semanas del promedio histórico (default: VENTANA_TENDENCIA)
+        clase_sin_actividad: Clase de las filas con conteo 0 y promedio 0
+            (default: CLASE_SIN_ACTIVIDAD_TENDENCIA; None = la del ratio)
         
     Returns:
         Array categórico (0, 1, 2)
     """
-    # Calcular promedio histórico por celda (excluyendo semana actual)
-    df_sorted = df_completo.sort_values([group_col, 'año_semana']).copy()
-    
-    # Promedio móvil de las últimas 4 semanas (excluyendo la actual)
-    df_sorted['crime_promedio_historico'] = (
-        df_sorted.groupby(group_col)['crime_count']
-        .transform(lambda x: x.shift(1).rolling(window=4, min_periods=1).mean())
-    )
+    if promedio_historico is not None:
+        conteos = df_completo['crime_count'].to_numpy()
+        promedio = np.asarray(promedio_historico, dtype='float64')
+    else:
+        # Ordenar por celda y semana (orden estable, igual que sort_values)
+        orden = np.lexsort((df_completo['semana_id'].to_numpy(), df_completo[group_col].to_numpy()))
+        conteos = df_completo['crime_count'].to_numpy()[orden]
+        promedio = promedio_previo_por_grupo(df_completo[group_col].to_numpy()[orden], conteos, ventana)
     
     # Calcular ratio
-    df_sorted['ratio'] = df_sorted['crime_count'] / (df_sorted['crime_promedio_historico'] + 0.1)
+    ratio = conteos / (promedio + 0.1)
     
-    # Clasificar tendencia
-    def clasificar_tendencia(ratio):
-        if ratio < 0.7:
-            return 0  # Descenso
-        elif ratio <= 1.3:
-            return 1  # Estable
-        else:
-            return 2  # Escalada
+    # Clasificar tendencia: [0, descenso) → 0, [descenso, escalada] → 1, resto → 2.
+    # nextafter vuelve inclusivo el borde de escalada; NaN (sin historia) cae en 2.
+    umbral_descenso, umbral_escalada = umbrales
+    bordes = np.array([umbral_descenso, np.nextafter(umbral_escalada, np.inf)])
+    tendencias = np.digitize(ratio, bordes).astype('int64')
     
-    tendencias = df_sorted['ratio'].apply(clasificar_tendencia)
+    if clase_sin_actividad is not None:
+        tendencias[(conteos == 0) & (promedio == 0)] = clase_sin_actividad
     
-    return tendencias.values
+    return tendencias
+
+
+def promedio_previo_por_grupo(grupos, conteos, ventana=VENTANA_TENDENCIA):
+    """
+    Promedio de hasta `ventana` valores previos dentro de cada grupo.
+    
+    Equivale a groupby(grupos).transform(lambda x: x.shift(1).rolling(ventana,
+    min_periods=1).mean()) con sumas acumuladas segmentadas: la suma de la
+    ventana es la diferencia de dos posiciones de la suma acumulada, recortada
+    al inicio del grupo. Con conteos enteros la suma acumulada es exacta, por
+    lo que el resultado coincide bit a bit con el de pandas.
+    
+    Args:
+        grupos: Array con el grupo de cada fila, filas del mismo grupo contiguas
+            y ordenadas en el tiempo
+        conteos: Array de valores alineado con grupos
+        ventana: Cantidad de valores previos a promediar
+        
+    Returns:
+        Array float64 (NaN en la primera fila de cada grupo)
+    """
+    n = len(conteos)
+    tipo_acumulado = 'int64' if np.issubdtype(np.asarray(conteos).dtype, np.integer) else 'float64'
+    acumulado = np.zeros(n + 1, dtype=tipo_acumulado)
+    np.cumsum(conteos, out=acumulado[1:])
+    
+    # Posición de cada fila dentro de su grupo
+    inicio_grupo = np.flatnonzero(np.r_[True, grupos[1:] != grupos[:-1]]) if n else np.zeros(0, dtype='int64')
+    filas = np.arange(n)
+    posicion = filas - np.repeat(inicio_grupo, np.diff(np.r_[inicio_grupo, n]))
+    
+    # Ventana previa: filas [i - previos, i)
+    previos = np.minimum(posicion, ventana)
+    suma = acumulado[filas] - acumulado[filas - previos]
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        promedio = suma / previos
+    promedio[previos == 0] = np.nan
+    
+    return promedio
 
 
 # ============================================================================
-# FUNCIÓN PRINCIPAL: CREAR TODOS LOS TARGETS
+# REGISTRO DE TARGETS Y PASADA ÚNICA
 # ============================================================================
 
-def crear_todos_los_targets(df_completo):
+# Entradas por fila que pueden clasificar los targets:
+# - 'conteo': crime_count de la semana
+# - 'ratio_tendencia': crime_count / (promedio histórico + 0.1)
+ENTRADAS_TARGETS = ('conteo', 'ratio_tendencia')
+
+# Cada target es np.digitize(entrada, bordes, right=derecha); el orden del
+# registro es el orden de las columnas de construir_targets.
+# - nivel_riesgo: (.., 2] → 0, (2, 5] → 1, (5, 10] → 2, resto → 3 (= pd.cut)
+# - hotspot_critico: <= UMBRAL_HOTSPOT → 0, resto → 1
+# - tendencia: < descenso → 0, <= escalada → 1, resto o sin historia → 2;
+#   con clase_sin_actividad (CLASE_SIN_ACTIVIDAD_TENDENCIA), las filas con
+#   conteo 0 y promedio 0 van a esa clase en lugar de la del ratio
+DEFINICIONES_TARGETS = {
+    'nivel_riesgo': {
+        'entrada': 'conteo',
+        'bordes': BINS_NIVEL_RIESGO[1:-1],
+        'derecha': True
+    },
+    'hotspot_critico': {
+        'entrada': 'conteo',
+        'bordes': [UMBRAL_HOTSPOT],
+        'derecha': True
+    },
+    'tendencia': {
+        'entrada': 'ratio_tendencia',
+        'bordes': [UMBRALES_TENDENCIA[0], np.nextafter(UMBRALES_TENDENCIA[1], np.inf)],
+        'derecha': False,
+        'clase_sin_actividad': CLASE_SIN_ACTIVIDAD_TENDENCIA
+    }
+}
+
+
+def registrar_target(nombre, entrada, bordes, derecha=False, clase_sin_actividad=None):
+    """
+    Agrega (o reemplaza) un target en DEFINICIONES_TARGETS.
+    
+    El nuevo target se calcula en la misma pasada que los demás. Para
+    entrenarlo, agregarlo también a TIPOS_CLASIFICACION en la configuración.
+    
+    Args:
+        nombre: Nombre del target (columna en construir_targets)
+        entrada: Una de ENTRADAS_TARGETS
+        bordes: Bordes crecientes entre clases (len(bordes) + 1 clases)
+        derecha: True si cada borde pertenece a la clase inferior
+        clase_sin_actividad: Clase de las filas con conteo 0 y promedio
+            histórico 0 (None = la que asignen los bordes)
+    """
+    if entrada not in ENTRADAS_TARGETS:
+        raise ValueError(f"Entrada '{entrada}' no soportada; opciones: {ENTRADAS_TARGETS}")
+    if len(bordes) >= np.iinfo(np.int8).max or np.any(np.diff(bordes) <= 0):
+        raise ValueError(f"Bordes inválidos para el target '{nombre}': {bordes}")
+    
+    DEFINICIONES_TARGETS[nombre] = {'entrada': entrada, 'bordes': list(bordes), 'derecha': derecha,
+                                    'clase_sin_actividad': clase_sin_actividad}
+
+
+def definiciones_con_umbrales(bins_nivel_riesgo, umbral_hotspot, definiciones=None):
     """
-    Crea los 3 tipos de targets de clasificación.
+    Copia de las definiciones con otros bordes de nivel_riesgo y hotspot_critico.
     
     Args:
-        df_completo: DataFrame con ['grid_cell', 'año_semana', 'crime_count']
+        bins_nivel_riesgo: Límites con el formato de BINS_NIVEL_RIESGO
+        umbral_hotspot: Umbral con el formato de UMBRAL_HOTSPOT
+        definiciones: Definiciones base (default: DEFINICIONES_TARGETS)
         
     Returns:
-        Tupla: (y_nivel_riesgo, y_hotspot_critico, y_tendencia)
+        Dict nombre → definición
     """
-    crime_counts = df_completo['crime_count'].values
+    definiciones = {nombre: dict(d) for nombre, d in
+                    (DEFINICIONES_TARGETS if definiciones is None else definiciones).items()}
+    definiciones['nivel_riesgo']['bordes'] = list(bins_nivel_riesgo[1:-1])
+    definiciones['hotspot_critico']['bordes'] = [umbral_hotspot]
     
-    # Clasificación 1: Nivel de Riesgo
-    y_nivel_riesgo = crear_target_nivel_riesgo(crime_counts)
+    return definiciones
+
+
+def construir_targets(conteos, promedio_historico=None, definiciones=None,
+                      filas_bloque=TARGETS_FILAS_BLOQUE):
+    """
+    Calcula todos los targets en una sola pasada por bloques de filas.
+    
+    Cada bloque calcula sus entradas una vez y escribe la etiqueta de cada
+    target directamente en su columna de la salida, sin arrays int64
+    intermedios ni DataFrames.
     
-    # Clasificación 2: Hotspot Crítico
-    y_hotspot_critico = crear_target_hotspot_critico(crime_counts, umbral=5)
+    Args:
+        conteos: Array de crime_count por fila
+        promedio_historico: Promedio de las semanas previas alineado con
+            conteos (requerido si algún target usa 'ratio_tendencia')
+        definiciones: Dict nombre → definición (default: DEFINICIONES_TARGETS)
+        filas_bloque: Filas por bloque
+        
+    Returns:
+        Array int8 C-contiguo (n, len(definiciones)), columnas en el orden
+        de las definiciones
+    """
+    definiciones = DEFINICIONES_TARGETS if definiciones is None else definiciones
+    conteos = np.asarray(conteos)
+    usa_ratio = any(d['entrada'] == 'ratio_tendencia' for d in definiciones.values())
+    usa_actividad = any(d.get('clase_sin_actividad') is not None for d in definiciones.values())
+    if (usa_ratio or usa_actividad) and promedio_historico is None:
+        raise ValueError("Los targets sobre 'ratio_tendencia' o con clase_sin_actividad "
+                         "requieren promedio_historico")
     
-    # Clasificación 3: Tendencia
-    y_tendencia = crear_target_tendencia(df_completo)
+    bordes = [np.asarray(d['bordes'], dtype='float64') for d in definiciones.values()]
+    Y = np.empty((len(conteos), len(definiciones)), dtype='int8')
     
-    return y_nivel_riesgo, y_hotspot_critico, y_tendencia
+    for inicio in range(0, len(conteos), filas_bloque):
+        fin = min(inicio + filas_bloque, len(conteos))
+        entradas = {'conteo': conteos[inicio:fin]}
+        if usa_ratio:
+            entradas['ratio_tendencia'] = entradas['conteo'] / (promedio_historico[inicio:fin] + 0.1)
+        if usa_actividad:
+            sin_actividad = (entradas['conteo'] == 0) & (promedio_historico[inicio:fin] == 0)
+        
+        for j, definicion in enumerate(definiciones.values()):
+            Y[inicio:fin, j] = np.digitize(entradas[definicion['entrada']], bordes[j],
+                                           right=definicion['derecha'])
+            if definicion.get('clase_sin_actividad') is not None:
+                Y[inicio:fin, j][sin_actividad] = definicion['clase_sin_actividad']
+    
+    return Y
+
+
+def crear_todos_los_targets(df_completo, promedio_historico=None, group_col='grid_cell',
+                            ventana=VENTANA_TENDENCIA, definiciones=None):
+    """
+    Crea todos los targets registrados (DEFINICIONES_TARGETS) en una pasada.
+    
+    Args:
+        df_completo: DataFrame con ['grid_cell', 'semana_id', 'crime_count']
+        promedio_historico: Promedio de las `ventana` semanas previas alineado
+            con las filas de df_completo. Si es None se calcula por celda
+            ordenando por semana y se devuelve en el orden de df_completo.
+        group_col: Columna de la celda
+        ventana: Semanas del promedio histórico
+        definiciones: Ver construir_targets (ej: definiciones_con_umbrales)
+        
+    Returns:
+        Array int8 (n, len(definiciones)); la columna j es el target
+        list(definiciones)[j]
+    """
+    conteos = df_completo['crime_count'].to_numpy()
+    
+    if promedio_historico is None:
+        orden = np.lexsort((df_completo['semana_id'].to_numpy(), df_completo[group_col].to_numpy()))
+        promedio_historico = np.empty(len(conteos))
+        promedio_historico[orden] = promedio_previo_por_grupo(
+            df_completo[group_col].to_numpy()[orden], conteos[orden], ventana
+        )
+    
+    return construir_targets(conteos, np.asarray(promedio_historico, dtype='float64'), definiciones)
 
 
 # ============================================================================
@@ -202,6 +394,23 @@ def obtener_descripcion_target(tipo_clasificacion):
     return descripciones.get(tipo_clasificacion)
 
 
+def targets_por_tipo(Y_train, Y_test, tipos):
+    """
+    Vista por tipo de las matrices de targets.
+    
+    Args:
+        Y_train, Y_test: Arrays (n, len(tipos)) de construir_targets
+        tipos: Nombre de cada columna
+        
+    Returns:
+        Dict {tipo: {'train': columna, 'test': columna}} (vistas, sin copiar)
+    """
+    return {
+        tipo: {'train': Y_train[:, j], 'test': Y_test[:, j]}
+        for j, tipo in enumerate(tipos)
+    }
+
+
 def imprimir_distribucion_target(y_target, nombre_target):
     """
     Imprime la distribución de clases del target.
@@ -0,0 +1,411 @@
+"""
+Tensor de Conteos Celda × Semana
+================================
+Representa el agregado como una matriz NumPy de forma (celdas, semanas):
+
+    conteos[i, t] = denuncias de la celda celdas[i] en la semana semanas[t]
+
+El eje de semanas es el rango completo y contiguo entre la primera y la
+última semana observadas, de modo que las semanas sin denuncias valen 0 en
+lugar de faltar. Así el lag k es la semana t-k del calendario (y no la
+k-ésima semana anterior *con* denuncias de la celda), y los lags y promedios
+móviles se obtienen recortando la matriz en vez de con pasadas de groupby.
+
+Dos backends con la misma interfaz:
+- TensorConteos: ndarray denso, memoria celdas × semanas
+- TensorConteosDisperso: scipy.sparse CSR, memoria proporcional a los pares
+  celda×semana con denuncias (grids finos o todo el país)
+
+El formato largo de salida (a_dataframe, aplanar) tiene siempre una fila
+por celda×semana, así que el ahorro de memoria del disperso se limita al
+tensor y a sus intermedios (lags, medias móviles, vecinos).
+
+construir_tensor elige el backend según la densidad del agregado.
+
+Vecinos: el backend denso proyecta el tensor sobre la retícula (filas ×
+columnas × semanas) y lo convoluciona con kernel_vecindad; el disperso
+multiplica por la matriz de pesos W (celdas × celdas), W @ X. Ambos dan el
+promedio ponderado de las celdas vecinas para todas las semanas a la vez.
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+from scipy import ndimage, sparse
+
+from utils.grid import desempaquetar_celda, empaquetar_celda, kernel_vecindad
+from config.config import BACKEND_TENSOR, DENSIDAD_MINIMA_DENSO
+
+
+def rango_semanas(semanas_observadas):
+    """
+    Todas las semana_id entre la primera y la última observadas.
+
+    Args:
+        semanas_observadas: Iterable de semana_id (ver utils.semanas)
+
+    Returns:
+        Array int64 con el rango contiguo de semanas
+    """
+    semanas = np.asarray(semanas_observadas, dtype='int64')
+    if len(semanas) == 0:
+        return np.array([], dtype='int64')
+    return np.arange(semanas.min(), semanas.max() + 1, dtype='int64')
+
+
+def _ejes(hotspot_counts):
+    """
+    Ejes (celdas, semanas) del tensor e índices (fila, columna) de cada conteo.
+    """
+    celdas = np.unique(hotspot_counts['grid_cell'].to_numpy(dtype='int64'))
+    semana_id = hotspot_counts['semana_id'].to_numpy(dtype='int64')
+    semanas = rango_semanas(semana_id)
+
+    fila = np.searchsorted(celdas, hotspot_counts['grid_cell'].to_numpy(dtype='int64'))
+    columna = semana_id - semanas[0] if len(semanas) else semana_id
+
+    return celdas, semanas, fila, columna
+
+
+def _periodos_ventana(n_semanas, ventana, desplazamiento):
+    """
+    Para cada semana t, la ventana [inicio, fin) de semanas previas y su largo.
+    """
+    t = np.arange(n_semanas)
+    fin = np.clip(t - desplazamiento + 1, 0, n_semanas)
+    inicio = np.clip(fin - ventana, 0, n_semanas)
+    return inicio, fin, fin - inicio
+
+
+class _TensorBase(ABC):
+    """
+    Ejes y operaciones comunes a ambos backends.
+
+    Atributos:
+        celdas: Array int64 ordenado con el grid_cell de cada fila
+        semanas: Array int64 con la semana_id de cada columna (contiguas)
+        conteos: Matriz int32 de forma (len(celdas), len(semanas))
+    """
+
+    backend = None
+
+    def _validar_forma(self):
+        if self.conteos.shape != (len(self.celdas), len(self.semanas)):
+            raise ValueError(f"Forma {self.conteos.shape} incompatible con "
+                             f"{len(self.celdas)} celdas × {len(self.semanas)} semanas")
+
+    @property
+    def forma(self):
+        return self.conteos.shape
+
+    @abstractmethod
+    def no_ceros(self):
+        """
+        Pares celda×semana con al menos una denuncia.
+        """
+
+    def densidad(self):
+        """
+        Fracción de pares celda×semana con al menos una denuncia.
+        """
+        total = self.forma[0] * self.forma[1]
+        return self.no_ceros() / total if total else 0.0
+
+    @abstractmethod
+    def aplanar(self, matriz, desde_semana=0):
+        """
+        Array 1-D denso de `matriz[:, desde_semana:]` en orden (celda, semana).
+        """
+
+    @abstractmethod
+    def filas_densas(self, inicio, fin):
+        """
+        Conteos de las celdas [inicio, fin) como ndarray denso (bloque × semanas).
+        """
+
+    def a_dataframe(self, num_lags=0, desde_semana=0):
+        """
+        Formato largo (una fila por celda×semana, ordenado por celda y semana).
+
+        Args:
+            num_lags: Columnas crime_count_lag_1..num_lags a incluir
+            desde_semana: Índice de la primera semana a incluir (p.ej. num_lags
+                para descartar las semanas sin historia completa)
+
+        Returns:
+            DataFrame ['grid_cell', 'semana_id', 'crime_count', 'crime_count_lag_k'...]
+        """
+        n_celdas = self.forma[0]
+        semanas = self.semanas[desde_semana:]
+
+        df = pd.DataFrame({
+            'grid_cell': np.repeat(self.celdas, len(semanas)),
+            'semana_id': np.tile(semanas, n_celdas),
+            'crime_count': self.aplanar(self.conteos, desde_semana).astype('int64'),
+        })
+        for k in range(1, num_lags + 1):
+            valores = self.aplanar(self.lag(k), desde_semana).astype('float64')
+            # Semanas sin historia suficiente: NaN en ambos backends
+            valores.reshape(n_celdas, len(semanas))[:, :max(k - desde_semana, 0)] = np.nan
+            df[f'crime_count_lag_{k}'] = valores
+
+        return df
+
+
+class TensorConteos(_TensorBase):
+    """
+    Backend denso: conteos es un ndarray int32 (celdas × semanas).
+    """
+
+    backend = 'denso'
+
+    def __init__(self, celdas, semanas, conteos):
+        self.celdas = np.asarray(celdas, dtype='int64')
+        self.semanas = np.asarray(semanas, dtype='int64')
+        self.conteos = np.asarray(conteos, dtype='int32')
+        self._validar_forma()
+
+    @classmethod
+    def desde_conteos(cls, hotspot_counts):
+        """
+        Construye el tensor a partir del agregado en formato largo.
+
+        Args:
+            hotspot_counts: DataFrame ['grid_cell', 'semana_id', 'crime_count']
+
+        Returns:
+            TensorConteos con todas las celdas observadas y todas las semanas del rango
+        """
+        celdas, semanas, fila, columna = _ejes(hotspot_counts)
+
+        conteos = np.zeros((len(celdas), len(semanas)), dtype='int32')
+        np.add.at(conteos, (fila, columna), hotspot_counts['crime_count'].to_numpy())
+
+        return cls(celdas, semanas, conteos)
+
+    def no_ceros(self):
+        return np.count_nonzero(self.conteos)
+
+    def memoria_bytes(self):
+        return self.conteos.nbytes
+
+    def aplanar(self, matriz, desde_semana=0):
+        return np.asarray(matriz)[:, desde_semana:].ravel()
+
+    def filas_densas(self, inicio, fin):
+        return self.conteos[inicio:fin]
+
+    def lag(self, k, matriz=None):
+        """
+        Valor de la semana t-k para cada (celda, t); NaN en las primeras k semanas.
+
+        Args:
+            k: Semanas de desfase
+            matriz: Matriz (celdas × semanas) a desfasar (default: conteos)
+
+        Returns:
+            Array float64 de la misma forma que conteos
+        """
+        matriz = self.conteos if matriz is None else matriz
+        resultado = np.full(self.forma, np.nan)
+        if k < self.forma[1]:
+            resultado[:, k:] = matriz[:, :self.forma[1] - k]
+        return resultado
+
+    def vecinos(self, lado):
+        """
+        Promedio ponderado de las celdas vecinas (kernel_vecindad) por semana.
+
+        Convoluciona la retícula filas × columnas de cada semana; las celdas
+        sin denuncias fuera del tensor cuentan como 0.
+
+        Returns:
+            Array float64 de la misma forma que conteos
+        """
+        fila, columna = desempaquetar_celda(self.celdas)
+        if len(fila) == 0:
+            return np.zeros(self.forma)
+        fila, columna = fila - fila.min(), columna - columna.min()
+
+        reticula = np.zeros((fila.max() + 1, columna.max() + 1, self.forma[1]))
+        reticula[fila, columna] = self.conteos
+
+        kernel = kernel_vecindad(lado)[:, :, np.newaxis]
+        convolucion = ndimage.correlate(reticula, kernel, mode='constant', cval=0.0)
+        return convolucion[fila, columna]
+
+    def media_movil(self, ventana, desplazamiento=1, min_periodos=1):
+        """
+        Promedio de las `ventana` semanas que terminan en t-desplazamiento.
+
+        Con desplazamiento=1 equivale a x.shift(1).rolling(ventana, min_periods)
+        .mean() por celda: al inicio del rango se promedian las semanas
+        disponibles y hay NaN mientras haya menos de min_periodos.
+
+        Returns:
+            Array float64 de la misma forma que conteos
+        """
+        n_semanas = self.forma[1]
+        acumulado = np.zeros((self.forma[0], n_semanas + 1), dtype='int64')
+        np.cumsum(self.conteos, axis=1, out=acumulado[:, 1:])
+
+        inicio, fin, periodos = _periodos_ventana(n_semanas, ventana, desplazamiento)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            resultado = (acumulado[:, fin] - acumulado[:, inicio]) / periodos
+        resultado[:, periodos < max(min_periodos, 1)] = np.nan
+        return resultado
+
+
+class TensorConteosDisperso(_TensorBase):
+    """
+    Backend disperso: conteos es una matriz scipy.sparse CSR int32.
+
+    lag y media_movil devuelven matrices CSR; las semanas sin historia
+    suficiente quedan en 0 (sparse no representa NaN), por lo que deben
+    descartarse con desde_semana como en el pipeline. Los valores del resto
+    de semanas son idénticos a los del backend denso.
+    """
+
+    backend = 'disperso'
+
+    def __init__(self, celdas, semanas, conteos):
+        self.celdas = np.asarray(celdas, dtype='int64')
+        self.semanas = np.asarray(semanas, dtype='int64')
+        self.conteos = sparse.csr_matrix(conteos, dtype='int32')
+        self.conteos.sum_duplicates()
+        self.conteos.eliminate_zeros()
+        self._validar_forma()
+
+    @classmethod
+    def desde_conteos(cls, hotspot_counts):
+        """
+        Construye el tensor disperso a partir del agregado en formato largo.
+        """
+        celdas, semanas, fila, columna = _ejes(hotspot_counts)
+
+        conteos = sparse.csr_matrix(
+            (hotspot_counts['crime_count'].to_numpy(dtype='int32'), (fila, columna)),
+            shape=(len(celdas), len(semanas))
+        )
+        return cls(celdas, semanas, conteos)
+
+    def no_ceros(self):
+        return self.conteos.nnz
+
+    def memoria_bytes(self):
+        return self.conteos.data.nbytes + self.conteos.indices.nbytes + self.conteos.indptr.nbytes
+
+    def aplanar(self, matriz, desde_semana=0):
+        """
+        Escribe solo los no-ceros de la CSR sobre un vector de ceros, sin
+        materializar la matriz densa intermedia de toarray().
+        """
+        recorte = sparse.csr_matrix(matriz[:, desde_semana:])
+        recorte.sum_duplicates()
+        n_filas, n_columnas = recorte.shape
+
+        plano = np.zeros(n_filas * n_columnas, dtype=recorte.dtype)
+        filas = np.repeat(np.arange(n_filas, dtype='int64'), np.diff(recorte.indptr))
+        plano[filas * n_columnas + recorte.indices] = recorte.data
+        return plano
+
+    def filas_densas(self, inicio, fin):
+        return self.conteos[inicio:fin].toarray()
+
+    def _desplazar(self, k, matriz=None):
+        """
+        Matriz con las columnas desplazadas k semanas hacia adelante.
+        """
+        coo = (self.conteos if matriz is None else matriz).tocoo()
+        mantener = coo.col + k < self.forma[1]
+        return sparse.csr_matrix(
+            (coo.data[mantener], (coo.row[mantener], coo.col[mantener] + k)),
+            shape=self.forma
+        )
+
+    def lag(self, k, matriz=None):
+        """
+        Valor de la semana t-k para cada (celda, t) como CSR (default: conteos).
+        """
+        return self._desplazar(k, matriz)
+
+    def matriz_vecindad(self, lado):
+        """
+        Matriz dispersa W (celdas × celdas) con W[i, j] = peso de la celda j
+        como vecina de i según kernel_vecindad.
+        """
+        kernel = kernel_vecindad(lado)
+        radio = lado // 2
+        fila, columna = desempaquetar_celda(self.celdas)
+
+        filas_w, columnas_w, pesos_w = [], [], []
+        for dfila, dcolumna in zip(*np.nonzero(kernel)):
+            vecina = empaquetar_celda(fila + dfila - radio, columna + dcolumna - radio)
+            posicion = np.searchsorted(self.celdas, vecina)
+            existe = posicion < len(self.celdas)
+            existe[existe] = self.celdas[posicion[existe]] == vecina[existe]
+
+            filas_w.append(np.nonzero(existe)[0])
+            columnas_w.append(posicion[existe])
+            pesos_w.append(np.full(existe.sum(), kernel[dfila, dcolumna]))
+
+        n_celdas = len(self.celdas)
+        return sparse.csr_matrix(
+            (np.concatenate(pesos_w), (np.concatenate(filas_w), np.concatenate(columnas_w))),
+            shape=(n_celdas, n_celdas)
+        )
+
+    def vecinos(self, lado):
+        """
+        Igual que TensorConteos.vecinos, como W @ X en CSR float64.
+        """
+        return self.matriz_vecindad(lado) @ self.conteos.astype('float64')
+
+    def media_movil(self, ventana, desplazamiento=1, min_periodos=1):
+        """
+        Igual que TensorConteos.media_movil, como CSR float64.
+
+        La suma de la ventana es entera y se divide una sola vez por el número
+        de semanas, de modo que los valores coinciden bit a bit con el denso.
+        """
+        suma = sparse.csr_matrix(self.forma, dtype='int64')
+        for j in range(desplazamiento, desplazamiento + ventana):
+            suma = suma + self._desplazar(j).astype('int64')
+
+        _, _, periodos = _periodos_ventana(self.forma[1], ventana, desplazamiento)
+
+        coo = suma.tocoo()
+        valida = periodos[coo.col] >= max(min_periodos, 1)
+        return sparse.csr_matrix(
+            (coo.data[valida] / periodos[coo.col[valida]], (coo.row[valida], coo.col[valida])),
+            shape=self.forma
+        )
+
+
+def construir_tensor(hotspot_counts, backend=BACKEND_TENSOR, densidad_minima=DENSIDAD_MINIMA_DENSO):
+    """
+    Construye el tensor con el backend pedido.
+
+    Args:
+        hotspot_counts: DataFrame ['grid_cell', 'semana_id', 'crime_count']
+        backend: 'denso', 'disperso' o 'auto'
+        densidad_minima: Con 'auto', densidad (pares con denuncias / celdas×semanas)
+            por debajo de la cual se usa el backend disperso
+
+    Returns:
+        TensorConteos o TensorConteosDisperso
+    """
+    if backend == 'auto':
+        n_celdas = hotspot_counts['grid_cell'].nunique()
+        n_semanas = len(rango_semanas(hotspot_counts['semana_id']))
+        total = n_celdas * n_semanas
+        densidad = len(hotspot_counts) / total if total else 1.0
+        backend = 'denso' if densidad >= densidad_minima else 'disperso'
+
+    if backend == 'denso':
+        return TensorConteos.desde_conteos(hotspot_counts)
+    if backend == 'disperso':
+        return TensorConteosDisperso.desde_conteos(hotspot_counts)
+    raise ValueError(f"Backend de tensor desconocido: {backend}")
@@ -0,0 +1,232 @@
+"""
+Umbrales de Targets por Cuantiles
+=================================
+Deriva los bordes de nivel_riesgo y hotspot_critico de la distribución de
+conteos semanales de cada delito y tamaño de grid, en lugar de usar los
+valores fijos pensados para los volúmenes de HURTO.
+
+La distribución se resume en un sketch (SketchConteos): un histograma
+entero de crime_count por semana, sobre las celdas×semana con al menos una
+denuncia. Como los conteos son enteros el histograma es exacto (sus
+cuantiles coinciden con los de ordenar todos los conteos) y ocupa
+semanas × conteo máximo enteros.
+
+El sketch se persiste por (delito, grid) junto con la versión de la
+extracción incremental de la que salió. Tras una extracción incremental
+solo se reemplazan las semanas que esa extracción re-leyó (la ventana de
+re-lectura y las semanas de las denuncias tardías, ver
+utils.extraccion_incremental); el resto del historial no se vuelve a
+contar. Sin extracción incremental, o si el sketch no corresponde a la
+extracción anterior, se reconstruye desde el agregado completo.
+
+Los cuantiles se toman solo de las semanas anteriores a semana_corte, para
+que los umbrales no usen información del periodo de test.
+"""
+
+import os
+
+import numpy as np
+
+from config.config import (
+    BINS_NIVEL_RIESGO, UMBRAL_HOTSPOT, MODO_UMBRALES_TARGETS, CUANTILES_NIVEL_RIESGO,
+    CUANTIL_HOTSPOT, UMBRALES_DIR
+)
+
+
+class SketchConteos:
+    """
+    Histograma entero de conteos celda×semana, una fila por semana.
+    """
+
+    def __init__(self, semanas=None, histogramas=None, version=None):
+        self.semanas = np.zeros(0, dtype='int64') if semanas is None else np.asarray(semanas, dtype='int64')
+        self.histogramas = (np.zeros((0, 1), dtype='int64') if histogramas is None
+                            else np.asarray(histogramas, dtype='int64'))
+        # Versión de la extracción incremental reflejada (None = otra fuente)
+        self.version = version
+
+    @classmethod
+    def desde_conteos(cls, hotspot_counts):
+        """
+        Sketch de un agregado ['grid_cell', 'semana_id', 'crime_count'].
+        """
+        semana = hotspot_counts['semana_id'].to_numpy(dtype='int64')
+        conteo = hotspot_counts['crime_count'].to_numpy(dtype='int64')
+        conteo_positivo = conteo > 0
+        semana, conteo = semana[conteo_positivo], conteo[conteo_positivo]
+
+        semanas, fila = np.unique(semana, return_inverse=True)
+        ancho = int(conteo.max()) + 1 if len(conteo) else 1
+        histogramas = np.bincount(fila * ancho + conteo, minlength=len(semanas) * ancho)
+
+        return cls(semanas, histogramas.reshape(len(semanas), ancho))
+
+    def actualizar(self, hotspot_counts, desde_semana=None, semanas=()):
+        """
+        Reemplaza las semanas re-leídas con su conteo en el agregado.
+
+        Las demás semanas se conservan; las re-leídas que quedaron sin
+        denuncias se eliminan del sketch.
+
+        Args:
+            hotspot_counts: Agregado celda×semana (basta con las semanas re-leídas)
+            desde_semana: Semanas >= desde_semana re-leídas (None = ninguna)
+            semanas: Otras semanas re-leídas (ej: de denuncias tardías)
+        """
+        def releidas(semana_id):
+            mascara = np.isin(semana_id, np.asarray(semanas, dtype='int64'))
+            if desde_semana is not None:
+                mascara |= semana_id >= desde_semana
+            return mascara
+
+        nuevo = SketchConteos.desde_conteos(
+            hotspot_counts[releidas(hotspot_counts['semana_id'].to_numpy(dtype='int64'))]
+        )
+        conservar = ~releidas(self.semanas)
+
+        ancho = max(self.histogramas.shape[1], nuevo.histogramas.shape[1])
+        semanas_union = np.union1d(self.semanas[conservar], nuevo.semanas)
+        histogramas = np.zeros((len(semanas_union), ancho), dtype='int64')
+        histogramas[np.searchsorted(semanas_union, self.semanas[conservar]),
+                    :self.histogramas.shape[1]] = self.histogramas[conservar]
+        histogramas[np.searchsorted(semanas_union, nuevo.semanas),
+                    :nuevo.histogramas.shape[1]] = nuevo.histogramas
+
+        self.semanas, self.histogramas = semanas_union, histogramas
+        return self
+
+    def histograma(self, hasta_semana=None):
+        """
+        Histograma total de las semanas < hasta_semana (todas si es None).
+        """
+        filas = slice(None) if hasta_semana is None else self.semanas < hasta_semana
+        return self.histogramas[filas].sum(axis=0)
+
+    def cuantiles(self, probabilidades, hasta_semana=None):
+        """
+        Cuantiles exactos (menor conteo v con P(conteo <= v) >= p).
+
+        Returns:
+            Array int64, o None si el sketch no tiene conteos en el rango
+        """
+        acumulado = np.cumsum(self.histograma(hasta_semana))
+        if acumulado[-1] == 0:
+            return None
+        objetivo = np.asarray(probabilidades, dtype='float64') * acumulado[-1]
+        return np.searchsorted(acumulado, objetivo, side='left').astype('int64')
+
+    def guardar(self, ruta):
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        tmp = f"{ruta}.tmp{os.getpid()}.npz"
+        np.savez(tmp, semanas=self.semanas, histogramas=self.histogramas, version=self.version or '')
+        os.replace(tmp, ruta)
+
+    @classmethod
+    def cargar(cls, ruta):
+        """
+        Sketch guardado en ruta, o None si no existe.
+        """
+        if not os.path.exists(ruta):
+            return None
+        with np.load(ruta) as archivo:
+            version = str(archivo['version']) if 'version' in archivo.files else ''
+            return cls(archivo['semanas'], archivo['histogramas'], version or None)
+
+
+def ruta_sketch(delito_key, grid_size):
+    return os.path.join(UMBRALES_DIR, f"{delito_key}_grid{grid_size}.npz")
+
+
+def umbrales_fijos():
+    return {'modo': 'fijo', 'bins_nivel_riesgo': list(BINS_NIVEL_RIESGO), 'umbral_hotspot': UMBRAL_HOTSPOT}
+
+
+def umbrales_por_cuantiles(sketch, hasta_semana=None, cuantiles_nivel=CUANTILES_NIVEL_RIESGO,
+                           cuantil_hotspot=CUANTIL_HOTSPOT):
+    """
+    Umbrales de nivel_riesgo y hotspot_critico a partir del sketch.
+
+    Los bordes de nivel_riesgo se fuerzan estrictamente crecientes (con
+    conteos enteros y muchos empates, dos cuantiles pueden coincidir).
+
+    Returns:
+        Dict {'modo', 'bins_nivel_riesgo', 'umbral_hotspot'} con el formato de
+        BINS_NIVEL_RIESGO / UMBRAL_HOTSPOT; los umbrales fijos si el sketch
+        no tiene semanas anteriores a hasta_semana
+    """
+    valores = sketch.cuantiles(list(cuantiles_nivel) + [cuantil_hotspot], hasta_semana)
+    if valores is None:
+        print("   [UMBRALES] Sin conteos para estimar cuantiles; se usan los umbrales fijos")
+        return umbrales_fijos()
+
+    bordes = []
+    for valor in valores[:-1]:
+        bordes.append(int(max(valor, bordes[-1] + 1)) if bordes else int(valor))
+
+    return {
+        'modo': 'cuantiles',
+        'bins_nivel_riesgo': [0] + bordes + [float('inf')],
+        'umbral_hotspot': int(valores[-1])
+    }
+
+
+def _sketch_vigente(hotspot_counts, ruta, relectura):
+    """
+    Sketch persistido puesto al día con la última extracción incremental, o
+    None si hay que reconstruirlo.
+    """
+    if ruta is None or relectura is None:
+        return None
+    sketch = SketchConteos.cargar(ruta)
+    if sketch is None or sketch.version is None:
+        return None
+
+    if sketch.version == relectura['version']:
+        return sketch
+    if relectura['version_previa'] is not None and sketch.version == relectura['version_previa']:
+        sketch.actualizar(hotspot_counts, relectura['desde_semana'], relectura['semanas_tardias'])
+        print(f"   [UMBRALES] Sketch actualizado desde la semana {relectura['desde_semana']} "
+              f"(+{len(relectura['semanas_tardias'])} semanas con denuncias tardías)")
+        return sketch
+    return None
+
+
+def umbrales_targets(hotspot_counts, semana_corte, delito_key=None, grid_size=None,
+                     relectura=None, modo=MODO_UMBRALES_TARGETS):
+    """
+    Umbrales de los targets para un delito y tamaño de grid.
+
+    En modo 'cuantiles' mantiene el sketch persistido del (delito, grid): si
+    corresponde a la extracción incremental anterior solo se reemplazan las
+    semanas re-leídas; en otro caso se reconstruye desde el agregado completo.
+
+    Args:
+        hotspot_counts: Agregado ['grid_cell', 'semana_id', 'crime_count']
+        semana_corte: Primera semana de test (se excluye de los cuantiles)
+        delito_key, grid_size: Identifican el sketch persistido (sin ellos no se persiste)
+        relectura: Semanas re-leídas por la última extracción incremental
+            (ver utils.extraccion_incremental.ultima_relectura), o None si
+            hotspot_counts no viene del dataset incremental
+        modo: 'fijo' o 'cuantiles'
+
+    Returns:
+        Dict de umbrales (ver umbrales_por_cuantiles)
+    """
+    if modo == 'fijo':
+        return umbrales_fijos()
+    if modo != 'cuantiles':
+        raise ValueError(f"MODO_UMBRALES_TARGETS desconocido: '{modo}' (opciones: 'fijo', 'cuantiles')")
+
+    ruta = ruta_sketch(delito_key, grid_size) if delito_key is not None else None
+    sketch = _sketch_vigente(hotspot_counts, ruta, relectura)
+    if sketch is None:
+        sketch = SketchConteos.desde_conteos(hotspot_counts)
+    sketch.version = None if relectura is None else relectura['version']
+
+    if ruta is not None:
+        sketch.guardar(ruta)
+
+    umbrales = umbrales_por_cuantiles(sketch, semana_corte)
+    print(f"   [UMBRALES] {umbrales['modo']}: nivel_riesgo {umbrales['bins_nivel_riesgo'][1:-1]}, "
+          f"hotspot > {umbrales['umbral_hotspot']}")
+    return umbrales